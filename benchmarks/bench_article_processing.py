@@ -0,0 +1,62 @@
+"""
+Benchmark article processing
+CPU time mỗi bài cho extract_article_data + ContentCleaner.clean:
+  - before: serialize content element rồi clean(str) (parse lại lần hai)
+  - after:  clean(element) trực tiếp trên cây đã parse
+
+Usage:
+    python -m benchmarks.bench_article_processing [--fixtures DIR] [--repeat N]
+"""
+
+import time
+import argparse
+from pathlib import Path
+from lxml import html as lxml_html
+from benchmarks.common import FIXTURES_DIR, quiet_logger, load_fixtures, page_url, median
+from engine.static_crawler import StaticCrawler
+
+
+def measure(crawler: StaticCrawler, pages, repeat: int, reparse: bool) -> float:
+    """Median CPU time (ms) mỗi bài"""
+    timings = []
+    
+    for _ in range(repeat):
+        for name, html in pages:
+            start = time.process_time()
+            
+            article = crawler.extract_article_data(html, page_url(crawler.config, name))
+            if article:
+                content = article['content']
+                if reparse:
+                    content = lxml_html.tostring(content, encoding='unicode', with_tail=False)
+                crawler.content_cleaner.clean(content, source_name=crawler.name)
+            
+            timings.append((time.process_time() - start) * 1000)
+    
+    return median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Article processing benchmark')
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    quiet_logger()
+    fixtures = load_fixtures(args.fixtures)
+    
+    print(f"{'Domain':<24}{'Pages':>6}{'Before (ms)':>14}{'After (ms)':>13}{'Speedup':>10}")
+    
+    for domain, data in fixtures.items():
+        if not data['detail']:
+            continue
+        
+        crawler = StaticCrawler(data['config'], db_client=None)
+        before = measure(crawler, data['detail'], args.repeat, reparse=True)
+        after = measure(crawler, data['detail'], args.repeat, reparse=False)
+        
+        print(f"{domain:<24}{len(data['detail']):>6}{before:>14.2f}{after:>13.2f}{before / after:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark ContentCleaner
+Throughput (articles/sec) của ContentCleaner.clean trên fixture pages.
+
+Output được kiểm tra với golden của cleaner baseline trong
+tests/test_content_cleaner.py.
+
+Usage:
+    python -m benchmarks.bench_content_cleaner [--fixtures DIR] [--repeat N]
+"""
+
+import copy
+import time
+import argparse
+from pathlib import Path
+from benchmarks.common import FIXTURES_DIR, quiet_logger, load_fixtures, page_url
+from engine.static_crawler import StaticCrawler
+
+
+def extract_contents(crawler: StaticCrawler, pages):
+    """Content element của từng fixture page: [(name, element)]"""
+    contents = []
+    for name, html in pages:
+        article = crawler.extract_article_data(html, page_url(crawler.config, name))
+        if article and article['content'] is not None:
+            contents.append((name, article['content']))
+    return contents
+
+
+def measure(crawler: StaticCrawler, contents, repeat: int) -> float:
+    """Số bài clean được mỗi giây (CPU time, đường element)"""
+    # Clean sửa element tại chỗ nên copy trước, ngoài phần đo
+    batches = [[copy.copy(element) for _, element in contents] for _ in range(repeat)]
+    
+    start = time.process_time()
+    for batch in batches:
+        for element in batch:
+            crawler.content_cleaner.clean(element, source_name=crawler.name)
+    elapsed = time.process_time() - start
+    
+    return len(contents) * repeat / elapsed if elapsed else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ContentCleaner benchmark')
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    quiet_logger()
+    fixtures = load_fixtures(args.fixtures)
+    
+    print(f"{'Domain':<24}{'Pages':>6}{'Articles/sec':>14}")
+    
+    for domain, data in fixtures.items():
+        if not data['detail']:
+            continue
+        
+        crawler = StaticCrawler(data['config'], db_client=None)
+        contents = extract_contents(crawler, data['detail'])
+        if not contents:
+            continue
+        
+        rate = measure(crawler, contents, args.repeat)
+        print(f"{domain:<24}{len(contents):>6}{rate:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark DuplicateChecker
+So sánh check/mark từng URL với batch API (pipeline) cho 10k URLs
+
+Usage:
+    python -m benchmarks.bench_duplicate_checker                  # fakeredis
+    python -m benchmarks.bench_duplicate_checker --backend redis  # Redis trong .env
+"""
+
+import sys
+import time
+import argparse
+from loguru import logger
+from storage.cache import RedisCache
+from storage.duplicate_checker import DuplicateChecker
+
+# Chỉ hiện warning trở lên để không làm nhiễu kết quả đo
+logger.remove()
+logger.add(sys.stderr, level="WARNING")
+
+
+def make_checker(backend: str) -> DuplicateChecker:
+    """Tạo DuplicateChecker dùng fakeredis hoặc Redis thật"""
+    if backend == 'fakeredis':
+        import fakeredis
+        checker = DuplicateChecker(RedisCache(client=fakeredis.FakeRedis(decode_responses=True)))
+    else:
+        checker = DuplicateChecker()
+        if not checker.cache.ping():
+            raise SystemExit("Redis is not available, check REDIS_* in .env")
+    
+    # Dùng prefix riêng để không đụng dữ liệu thật
+    checker.prefix = "crawler:bench:"
+    return checker
+
+
+def cleanup(checker: DuplicateChecker):
+    """Xoá các key benchmark"""
+    client = checker.cache.client
+    keys = list(client.scan_iter(f"{checker.prefix}*", count=1000))
+    for i in range(0, len(keys), 1000):
+        client.delete(*keys[i:i + 1000])
+
+
+def timed(label: str, func) -> float:
+    """Chạy func và in thời gian"""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<32} {elapsed * 1000:10.1f} ms")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DuplicateChecker benchmark')
+    parser.add_argument('--backend', choices=['fakeredis', 'redis'], default='fakeredis')
+    parser.add_argument('--urls', type=int, default=10000)
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help='URLs per batch (~ one list page)')
+    args = parser.parse_args()
+    
+    checker = make_checker(args.backend)
+    cleanup(checker)
+    
+    urls = [f"https://vnexpress.net/bai-viet-{i}.html" for i in range(args.urls)]
+    batches = [urls[i:i + args.batch_size] for i in range(0, len(urls), args.batch_size)]
+    
+    print(f"Backend: {args.backend}, {len(urls)} URLs, batch size {args.batch_size}")
+    
+    # Per-URL calls
+    mark_single = timed("mark_crawled (per URL)", lambda: [
+        checker.mark_crawled(url, "bench") for url in urls[::2]
+    ])
+    check_single = timed("is_crawled (per URL)", lambda: [
+        checker.is_crawled(url) for url in urls
+    ])
+    cleanup(checker)
+    
+    # Batched calls
+    mark_batch = timed("mark_crawled_many (batched)", lambda: [
+        checker.mark_crawled_many((url, "bench") for url in batch[::2])
+        for batch in batches
+    ])
+    result = []
+    check_batch = timed("filter_uncrawled (batched)", lambda: [
+        result.extend(checker.filter_uncrawled(batch)) for batch in batches
+    ])
+    cleanup(checker)
+    
+    assert len(result) == len(urls) // 2, "batched lookup returned wrong result"
+    
+    print(f"  Speedup check: {check_single / check_batch:.1f}x, "
+          f"mark: {mark_single / mark_batch:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
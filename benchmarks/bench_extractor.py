@@ -0,0 +1,104 @@
+"""
+Benchmark ArticleExtractor
+Pages/sec của từng domain khi evaluate selectors trong domain config:
+  - bs4: BeautifulSoup + soupsieve, selector string được evaluate lại mỗi trang
+  - lxml: ArticleExtractor (CSSSelector compile sẵn, chạy trên cây lxml)
+  - parse+clean: ArticleExtractor.parse_article (gồm ContentCleaner)
+
+Usage:
+    python -m benchmarks.bench_extractor [--fixtures DIR] [--repeat N]
+        [--list-start-marker STR] [--list-stop-marker STR]
+
+--list-start-marker / --list-stop-marker ghi đè list_page.start_marker /
+stop_marker của mọi domain (thử vùng parse của trang danh sách).
+"""
+
+import time
+import argparse
+from pathlib import Path
+from bs4 import BeautifulSoup
+from benchmarks.common import FIXTURES_DIR, quiet_logger, load_fixtures, page_url
+from engine.extractor import ArticleExtractor
+
+
+def bs4_list_page(config, html: str, url: str):
+    """Article links bằng BeautifulSoup/soupsieve (cách cũ)"""
+    soup = BeautifulSoup(html, 'lxml')
+    return [element.get('href') for element in soup.select(config['list_page']['selectors']['article_links'])]
+
+
+def bs4_detail_page(config, html: str, url: str):
+    """Các field của detail page bằng BeautifulSoup/soupsieve (cách cũ)"""
+    soup = BeautifulSoup(html, 'lxml')
+    selectors = config['detail_page']['selectors']
+    
+    content = soup.select_one(selectors['content'])
+    if content is not None:
+        for remove_selector in config['detail_page'].get('remove_elements', []):
+            for elem in content.select(remove_selector):
+                elem.decompose()
+        content.extract()
+    
+    data = {}
+    for field in ('title', 'summary', 'thumbnail', 'published_date', 'author'):
+        if selectors.get(field):
+            data[field] = soup.select_one(selectors[field])
+    if selectors.get('tags'):
+        data['tags'] = soup.select(selectors['tags'])
+    return data
+
+
+def pages_per_sec(func, pages, repeat: int) -> float:
+    """Số trang/giây khi gọi func(html, url) cho tất cả pages, lặp repeat lần"""
+    if not pages:
+        return 0.0
+    
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html, url in pages:
+            func(html, url)
+    return len(pages) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Selector extraction benchmark')
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--list-start-marker')
+    parser.add_argument('--list-stop-marker')
+    args = parser.parse_args()
+    
+    quiet_logger()
+    fixtures = load_fixtures(args.fixtures)
+    
+    print(f"{'Domain':<22}{'List bs4':>10}{'List lxml':>11}{'Detail bs4':>12}{'Detail lxml':>13}{'Parse+clean':>13}")
+    
+    for domain, data in fixtures.items():
+        config = data['config']
+        if args.list_start_marker or args.list_stop_marker:
+            config = dict(config, list_page=dict(
+                config['list_page'],
+                start_marker=args.list_start_marker,
+                stop_marker=args.list_stop_marker
+            ))
+        extractor = ArticleExtractor(config)
+        list_pages = [(html, page_url(config, name)) for name, html in data['list']]
+        detail_pages = [(html, page_url(config, name)) for name, html in data['detail']]
+        
+        results = [
+            pages_per_sec(lambda html, url: bs4_list_page(config, html, url), list_pages, args.repeat),
+            pages_per_sec(extractor.extract_article_links, list_pages, args.repeat),
+            pages_per_sec(lambda html, url: bs4_detail_page(config, html, url), detail_pages, args.repeat),
+            pages_per_sec(extractor.extract_article_data, detail_pages, args.repeat),
+            pages_per_sec(extractor.parse_article, detail_pages, args.repeat)
+        ]
+        
+        print(f"{domain:<22}" + ''.join(
+            f"{value:>{width}.1f}" for value, width in zip(results, (10, 11, 12, 13, 13))
+        ))
+    
+    print("(pages/sec)")
+
+
+if __name__ == '__main__':
+    main()
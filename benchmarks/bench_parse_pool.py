@@ -0,0 +1,79 @@
+"""
+Benchmark ParsePool
+Throughput (articles/sec, wall time) của parse + clean trang chi tiết:
+  - threads: ThreadPoolExecutor gọi ArticleExtractor.parse_article (bị GIL)
+  - processes: ParsePool với N worker process
+
+Usage:
+    python -m benchmarks.bench_parse_pool [--fixtures DIR] [--repeat N] [--workers N]
+"""
+
+import os
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.common import FIXTURES_DIR, quiet_logger, load_fixtures, page_url
+from engine.extractor import ArticleExtractor
+from engine.parse_pool import ParsePool
+
+
+def build_tasks(fixtures, repeat: int):
+    """List (config, html, url) cho tất cả trang chi tiết"""
+    tasks = []
+    for data in fixtures.values():
+        for name, html in data['detail']:
+            tasks.append((data['config'], html, page_url(data['config'], name)))
+    return tasks * repeat
+
+
+def run_threads(tasks, workers: int) -> float:
+    """Articles/sec khi parse trong thread pool"""
+    extractors = {}
+    for config, _, _ in tasks:
+        extractors.setdefault(config['domain'], ArticleExtractor(config))
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda task: extractors[task[0]['domain']].parse_article(task[1], task[2]), tasks))
+    return len(tasks) / (time.perf_counter() - start)
+
+
+def run_processes(tasks, configs, workers: int) -> float:
+    """Articles/sec khi parse trong ParsePool"""
+    pool = ParsePool(configs, workers=workers)
+    try:
+        # Warm up: đợi các worker khởi động xong
+        [future.result() for future in [pool.submit(*task) for task in tasks[:workers]]]
+        
+        start = time.perf_counter()
+        futures = [pool.submit(*task) for task in tasks]
+        for future in futures:
+            future.result()
+        return len(tasks) / (time.perf_counter() - start)
+    finally:
+        pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parse pool benchmark')
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    
+    quiet_logger()
+    fixtures = load_fixtures(args.fixtures)
+    tasks = build_tasks(fixtures, args.repeat)
+    configs = [data['config'] for data in fixtures.values()]
+    
+    threads = run_threads(tasks, args.workers)
+    processes = run_processes(tasks, configs, args.workers)
+    
+    print(f"{'Mode':<12}{'Workers':>8}{'Articles':>10}{'Articles/sec':>14}")
+    print(f"{'threads':<12}{args.workers:>8}{len(tasks):>10}{threads:>14.1f}")
+    print(f"{'processes':<12}{args.workers:>8}{len(tasks):>10}{processes:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
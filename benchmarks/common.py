@@ -0,0 +1,77 @@
+"""
+Benchmark helpers
+Load fixture pages đã lưu cho các domain đã cấu hình
+
+Fixture layout:
+    <fixtures>/<domain>/list*.html    trang danh sách
+    <fixtures>/<domain>/*.html        trang chi tiết bài viết
+"""
+
+import sys
+import json
+from pathlib import Path
+from typing import Dict, List
+from loguru import logger
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+CONFIG_DIR = Path(__file__).parent.parent / 'config' / 'domains'
+
+
+def quiet_logger():
+    """Chỉ hiện warning trở lên để không làm nhiễu kết quả đo"""
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+
+def load_configs() -> Dict[str, Dict]:
+    """Load domain configs, key theo domain"""
+    configs = {}
+    for config_file in CONFIG_DIR.glob('*.json'):
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        configs[config['domain']] = config
+    return configs
+
+
+def load_fixtures(fixtures_dir: Path = FIXTURES_DIR) -> Dict[str, Dict]:
+    """
+    Load fixture pages
+    
+    Returns:
+        {domain: {'config': dict, 'list': [(name, html)], 'detail': [(name, html)]}}
+    """
+    configs = load_configs()
+    fixtures = {}
+    
+    for domain_dir in sorted(Path(fixtures_dir).iterdir()):
+        if not domain_dir.is_dir() or domain_dir.name not in configs:
+            continue
+        
+        pages = {'config': configs[domain_dir.name], 'list': [], 'detail': []}
+        for page in sorted(domain_dir.glob('*.html')):
+            kind = 'list' if page.name.startswith('list') else 'detail'
+            pages[kind].append((page.name, page.read_text(encoding='utf-8')))
+        
+        fixtures[domain_dir.name] = pages
+    
+    if not fixtures:
+        raise SystemExit(
+            f"No fixtures found in {fixtures_dir}. "
+            f"Run: python -m benchmarks.download_fixtures"
+        )
+    
+    return fixtures
+
+
+def page_url(config: Dict, name: str) -> str:
+    """URL giả lập cho fixture page (dùng để resolve relative links)"""
+    return f"https://{config['domain']}/{name}"
+
+
+def median(values: List[float]) -> float:
+    """Median của list số"""
+    ordered = sorted(values)
+    mid = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[mid]
+    return (ordered[mid - 1] + ordered[mid]) / 2
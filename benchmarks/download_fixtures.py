@@ -0,0 +1,47 @@
+"""
+Download fixture pages
+Lưu trang danh sách và vài trang chi tiết của mỗi domain đang bật để benchmark
+
+Usage:
+    python -m benchmarks.download_fixtures --articles 5
+"""
+
+import argparse
+from benchmarks.common import FIXTURES_DIR, load_configs
+from engine.static_crawler import StaticCrawler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Download benchmark fixtures')
+    parser.add_argument('--articles', type=int, default=5, help='Detail pages per domain')
+    parser.add_argument('--all', action='store_true', help='Include disabled domains')
+    args = parser.parse_args()
+    
+    for domain, config in sorted(load_configs().items()):
+        if not config.get('enabled', True) and not args.all:
+            continue
+        
+        crawler = StaticCrawler(config, db_client=None)
+        category = next(iter(config['category_mapping']))
+        list_url = config['list_page']['url_pattern'].format(category=category)
+        
+        html = crawler.fetch_page(list_url)
+        if not html:
+            print(f"✗ {domain}: could not fetch {list_url}")
+            continue
+        
+        domain_dir = FIXTURES_DIR / domain
+        domain_dir.mkdir(parents=True, exist_ok=True)
+        (domain_dir / 'list.html').write_text(html, encoding='utf-8')
+        
+        links = crawler.extract_article_links(html, list_url)[:args.articles]
+        for i, link in enumerate(links):
+            article_html = crawler.fetch_page(link)
+            if article_html:
+                (domain_dir / f'article-{i}.html').write_text(article_html, encoding='utf-8')
+        
+        print(f"✓ {domain}: list page + {len(links)} articles")
+
+
+if __name__ == '__main__':
+    main()
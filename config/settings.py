@@ -15,12 +15,31 @@ DB_WISE_PORT = int(os.getenv('DB_WISE_PORT', 5432))
 DB_WISE_USER = os.getenv('DB_WISE_USER', 'postgres')
 DB_WISE_PASS = os.getenv('DB_WISE_PASS')
 DB_WISE_NAME = os.getenv('DB_WISE_NAME', 'wise_local')
+DB_POOL_MIN_CONN = int(os.getenv('DB_POOL_MIN_CONN', 1))
+DB_POOL_MAX_CONN = int(os.getenv('DB_POOL_MAX_CONN', 10))
+DB_BATCH_SIZE = int(os.getenv('DB_BATCH_SIZE', 1))  # 1 = insert từng bài
+DB_BATCH_FLUSH_INTERVAL = float(os.getenv('DB_BATCH_FLUSH_INTERVAL', 5))
 
 # Crawler Configuration
 CRAWLER_USER_AGENT = os.getenv('CRAWLER_USER_AGENT', 'XwiseNewsCrawler/1.0')
 CRAWLER_TIMEOUT = int(os.getenv('CRAWLER_TIMEOUT', 30))
 CRAWLER_MAX_RETRIES = int(os.getenv('CRAWLER_MAX_RETRIES', 3))
 CRAWLER_RETRY_DELAY = int(os.getenv('CRAWLER_RETRY_DELAY', 5))
+MAX_PAGE_BYTES = int(os.getenv('MAX_PAGE_BYTES', 2097152))  # 2 MB, body bị cắt nếu lớn hơn
+
+# HTTP Cache (conditional GET cho trang danh sách)
+HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'true').lower() == 'true'
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', 'cache/http')
+
+# Robots.txt Cache (dùng chung giữa các crawler và các lần chạy)
+ROBOTS_CACHE_DIR = os.getenv('ROBOTS_CACHE_DIR', 'cache/robots')
+ROBOTS_CACHE_TTL = int(os.getenv('ROBOTS_CACHE_TTL', 86400))  # 1 day
+
+# High-water marks (chỉ xử lý phần mới của trang danh sách)
+WATERMARK_ENABLED = os.getenv('WATERMARK_ENABLED', 'true').lower() == 'true'
+WATERMARK_DIR = os.getenv('WATERMARK_DIR', 'cache/watermarks')
+WATERMARK_SIZE = int(os.getenv('WATERMARK_SIZE', 20))  # Số link đầu trang được lưu
+WATERMARK_STOP_AFTER = int(os.getenv('WATERMARK_STOP_AFTER', 3))  # Số link đã biết liên tiếp thì dừng
 
 # Redis Configuration
 REDIS_ENABLED = os.getenv('REDIS_ENABLED', 'true').lower() == 'true'
@@ -28,6 +47,17 @@ REDIS_HOST = os.getenv('REDIS_HOST', '127.0.0.1')
 REDIS_PORT = int(os.getenv('REDIS_PORT', 6379))
 REDIS_DB = int(os.getenv('REDIS_DB', 0))
 REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 50))
+REDIS_SOCKET_TIMEOUT = int(os.getenv('REDIS_SOCKET_TIMEOUT', 5))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
+REDIS_RECONNECT_INTERVAL = int(os.getenv('REDIS_RECONNECT_INTERVAL', 30))
+
+# Bloom filter trước Redis cho crawled-URL check (optional)
+BLOOM_FILTER_ENABLED = os.getenv('BLOOM_FILTER_ENABLED', 'false').lower() == 'true'
+BLOOM_FILTER_CAPACITY = int(os.getenv('BLOOM_FILTER_CAPACITY', 5000000))
+BLOOM_FILTER_ERROR_RATE = float(os.getenv('BLOOM_FILTER_ERROR_RATE', 0.01))
+BLOOM_FILTER_PATH = os.getenv('BLOOM_FILTER_PATH', 'cache/bloom/crawled_urls.bloom')
+BLOOM_FILTER_MAX_AGE = int(os.getenv('BLOOM_FILTER_MAX_AGE', 604800))  # 7 days
 
 # Scheduler Configuration
 SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', 'true').lower() == 'true'
@@ -39,19 +69,40 @@ LOG_FILE = os.getenv('LOG_FILE', 'logs/crawler.log')
 LOG_ROTATION = os.getenv('LOG_ROTATION', '10 MB')
 LOG_RETENTION = os.getenv('LOG_RETENTION', '30 days')
 
+# Metrics (histogram latency từng stage theo domain, tắt mặc định)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+METRICS_DIR = os.getenv('METRICS_DIR', 'logs/metrics')  # JSON snapshot cuối mỗi lần chạy
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))  # Endpoint Prometheus /metrics, 0 = tắt
+
 # Advanced Configuration
 MAX_ARTICLES_PER_CATEGORY = int(os.getenv('MAX_ARTICLES_PER_CATEGORY', 50))
+BACKFILL_MAX_PAGES = int(os.getenv('BACKFILL_MAX_PAGES', 50))  # --mode backfill
 CACHE_TTL = int(os.getenv('CACHE_TTL', 7776000))  # 90 days
+NEAR_DUPLICATE_ENABLED = os.getenv('NEAR_DUPLICATE_ENABLED', 'true').lower() == 'true'
+NEAR_DUPLICATE_MAX_DISTANCE = int(os.getenv('NEAR_DUPLICATE_MAX_DISTANCE', 3))  # SimHash bits
+NEAR_DUPLICATE_MIN_WORDS = int(os.getenv('NEAR_DUPLICATE_MIN_WORDS', 50))
 DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
 
 # Rate Limiting Configuration
 DEFAULT_RATE_LIMIT = int(os.getenv('DEFAULT_RATE_LIMIT', 30))
 DEFAULT_DELAY_BETWEEN_REQUESTS = int(os.getenv('DEFAULT_DELAY_BETWEEN_REQUESTS', 2))
+RATE_LIMIT_MAX_INTERVAL = float(os.getenv('RATE_LIMIT_MAX_INTERVAL', 60))  # Backoff tối đa (seconds)
+RATE_LIMIT_LATENCY_THRESHOLD = float(os.getenv('RATE_LIMIT_LATENCY_THRESHOLD', 3))  # Latency coi là chậm
+
+# Concurrency Configuration
+DEFAULT_CONCURRENCY = int(os.getenv('DEFAULT_CONCURRENCY', 4))
+MAX_PARALLEL_DOMAINS = int(os.getenv('MAX_PARALLEL_DOMAINS', 16))  # Domain chạy cùng lúc
+GLOBAL_MAX_IN_FLIGHT = int(os.getenv('GLOBAL_MAX_IN_FLIGHT', 32))  # Tổng request đang bay
+ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', 200))  # Crawler static_async
+ASYNC_MAX_CONNECTIONS = int(os.getenv('ASYNC_MAX_CONNECTIONS', 100))
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', 0))  # Process parse/clean, 0 = trong thread crawler
 
 # CDN Configuration
 CDN_UPLOAD_URL = os.getenv('CDN_UPLOAD_URL', 'https://upload.0x2labs.com/upload')
 CDN_API_KEY = os.getenv('CDN_API_KEY', '')
 CDN_BUCKET = os.getenv('CDN_BUCKET', 'images')
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', 4))  # Thumbnail upload workers
+CDN_CACHE_TTL = int(os.getenv('CDN_CACHE_TTL', CACHE_TTL))  # Dedup cache TTL
 
 
 def get_rate_limit_for_domain(domain: str) -> int:
@@ -69,3 +120,24 @@ def get_rate_limit_for_domain(domain: str) -> int:
     env_key = f'RATE_LIMIT_{domain_key}'
     
     return int(os.getenv(env_key, DEFAULT_RATE_LIMIT))
+
+
+def get_concurrency_for_domain(domain: str, default: int = None) -> int:
+    """
+    Get number of concurrent article workers for specific domain
+    
+    Args:
+        domain: Domain name (e.g., 'vnexpress.net', 'dantri.com.vn')
+        default: Value from domain config, used when env var is not set
+        
+    Returns:
+        Max concurrent workers (>= 1)
+    """
+    # Convert domain to env var format: vnexpress.net -> CONCURRENCY_VNEXPRESS
+    domain_key = domain.split('.')[0].upper()
+    env_key = f'CONCURRENCY_{domain_key}'
+    
+    if default is None:
+        default = DEFAULT_CONCURRENCY
+    
+    return max(1, int(os.getenv(env_key, default)))
@@ -0,0 +1,332 @@
+"""
+Async Static Crawler
+Crawler cho trang web tĩnh dùng asyncio + httpx.AsyncClient (HTTP/2)
+"""
+
+import time
+import asyncio
+import httpx
+from datetime import timedelta
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+from config import settings
+from engine.static_crawler import StaticCrawler
+from utils.http_session import create_async_client, is_html_content_type
+from utils.encoding import resolve_encoding
+from utils.rate_limiter import parse_retry_after
+from utils.metrics import stage_timer
+
+
+class AsyncStaticCrawler(StaticCrawler):
+    """
+    Crawler tĩnh chạy trên event loop (crawler_type: "static_async")
+    
+    Dùng chung config JSON và code extract với StaticCrawler; chỉ phần fetch
+    là async. Nhiều domain có thể chạy trong cùng một event loop và dùng chung
+    một httpx.AsyncClient (xem CrawlCoordinator), nên số request đang bay
+    không bị giới hạn bởi số thread. Parse/clean và ghi database (blocking)
+    được chạy trong thread pool của event loop.
+    """
+    
+    is_async = True
+    
+    def __init__(self, config: Dict, db_client, in_flight: asyncio.Semaphore = None):
+        """
+        Args:
+            config: Domain configuration từ JSON
+            db_client: Database client instance
+            in_flight: asyncio.Semaphore giới hạn tổng số request đang bay
+                trong event loop (optional)
+        """
+        super().__init__(config, db_client)
+        self.async_in_flight = in_flight
+    
+    def run(self, categories: Optional[List[str]] = None):
+        """Chạy crawler trong event loop riêng (client riêng)"""
+        asyncio.run(self.run_async(categories))
+    
+    async def run_async(self, categories: Optional[List[str]] = None, client: httpx.AsyncClient = None):
+        """
+        Chạy crawler cho các categories
+        
+        Trang danh sách được crawl tuần tự, các trang chi tiết được fetch đồng
+        thời, tối đa `self.max_workers` request cùng lúc cho domain này.
+        
+        Args:
+            categories: List of category slugs, None = all categories
+            client: httpx.AsyncClient dùng chung (optional)
+        """
+        if not self.config.get('enabled', True):
+            logger.warning(f"{self.name} crawler is disabled")
+            return
+        
+        owns_client = client is None
+        if owns_client:
+            client = create_async_client()
+        
+        try:
+            # Lần đầu có thể phải tải robots.txt (blocking): chạy ngoài event loop
+            categories = await asyncio.to_thread(self._start_run, categories)
+            
+            workers = asyncio.Semaphore(self.max_workers)
+            tasks = []
+            seen_links = set()
+            
+            for category in categories:
+                if self._stopped():
+                    break
+                
+                logger.info(f"Processing category: {category}")
+                
+                # Get article links
+                article_links = await self.crawl_list_page_async(client, category)
+                
+                # Pre-fetch dedup: chỉ fetch các link chưa crawl
+                new_links = await asyncio.to_thread(self.filter_new_links, article_links, seen_links)
+                
+                for link in new_links:
+                    if self._stopped():
+                        break
+                    tasks.append(asyncio.create_task(
+                        self._process_article_async(client, workers, link, category)
+                    ))
+            
+            # Đợi tất cả bài viết xử lý xong
+            await asyncio.gather(*tasks)
+        
+        finally:
+            if owns_client:
+                await client.aclose()
+        
+        await asyncio.to_thread(self._finish_run)
+    
+    async def crawl_list_page_async(self, client: httpx.AsyncClient, category: str) -> List[str]:
+        """
+        Crawl trang danh sách để lấy links bài viết
+        
+        Args:
+            client: httpx.AsyncClient
+            category: Category slug (e.g., 'thoi-su')
+            
+        Returns:
+            List of article URLs
+        """
+        list_url = self.get_list_url(category)
+        
+        logger.info(f"Crawling list page: {list_url}")
+        
+        html = await self.fetch_list_page_async(client, list_url, category)
+        if not html:
+            return []
+        
+        return await asyncio.to_thread(self.parse_list_page, html, list_url, category)
+    
+    async def fetch_list_page_async(self, client: httpx.AsyncClient, url: str, category: str) -> Optional[str]:
+        """Fetch trang danh sách bằng conditional GET (xem fetch_list_page)"""
+        stop_marker = self.config['list_page'].get('stop_marker')
+        if not self.http_cache:
+            return await self.fetch_page_async(client, url, stop_marker=stop_marker)
+        
+        self._increment_stat('list_pages')
+        # HTTP cache / watermark đọc file trên disk: chạy ngoài event loop
+        entry = await asyncio.to_thread(self._get_list_cache_entry, url, category)
+        
+        response = await self._request_async(
+            client, url, headers=self.http_cache.conditional_headers(entry), stop_marker=stop_marker
+        )
+        if response is None:
+            return None
+        
+        return await asyncio.to_thread(
+            self._handle_list_response, url, category, entry, response.status_code, response.headers, response.text
+        )
+    
+    async def _process_article_async(self, client: httpx.AsyncClient, workers: asyncio.Semaphore, link: str, category: str):
+        """Fetch, parse và lưu một bài viết (không để exception làm mất bài khác)"""
+        try:
+            # Chỉ giới hạn phần fetch theo max_workers của domain
+            async with workers:
+                # Bài còn xếp hàng khi crawl bị dừng: bỏ qua
+                if self._stopped():
+                    return
+                
+                self._increment_stat('total')
+                logger.info(f"Crawling article: {link}")
+                page = await self.fetch_page_content_async(
+                    client, link, stop_marker=self.config['detail_page'].get('stop_marker')
+                )
+            
+            article_data = None
+            if page and page[0]:
+                content, encoding = page
+                timings = self._new_timings()
+                if self.parse_pool:
+                    result = await asyncio.wrap_future(
+                        self.parse_pool.submit(self.config, content, link, encoding, timed=timings is not None)
+                    )
+                    article_data = self.parse_pool.unpack_result(result, timings)
+                else:
+                    article_data = await asyncio.to_thread(self.parse_article, content, link, encoding, timings)
+                self._observe_timings(timings)
+            
+            if not article_data:
+                self._record_failed_link(link)
+            await asyncio.to_thread(self._save_article, article_data, category)
+        
+        except Exception as e:
+            self._increment_stat('failed')
+            self._record_failed_link(link)
+            logger.error(f"Error processing article {link}: {e}")
+    
+    async def fetch_page_async(self, client: httpx.AsyncClient, url: str, retries: int = None, stop_marker: str = None) -> Optional[str]:
+        """
+        Fetch HTML content từ URL với retry logic
+        
+        Args:
+            client: httpx.AsyncClient
+            url: URL cần fetch
+            retries: Số lần retry
+            stop_marker: Ngừng tải body khi gặp chuỗi này (optional)
+            
+        Returns:
+            HTML content hoặc None nếu fail
+        """
+        response = await self._request_async(client, url, retries, stop_marker=stop_marker)
+        return response.text if response is not None else None
+    
+    async def fetch_page_content_async(self, client: httpx.AsyncClient, url: str, retries: int = None, stop_marker: str = None) -> Optional[Tuple[bytes, str]]:
+        """Fetch body chưa decode của URL (xem fetch_page_content)"""
+        response = await self._request_async(client, url, retries, stop_marker=stop_marker)
+        return (response.content, response.encoding) if response is not None else None
+    
+    async def _get_async(self, client: httpx.AsyncClient, url: str, headers: Dict = None, stop_marker: str = None) -> Optional[httpx.Response]:
+        """GET + đọc body, giữ một slot của async_in_flight trong lúc request"""
+        if self.async_in_flight is None:
+            return await self._get_timed_async(client, url, headers, stop_marker)
+        
+        async with self.async_in_flight:
+            return await self._get_timed_async(client, url, headers, stop_marker)
+    
+    async def _get_timed_async(self, client: httpx.AsyncClient, url: str, headers: Dict = None, stop_marker: str = None) -> Optional[httpx.Response]:
+        """_get_bounded_async trong stage 'fetch', exception được gắn `elapsed` (xem _get_timed)"""
+        start = time.time()
+        try:
+            with stage_timer('fetch', self.domain):
+                return await self._get_bounded_async(client, url, headers, stop_marker)
+        except httpx.HTTPError as e:
+            e.elapsed = time.time() - start
+            raise
+    
+    async def _get_bounded_async(self, client: httpx.AsyncClient, url: str, headers: Dict = None, stop_marker: str = None) -> Optional[httpx.Response]:
+        """
+        GET theo stream với Content-Type check và giới hạn body (xem _get_bounded)
+        
+        response.elapsed là thời gian tới lúc nhận header như requests (httpx
+        mặc định tính tới lúc đóng response, gồm cả thời gian tải body).
+        """
+        start = time.time()
+        response = await client.send(client.build_request('GET', url, headers=headers), stream=True)
+        headers_elapsed = timedelta(seconds=time.time() - start)
+        
+        try:
+            # Body của 304 / lỗi không cần đọc
+            if not 200 <= response.status_code < 300:
+                response._content = b''
+                return response
+            
+            if not is_html_content_type(response.headers.get('Content-Type')):
+                logger.warning(f"Skipping non-HTML content ({response.headers.get('Content-Type')}): {url}")
+                return None
+            
+            body = self._new_body(stop_marker)
+            async for chunk in response.aiter_bytes(self.STREAM_CHUNK_SIZE):
+                if body.feed(chunk):
+                    break
+        finally:
+            await response.aclose()
+            response.elapsed = headers_elapsed
+        
+        response._content = self._finish_body(url, body)
+        # Đặt encoding để response.text không phải đoán
+        response.encoding = resolve_encoding(self.domain, response.headers.get('Content-Type'), response._content)
+        return response
+    
+    async def _request_async(self, client: httpx.AsyncClient, url: str, retries: int = None, headers: Dict = None, stop_marker: str = None) -> Optional[httpx.Response]:
+        """
+        GET URL với robots.txt, rate limiting và retry logic (xem _request)
+        
+        Args:
+            client: httpx.AsyncClient
+            url: URL cần fetch
+            retries: Số lần retry
+            headers: Header bổ sung (e.g., conditional GET)
+            stop_marker: Ngừng tải body khi gặp chuỗi này (optional)
+            
+        Returns:
+            Response (2xx hoặc 304) hoặc None nếu fail / không phải HTML
+        """
+        if retries is None:
+            retries = settings.CRAWLER_MAX_RETRIES
+        
+        # Check robots.txt (có thể tải robots.txt / đọc cache trên disk: chạy ngoài event loop)
+        with stage_timer('robots', self.domain):
+            allowed = await asyncio.to_thread(self.robots_checker.can_fetch, url)
+        if not allowed:
+            logger.warning(f"Blocked by robots.txt: {url}")
+            return None
+        
+        for attempt in range(retries):
+            # Rate limiting (cả lần retry, để backoff có hiệu lực)
+            with stage_timer('rate_limit', self.domain):
+                await self.rate_limiter.wait_if_needed_async()
+            
+            try:
+                logger.debug(f"Fetching {url} (attempt {attempt + 1}/{retries})")
+                
+                response = await self._get_async(client, url, headers, stop_marker)
+                if response is None:
+                    return None
+                
+                # Latency tới lúc nhận header (xem _get_bounded_async)
+                self.rate_limiter.record_response(
+                    response.status_code,
+                    response.elapsed.total_seconds(),
+                    parse_retry_after(response.headers.get('Retry-After'))
+                )
+                
+                # httpx coi 304 là lỗi trong raise_for_status
+                if response.status_code == 304:
+                    logger.debug(f"Not modified: {url}")
+                    return response
+                
+                response.raise_for_status()
+                
+                logger.success(f"Successfully fetched: {url}")
+                return response
+            
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 403:
+                    logger.error(f"403 Forbidden: {url}")
+                    return None
+                elif e.response.status_code == 404:
+                    logger.warning(f"404 Not Found: {url}")
+                    return None
+                else:
+                    logger.error(f"HTTP Error {e.response.status_code}: {url}")
+            
+            except httpx.TimeoutException as e:
+                logger.warning(f"Timeout: {url}")
+                self.rate_limiter.record_response(None, e.elapsed)
+            
+            except httpx.HTTPError as e:
+                logger.error(f"Request error: {e}")
+                self.rate_limiter.record_response(None, e.elapsed)
+            
+            # Delay before retry
+            if attempt < retries - 1:
+                delay = settings.CRAWLER_RETRY_DELAY
+                logger.info(f"Retrying in {delay} seconds...")
+                await asyncio.sleep(delay)
+        
+        logger.error(f"Failed to fetch after {retries} attempts: {url}")
+        return None
@@ -4,29 +4,47 @@ Cung cấp các chức năng cơ bản cho tất cả crawler
 """
 
 import time
+import threading
 import requests
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional
-from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
 from loguru import logger
-from utils.rate_limiter import RateLimiter
+from utils.rate_limiter import RateLimiter, parse_retry_after
 from utils.robots_checker import RobotsChecker
+from utils.http_session import BoundedBody, create_session, is_html_content_type
+from utils.encoding import resolve_encoding, set_domain_encoding
 from utils.url_normalizer import URLNormalizer
 from utils.content_cleaner import ContentCleaner
+from utils.news_batch_writer import NewsBatchWriter
+from utils.metrics import get_metrics, observe, stage_timer
+from storage.http_cache import HTTPCache
+from storage.simhash_index import get_simhash_index
+from storage.watermarks import WatermarkStore
 from config import settings
 
 
 class BaseCrawler(ABC):
     """Base class cho tất cả crawler"""
     
-    def __init__(self, config: Dict, db_client):
+    # True nếu crawler chạy trên event loop (xem AsyncStaticCrawler)
+    is_async = False
+    
+    # Kích thước chunk khi đọc body theo stream
+    STREAM_CHUNK_SIZE = 64 * 1024
+    
+    def __init__(self, config: Dict, db_client, in_flight: threading.Semaphore = None):
         """
         Args:
             config: Domain configuration từ JSON
             db_client: Database client instance
+            in_flight: Semaphore giới hạn tổng số request đang bay giữa các
+                domain (optional, xem CrawlCoordinator)
         """
         self.config = config
         self.db_client = db_client
+        self.in_flight = in_flight
         self.domain = config['domain']
         self.name = config['name']
         
@@ -38,63 +56,160 @@ class BaseCrawler(ABC):
             requests_per_minute=rate_limit
         )
         self.robots_checker = RobotsChecker(self.domain)
+        
+        # Encoding cố định của domain (không cần đọc từ header / <meta>)
+        if config.get('encoding'):
+            set_domain_encoding(self.domain, config['encoding'])
         self.url_normalizer = URLNormalizer()
         self.content_cleaner = ContentCleaner()
         
+        # Concurrency: số worker fetch bài viết song song cho domain này
+        self.max_workers = settings.get_concurrency_for_domain(
+            self.domain,
+            config.get('concurrency', {}).get('max_workers')
+        )
+        
         # Session setup
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': settings.CRAWLER_USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-            'Accept-Language': 'vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        })
-        
-        # Statistics tracking
-        self.stats = {
+        self.session = create_session(pool_maxsize=self.max_workers)
+        
+        # Conditional GET cho trang danh sách
+        self.http_cache = HTTPCache() if settings.HTTP_CACHE_ENABLED else None
+        
+        # High-water mark của từng category: chỉ xử lý phần mới của trang danh sách
+        self.watermarks = WatermarkStore(self.domain) if settings.WATERMARK_ENABLED else None
+        self._pending_watermarks = {}
+        self._failed_links = set()
+        
+        # Validator mới của trang danh sách, lưu ở _finish_run (xem _handle_list_response)
+        self._pending_http_cache = {}
+        
+        # Phát hiện bài gần trùng giữa các nguồn (SimHash)
+        self.simhash_index = get_simhash_index() if settings.NEAR_DUPLICATE_ENABLED else None
+        
+        # Process pool cho parse/clean (optional, gán bởi CrawlCoordinator)
+        self.parse_pool = None
+        
+        # threading.Event báo dừng giữa chừng (optional, gán bởi CrawlCoordinator)
+        self.stop_event = None
+        
+        # Bulk insert mode: DB_BATCH_SIZE > 1 và db_client hỗ trợ batch
+        self.batch_size = settings.DB_BATCH_SIZE
+        self.batch_writer = None
+        
+        # Statistics tracking (được cập nhật từ nhiều worker thread)
+        self._stats_lock = threading.Lock()
+        self.stats = self._empty_stats()
+        
+        logger.info(f"Initialized {self.name} crawler ({self.max_workers} workers)")
+    
+    @staticmethod
+    def _empty_stats() -> Dict:
+        """Tạo dict thống kê rỗng"""
+        return {
             'new': 0,
             'duplicate': 0,
             'total': 0,
-            'failed': 0
+            'failed': 0,
+            'skipped': 0,
+            'list_pages': 0,
+            'not_modified': 0,
+            'cache_hits': 0,
+            'near_duplicate': 0,
+            'below_watermark': 0,
+            'older_than_since': 0,
+            'truncated': 0
         }
-        
-        logger.info(f"Initialized {self.name} crawler")
     
-    def fetch_page(self, url: str, retries: int = None) -> Optional[str]:
+    def _stopped(self) -> bool:
+        """Lần chạy đã được yêu cầu dừng (xem CrawlCoordinator.stop)"""
+        return self.stop_event is not None and self.stop_event.is_set()
+    
+    def _increment_stat(self, key: str, amount: int = 1):
+        """Tăng counter thống kê (thread-safe)"""
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+    
+    def fetch_page(self, url: str, retries: int = None, stop_marker: str = None) -> Optional[str]:
         """
         Fetch HTML content từ URL với retry logic
         
         Args:
             url: URL cần fetch
             retries: Số lần retry
+            stop_marker: Ngừng tải body khi gặp chuỗi này (optional)
             
         Returns:
             HTML content hoặc None nếu fail
         """
+        response = self._request(url, retries, stop_marker=stop_marker)
+        return response.text if response is not None else None
+    
+    def fetch_page_content(self, url: str, retries: int = None, stop_marker: str = None) -> Optional[Tuple[bytes, str]]:
+        """
+        Fetch body chưa decode của URL (parser tự decode theo encoding)
+        
+        Args:
+            url: URL cần fetch
+            retries: Số lần retry
+            stop_marker: Ngừng tải body khi gặp chuỗi này (optional)
+            
+        Returns:
+            (body bytes, encoding) hoặc None nếu fail
+        """
+        response = self._request(url, retries, stop_marker=stop_marker)
+        return (response.content, response.encoding) if response is not None else None
+    
+    def _request(self, url: str, retries: int = None, headers: Dict = None, stop_marker: str = None) -> Optional[requests.Response]:
+        """
+        GET URL với robots.txt, rate limiting và retry logic
+        
+        Body được đọc theo stream, tối đa MAX_PAGE_BYTES (xem _get).
+        
+        Args:
+            url: URL cần fetch
+            retries: Số lần retry
+            headers: Header bổ sung (e.g., conditional GET)
+            stop_marker: Ngừng tải body khi gặp chuỗi này (optional)
+            
+        Returns:
+            Response (2xx hoặc 304) hoặc None nếu fail / không phải HTML
+        """
         if retries is None:
             retries = settings.CRAWLER_MAX_RETRIES
-            
+        
         # Check robots.txt
-        if not self.robots_checker.can_fetch(url):
+        with stage_timer('robots', self.domain):
+            allowed = self.robots_checker.can_fetch(url)
+        if not allowed:
             logger.warning(f"Blocked by robots.txt: {url}")
             return None
         
-        # Rate limiting
-        self.rate_limiter.wait_if_needed()
-        
         for attempt in range(retries):
+            # Rate limiting (cả lần retry, để backoff có hiệu lực)
+            with stage_timer('rate_limit', self.domain):
+                self.rate_limiter.wait_if_needed()
+            
             try:
                 logger.debug(f"Fetching {url} (attempt {attempt + 1}/{retries})")
                 
-                response = self.session.get(url, timeout=settings.CRAWLER_TIMEOUT)
-                response.raise_for_status()
+                response = self._get(url, headers, stop_marker)
+                if response is None:
+                    return None
                 
-                logger.success(f"Successfully fetched: {url}")
-                return response.text
+                # Latency tới lúc nhận header, không gồm thời gian đợi slot in_flight / tải body
+                self.rate_limiter.record_response(
+                    response.status_code,
+                    response.elapsed.total_seconds(),
+                    parse_retry_after(response.headers.get('Retry-After'))
+                )
+                response.raise_for_status()
                 
+                if response.status_code == 304:
+                    logger.debug(f"Not modified: {url}")
+                else:
+                    logger.success(f"Successfully fetched: {url}")
+                return response
+            
             except requests.exceptions.HTTPError as e:
                 if e.response.status_code == 403:
                     logger.error(f"403 Forbidden: {url}")
@@ -104,12 +219,14 @@ class BaseCrawler(ABC):
                     return None
                 else:
                     logger.error(f"HTTP Error {e.response.status_code}: {url}")
-                    
-            except requests.exceptions.Timeout:
+            
+            except requests.exceptions.Timeout as e:
                 logger.warning(f"Timeout: {url}")
-                
+                self.rate_limiter.record_response(None, e.elapsed)
+            
             except requests.exceptions.RequestException as e:
                 logger.error(f"Request error: {e}")
+                self.rate_limiter.record_response(None, e.elapsed)
             
             # Delay before retry
             if attempt < retries - 1:
@@ -120,6 +237,177 @@ class BaseCrawler(ABC):
         logger.error(f"Failed to fetch after {retries} attempts: {url}")
         return None
     
+    def _get(self, url: str, headers: Dict = None, stop_marker: str = None) -> Optional[requests.Response]:
+        """session.get + đọc body, giữ một slot của in_flight trong lúc request"""
+        if self.in_flight is None:
+            return self._get_timed(url, headers, stop_marker)
+        
+        with self.in_flight:
+            return self._get_timed(url, headers, stop_marker)
+    
+    def _get_timed(self, url: str, headers: Dict = None, stop_marker: str = None) -> Optional[requests.Response]:
+        """
+        _get_bounded trong stage 'fetch'
+        
+        Exception của request được gắn `elapsed` (seconds từ lúc gửi request,
+        sau khi đã có slot in_flight) để _request báo cho rate limiter.
+        """
+        start = time.time()
+        try:
+            with stage_timer('fetch', self.domain):
+                return self._get_bounded(url, headers, stop_marker)
+        except requests.exceptions.RequestException as e:
+            e.elapsed = time.time() - start
+            raise
+    
+    def _get_bounded(self, url: str, headers: Dict = None, stop_marker: str = None) -> Optional[requests.Response]:
+        """
+        GET theo stream: kiểm tra Content-Type trước khi tải, đọc body tối đa
+        MAX_PAGE_BYTES hoặc tới stop_marker
+        
+        Returns:
+            Response (body đã đọc) hoặc None nếu không phải HTML
+        """
+        response = self.session.get(url, headers=headers, timeout=settings.CRAWLER_TIMEOUT, stream=True)
+        
+        # Body của 304 / lỗi không cần đọc
+        if not 200 <= response.status_code < 300:
+            response.close()
+            response._content = b''
+            response._content_consumed = True
+            return response
+        
+        if not is_html_content_type(response.headers.get('Content-Type')):
+            response.close()
+            logger.warning(f"Skipping non-HTML content ({response.headers.get('Content-Type')}): {url}")
+            return None
+        
+        body = self._new_body(stop_marker)
+        for chunk in response.iter_content(chunk_size=self.STREAM_CHUNK_SIZE):
+            if body.feed(chunk):
+                # Dừng giữa chừng: bỏ connection thay vì đọc nốt phần còn lại
+                response.close()
+                break
+        
+        response._content = self._finish_body(url, body)
+        response._content_consumed = True
+        # Đặt encoding để response.text không chạy charset detection
+        response.encoding = resolve_encoding(self.domain, response.headers.get('Content-Type'), response._content)
+        return response
+    
+    def _new_body(self, stop_marker: str = None) -> BoundedBody:
+        """Buffer body giới hạn MAX_PAGE_BYTES"""
+        return BoundedBody(
+            settings.MAX_PAGE_BYTES,
+            stop_marker.encode('utf-8') if stop_marker else None
+        )
+    
+    def _finish_body(self, url: str, body: BoundedBody) -> bytes:
+        """Log / thống kê body bị cắt, trả về bytes đã đọc"""
+        if body.truncated:
+            self._increment_stat('truncated')
+            logger.warning(f"Page exceeds {settings.MAX_PAGE_BYTES} bytes, truncated: {url}")
+        elif body.stopped_at_marker:
+            logger.debug(f"Stopped reading at marker after {len(body.buffer)} bytes: {url}")
+        
+        return body.content
+    
+    def fetch_list_page(self, url: str, category: str) -> Optional[str]:
+        """
+        Fetch trang danh sách bằng conditional GET
+        
+        Gửi If-None-Match / If-Modified-Since từ HTTP cache. Nếu server trả
+        304 hoặc vùng link giống hệt lần trước thì trang không có bài mới. Có
+        `list_page.stop_marker` thì chỉ tải tới marker (phần sau như footer /
+        sidebar không được tải); body hash chỉ tính trên vùng link của trang
+        (xem list_region).
+        
+        Args:
+            url: URL trang danh sách
+            category: Category slug của trang
+            
+        Returns:
+            HTML content, hoặc None nếu fail / không thay đổi
+        """
+        stop_marker = self.config['list_page'].get('stop_marker')
+        if not self.http_cache:
+            return self.fetch_page(url, stop_marker=stop_marker)
+        
+        self._increment_stat('list_pages')
+        entry = self._get_list_cache_entry(url, category)
+        
+        response = self._request(url, headers=self.http_cache.conditional_headers(entry), stop_marker=stop_marker)
+        if response is None:
+            return None
+        
+        return self._handle_list_response(url, category, entry, response.status_code, response.headers, response.text)
+    
+    def _get_list_cache_entry(self, url: str, category: str) -> Optional[Dict]:
+        """
+        Entry HTTP cache dùng cho conditional GET trang danh sách
+        
+        Category còn link lỗi cần thử lại (danh sách retry của watermark) thì
+        không dùng cache: trang phải được đọc lại dù không thay đổi.
+        
+        Args:
+            url: URL trang danh sách
+            category: Category slug của trang
+            
+        Returns:
+            Entry trong HTTP cache, hoặc None nếu chưa có / không dùng
+        """
+        entry = self.http_cache.get(url)
+        if entry and self.watermarks and self.watermarks.retry_urls(category):
+            logger.info(f"Failed links of {category} pending retry, ignoring HTTP cache: {url}")
+            return None
+        return entry
+    
+    def _handle_list_response(self, url: str, category: str, entry: Optional[Dict], status_code: int,
+                              headers, html: str) -> Optional[str]:
+        """
+        Xử lý response trang danh sách theo HTTP cache
+        
+        Validator mới chỉ được ghi nhớ (lưu ở _finish_run, cùng watermark): lần
+        chạy bị lỗi / dừng giữa chừng không làm lần sau bỏ qua category.
+        
+        Args:
+            url: URL trang danh sách
+            category: Category slug của trang
+            entry: Entry cũ trong HTTP cache (None nếu chưa có)
+            status_code: HTTP status
+            headers: Response headers (case-insensitive mapping)
+            html: Response body
+            
+        Returns:
+            HTML content, hoặc None nếu trang không thay đổi
+        """
+        from engine.extractor import list_region
+        
+        if status_code == 304:
+            self._increment_stat('not_modified')
+            logger.info(f"List page not modified (304): {url}")
+            return None
+        
+        # Chỉ hash vùng link (xem list_region): thay đổi ở <head> hay phần
+        # trước start_marker / sau stop_marker không làm trang bị parse lại
+        list_page = self.config['list_page']
+        body_hash = self.http_cache.hash_body(
+            list_region(html, list_page.get('start_marker'), list_page.get('stop_marker'))
+        )
+        self._pending_http_cache[category] = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'body_hash': body_hash
+        }
+        
+        if entry and entry.get('body_hash') == body_hash:
+            self._increment_stat('cache_hits')
+            logger.info(f"List page unchanged (same body): {url}")
+            return None
+        
+        return html
+    
     @abstractmethod
     def extract_article_links(self, html: str, base_url: str) -> List[str]:
         """
@@ -134,17 +422,35 @@ class BaseCrawler(ABC):
         """
         pass
     
+    def extract_list_page(self, html: str, base_url: str, page: int = 1) -> Tuple[List[str], Optional[str]]:
+        """
+        Trích xuất link bài viết và URL trang sau (pagination) từ trang danh sách
+        
+        Mặc định không hỗ trợ pagination, subclass override nếu có.
+        
+        Args:
+            html: HTML content
+            base_url: URL của trang
+            page: Số thứ tự của trang (1 = trang đầu)
+            
+        Returns:
+            (article URLs, URL trang sau hoặc None)
+        """
+        return self.extract_article_links(html, base_url), None
+    
     @abstractmethod
-    def extract_article_data(self, html: str, url: str) -> Optional[Dict]:
+    def extract_article_data(self, html: Union[str, bytes], url: str, encoding: str = None) -> Optional[Dict]:
         """
         Trích xuất dữ liệu từ trang chi tiết bài viết
         
         Args:
-            html: HTML content
+            html: HTML content (str hoặc bytes)
             url: Article URL
+            encoding: Encoding của html khi là bytes
             
         Returns:
-            Dictionary chứa dữ liệu bài viết hoặc None
+            Dictionary chứa dữ liệu bài viết hoặc None. 'content' có thể là
+            HTML string hoặc element đã parse (được ContentCleaner xử lý trực tiếp)
         """
         pass
     
@@ -158,22 +464,43 @@ class BaseCrawler(ABC):
         Returns:
             List of article URLs
         """
-        url_pattern = self.config['list_page']['url_pattern']
-        list_url = url_pattern.format(category=category)
+        list_url = self.get_list_url(category)
         
         logger.info(f"Crawling list page: {list_url}")
         
-        html = self.fetch_page(list_url)
+        html = self.fetch_list_page(list_url, category)
         if not html:
             return []
         
+        return self.parse_list_page(html, list_url, category)
+    
+    def get_list_url(self, category: str) -> str:
+        """URL trang danh sách của category"""
+        url_pattern = self.config['list_page']['url_pattern']
+        return url_pattern.format(category=category)
+    
+    def parse_list_page(self, html: str, list_url: str, category: str) -> List[str]:
+        """
+        Lấy links bài viết (đã normalize, giới hạn số lượng) từ HTML trang danh sách
+        
+        Args:
+            html: HTML content
+            list_url: URL trang danh sách
+            category: Category slug
+            
+        Returns:
+            List of article URLs
+        """
         article_links = self.extract_article_links(html, list_url)
         
         # Normalize URLs
-        normalized_links = [
-            self.url_normalizer.normalize(link) 
-            for link in article_links
-        ]
+        normalized_links = self._normalize_links(article_links)
+        
+        # Dừng ở phần đã thấy ở lần chạy trước
+        if self.watermarks:
+            normalized_links = list(dict.fromkeys(normalized_links))
+            page_links = normalized_links
+            normalized_links = self._cut_at_watermark(normalized_links, category)
         
         # Limit articles per category
         max_articles = settings.MAX_ARTICLES_PER_CATEGORY
@@ -181,9 +508,87 @@ class BaseCrawler(ABC):
             logger.info(f"Limiting to {max_articles} articles (found {len(normalized_links)})")
             normalized_links = normalized_links[:max_articles]
         
+        if self.watermarks:
+            self._set_pending_watermark(category, page_links, normalized_links)
+        
         logger.info(f"Found {len(normalized_links)} articles in {category}")
         return normalized_links
     
+    def _normalize_links(self, links: List[str]) -> List[str]:
+        """Normalize article URLs"""
+        return [
+            self.url_normalizer.normalize(link) 
+            for link in links
+        ]
+    
+    def _cut_at_watermark(self, links: List[str], category: str) -> List[str]:
+        """
+        Bỏ phần cuối trang danh sách đã được xử lý ở lần chạy trước
+        
+        Cắt tại chuỗi WATERMARK_STOP_AFTER link liên tiếp thuộc watermark (một
+        vài bài cũ được ghim đầu trang không làm dừng sớm). Link bị lỗi ở lần
+        trước (danh sách retry của watermark) được giữ lại dù nằm dưới chỗ cắt.
+        
+        Args:
+            links: Links đã normalize, theo thứ tự trên trang (mới nhất trước)
+            category: Category slug
+            
+        Returns:
+            Các link phía trên watermark, theo sau là các link cần thử lại
+        """
+        known = self.watermarks.known_urls(category)
+        if not known:
+            return links
+        
+        stop_after = min(settings.WATERMARK_STOP_AFTER, len(known))
+        streak = 0
+        
+        for i, link in enumerate(links):
+            if link not in known:
+                streak = 0
+                continue
+            
+            streak += 1
+            if streak >= stop_after:
+                cut = i - streak + 1
+                retry = self.watermarks.retry_urls(category)
+                retried = [link for link in links[cut:] if link in retry]
+                skipped = len(links) - cut - len(retried)
+                
+                self._increment_stat('below_watermark', skipped)
+                logger.info(
+                    f"Reached high-water mark of {category}: {cut} new links, "
+                    f"{len(retried)} failed links retried, {skipped} older links skipped"
+                )
+                return links[:cut] + retried
+        
+        return links
+    
+    def _set_pending_watermark(self, category: str, page_links: List[str], links: List[str]):
+        """
+        Ghi nhớ watermark mới của category (lưu ở _finish_run)
+        
+        Watermark chỉ gồm link đã xử lý: các link được trả về lần này (sau giới
+        hạn MAX_ARTICLES_PER_CATEGORY) và link của watermark cũ, theo thứ tự
+        trên trang.
+        
+        Args:
+            category: Category slug
+            page_links: Tất cả link trên trang danh sách (đã normalize, bỏ trùng)
+            links: Các link được trả về để xử lý
+        """
+        processed = set(links) | self.watermarks.known_urls(category)
+        self._pending_watermarks[category] = (
+            [link for link in page_links if link in processed][:settings.WATERMARK_SIZE],
+            links
+        )
+    
+    def _record_failed_link(self, link: Optional[str]):
+        """Link lỗi không được đưa vào watermark mà vào danh sách retry (xem _finish_run)"""
+        if link:
+            with self._stats_lock:
+                self._failed_links.add(link)
+    
     def crawl_article(self, url: str) -> Optional[Dict]:
         """
         Crawl chi tiết một bài viết
@@ -196,18 +601,60 @@ class BaseCrawler(ABC):
         """
         logger.info(f"Crawling article: {url}")
         
-        html = self.fetch_page(url)
-        if not html:
+        page = self.fetch_page_content(url, stop_marker=self.config['detail_page'].get('stop_marker'))
+        if not page or not page[0]:
             return None
         
-        article_data = self.extract_article_data(html, url)
+        # Body được chuyển thẳng cho parser dưới dạng bytes (decode một lần)
+        content, encoding = page
+        timings = self._new_timings()
+        if self.parse_pool:
+            article_data = self.parse_pool.parse_article(self.config, content, url, encoding, timings)
+        else:
+            article_data = self.parse_article(content, url, encoding, timings)
+        
+        self._observe_timings(timings)
+        return article_data
+    
+    @staticmethod
+    def _new_timings() -> Optional[Dict[str, float]]:
+        """Dict nhận thời gian parse / clean, None khi metrics bị tắt"""
+        return {} if get_metrics() is not None else None
+    
+    def _observe_timings(self, timings: Optional[Dict[str, float]]):
+        """Ghi thời gian parse / clean đo trong parse_article vào metrics"""
+        for stage, seconds in (timings or {}).items():
+            observe(stage, self.domain, seconds)
+    
+    def parse_article(self, html: Union[str, bytes], url: str, encoding: str = None,
+                      timings: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+        """
+        Extract và clean dữ liệu bài viết từ HTML trang chi tiết
+        
+        Args:
+            html: HTML content (str hoặc bytes)
+            url: Article URL
+            encoding: Encoding của html khi là bytes
+            timings: Dict nhận thời gian (seconds) của 'parse' và 'clean' (optional)
+            
+        Returns:
+            Article data dictionary hoặc None
+        """
+        start = time.perf_counter()
+        article_data = self.extract_article_data(html, url, encoding)
+        if timings is not None:
+            timings['parse'] = time.perf_counter() - start
         
         if article_data:
             # Clean content with source name for special handling
+            # (content có thể là element đã parse, cleaner serialize một lần)
+            start = time.perf_counter()
             article_data['content'] = self.content_cleaner.clean(
                 article_data['content'],
                 source_name=self.name
             )
+            if timings is not None:
+                timings['clean'] = time.perf_counter() - start
             
             # Add metadata
             article_data['source_url'] = url
@@ -217,71 +664,426 @@ class BaseCrawler(ABC):
         
         return article_data
     
+    def filter_new_links(self, links: List[str], seen: Optional[set] = None) -> List[str]:
+        """
+        Lọc duplicate trước khi fetch trang chi tiết
+        
+        Tra cứu một lần cho cả batch link trong crawled-URL store, chỉ các URL
+        chưa từng crawl mới được gửi cho fetcher.
+        
+        Args:
+            links: Article URLs đã normalize từ crawl_list_page
+            seen: Các URL đã được submit trong lần chạy này (được cập nhật)
+            
+        Returns:
+            List các URL mới cần fetch
+        """
+        if seen is None:
+            seen = set()
+        
+        # Bỏ link trùng trong cùng trang / đã gặp ở category khác
+        candidates = [link for link in dict.fromkeys(links) if link not in seen]
+        seen.update(candidates)
+        
+        if not candidates:
+            return []
+        
+        try:
+            with stage_timer('dedup', self.domain):
+                new_links = self.db_client.filter_uncrawled(candidates)
+        except Exception as e:
+            logger.warning(f"Pre-fetch duplicate check failed, fetching all links: {e}")
+            new_links = candidates
+        
+        skipped = len(candidates) - len(new_links)
+        if skipped:
+            self._increment_stat('skipped', skipped)
+            self._increment_stat('duplicate', skipped)
+            self._increment_stat('total', skipped)
+            logger.info(f"Skipped {skipped} already crawled links ({len(new_links)} new)")
+        
+        return new_links
+    
+    def process_article(self, link: str, category: str, since: Optional[date] = None) -> Optional[Dict]:
+        """
+        Crawl và lưu một bài viết
+        
+        Link đã được lọc duplicate trước khi fetch (xem filter_new_links),
+        create_news vẫn kiểm tra lại trước khi INSERT. Khi bulk insert bật,
+        bài viết được đưa vào batch_writer và stats được cập nhật lúc flush.
+        
+        Được gọi từ worker thread nên chỉ cập nhật stats qua _increment_stat
+        
+        Args:
+            link: Article URL (đã normalize)
+            category: Category slug của trang danh sách
+            since: Không lưu bài có published_date trước ngày này (backfill)
+            
+        Returns:
+            Article data (None nếu fail; vẫn trả về bài cũ hơn `since` dù
+            không lưu)
+        """
+        from engine.extractor import parse_published_date
+        
+        self._increment_stat('total')
+        
+        # Crawl article
+        article_data = self.crawl_article(link)
+        if not article_data:
+            self._record_failed_link(link)
+        elif since:
+            # Bài không đọc được ngày vẫn được lưu
+            published = parse_published_date(article_data.get('published_date'))
+            if published and published < since:
+                self._increment_stat('older_than_since')
+                logger.debug(f"Published {published}, before {since}, not saving: {link}")
+                return article_data
+        
+        self._save_article(article_data, category)
+        return article_data
+    
+    def _save_article(self, article_data: Optional[Dict], category: str):
+        """
+        Map category và lưu bài viết (trực tiếp hoặc qua batch_writer)
+        
+        Args:
+            article_data: Kết quả crawl_article (None nếu fail)
+            category: Category slug của trang danh sách
+        """
+        if not article_data:
+            self._increment_stat('failed')
+            return
+        
+        # Cùng một tin đã được lưu từ nguồn khác
+        if self.simhash_index:
+            with stage_timer('near_dedup', self.domain):
+                fingerprint, match = self.simhash_index.check(article_data['content'], article_data['source_url'])
+            if match:
+                self._increment_stat('near_duplicate')
+                self._increment_stat('duplicate')
+                logger.info(
+                    f"Near-duplicate of {match[0]} (distance {match[1]}): {article_data['source_url']}"
+                )
+                # Đánh dấu đã crawl để lần sau không fetch / parse lại
+                self.db_client.duplicate_checker.mark_crawled(article_data['source_url'])
+                return
+            
+            # Fingerprint được add vào index khi lưu thành công (_on_article_saved)
+            article_data['simhash'] = fingerprint
+        
+        # Map category
+        xwise_category = self.config['category_mapping'].get(category)
+        article_data['category_code'] = xwise_category
+        
+        # Push to database (hoặc vào batch nếu đang bulk insert)
+        if self.batch_writer:
+            self.batch_writer.add(article_data)
+            return
+        
+        with stage_timer('db_insert', self.domain):
+            success = self.db_client.create_news(article_data)
+        self._on_article_saved(article_data, success)
+    
+    def _on_article_saved(self, article_data: Dict, success: bool):
+        """Cập nhật stats sau khi insert (trực tiếp hoặc khi batch flush)"""
+        from utils.console import Console
+        
+        if success:
+            self._increment_stat('new')
+            Console.article(article_data['title'], status="new")
+            
+            if self.simhash_index and article_data.get('simhash') is not None:
+                self.simhash_index.add(article_data['simhash'], article_data['source_url'])
+        else:
+            self._increment_stat('failed')
+            self._record_failed_link(article_data.get('source_url'))
+    
+    def _process_article_safe(self, link: str, category: str, since: Optional[date] = None) -> Optional[Dict]:
+        """Wrapper cho worker thread: không để exception làm mất bài khác"""
+        # Bài còn xếp hàng khi crawl bị dừng: bỏ qua
+        if self._stopped():
+            return None
+        
+        try:
+            return self.process_article(link, category, since)
+        except Exception as e:
+            self._increment_stat('failed')
+            self._record_failed_link(link)
+            logger.error(f"Error processing article {link}: {e}")
+            return None
+    
     def run(self, categories: Optional[List[str]] = None):
         """
         Chạy crawler cho các categories
         
+        Trang danh sách được crawl tuần tự, còn các trang chi tiết được fetch
+        song song bởi một pool gồm `self.max_workers` worker. Rate limiter và
+        robots.txt vẫn được áp dụng cho từng request trong fetch_page.
+        
         Args:
             categories: List of category slugs, None = all categories
         """
-        from utils.console import Console
+        if not self.config.get('enabled', True):
+            logger.warning(f"{self.name} crawler is disabled")
+            return
+        
+        categories = self._start_run(categories)
+        
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"crawler-{self.domain}"
+        ) as executor:
+            futures = []
+            seen_links = set()
+            
+            for category in categories:
+                if self._stopped():
+                    break
+                
+                logger.info(f"Processing category: {category}")
+                
+                # Get article links
+                article_links = self.crawl_list_page(category)
+                
+                # Pre-fetch dedup: chỉ fetch các link chưa crawl
+                new_links = self.filter_new_links(article_links, seen_links)
+                
+                for link in new_links:
+                    if self._stopped():
+                        break
+                    futures.append(
+                        executor.submit(self._process_article_safe, link, category)
+                    )
+            
+            # Đợi tất cả bài viết xử lý xong
+            wait(futures)
         
+        self._finish_run()
+    
+    def run_backfill(self, categories: Optional[List[str]] = None, max_pages: int = None, since: Optional[date] = None):
+        """
+        Crawl lịch sử của các categories theo pagination (selector `pagination`)
+        
+        Mỗi category đi tối đa `max_pages` trang; trang sau được prefetch trong
+        lúc các bài của trang hiện tại đang xử lý. Dừng sớm khi một trang (từ
+        trang 2) toàn bài đã crawl, hoặc khi mọi bài của trang cũ hơn `since`;
+        bài cũ hơn `since` trên các trang đã đi (trang ranh giới, trang lẫn
+        nhiều ngày) không được lưu. Không dùng HTTP cache, watermark và giới
+        hạn MAX_ARTICLES_PER_CATEGORY.
+        
+        Args:
+            categories: List of category slugs, None = all categories
+            max_pages: Số trang tối đa mỗi category (mặc định BACKFILL_MAX_PAGES)
+            since: Chỉ lấy bài từ ngày này trở đi (theo published_date)
+        """
         if not self.config.get('enabled', True):
             logger.warning(f"{self.name} crawler is disabled")
             return
         
+        max_pages = max_pages or settings.BACKFILL_MAX_PAGES
+        categories = self._start_run(categories)
+        
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"crawler-{self.domain}"
+        ) as executor, ThreadPoolExecutor(
+            max_workers=1,
+            thread_name_prefix=f"prefetch-{self.domain}"
+        ) as prefetcher:
+            futures = []
+            seen_links = set()
+            
+            for category in categories:
+                if self._stopped():
+                    break
+                
+                logger.info(f"Backfilling category: {category} (up to {max_pages} pages)")
+                futures.extend(self._backfill_category(
+                    executor, prefetcher, category, max_pages, since, seen_links
+                ))
+            
+            # Đợi tất cả bài viết xử lý xong
+            wait(futures)
+        
+        self._finish_run()
+        
+        if since:
+            logger.info(f"{self.name} backfill: {self.stats['older_than_since']} articles older than {since} not saved")
+    
+    def _backfill_category(self, executor: ThreadPoolExecutor, prefetcher: ThreadPoolExecutor,
+                           category: str, max_pages: int, since: Optional[date], seen_links: set) -> List:
+        """
+        Đi qua các trang danh sách của một category
+        
+        Returns:
+            Futures của các bài viết đã submit
+        """
+        from engine.extractor import parse_published_date
+        
+        url = self.get_list_url(category)
+        visited = {url}
+        stop_marker = self.config['list_page'].get('stop_marker')
+        page_future = prefetcher.submit(self.fetch_page, url, stop_marker=stop_marker)
+        futures = []
+        page = 1
+        pages_done = 0
+        
+        while page_future is not None:
+            html = page_future.result()
+            page_future = None
+            if not html or self._stopped():
+                break
+            pages_done = page
+            
+            links, next_url = self.extract_list_page(html, url, page)
+            links = self._normalize_links(links)
+            
+            # Prefetch trang sau trong lúc xử lý bài của trang này
+            if next_url and page < max_pages and next_url not in visited:
+                visited.add(next_url)
+                page_future = prefetcher.submit(self.fetch_page, next_url, stop_marker=stop_marker)
+            
+            new_links = self.filter_new_links(links, seen_links)
+            logger.info(f"{category} page {page}: {len(new_links)}/{len(links)} new articles")
+            
+            # Trang đầu thường đã được crawl định kỳ, từ trang 2 mới dừng
+            if not new_links and page > 1:
+                logger.info(f"{category} page {page} has no new articles, stopping backfill")
+                break
+            
+            page_futures = []
+            for link in new_links:
+                if self._stopped():
+                    break
+                page_futures.append(executor.submit(self._process_article_safe, link, category, since))
+            futures.extend(page_futures)
+            
+            if since and page_future is not None:
+                # Cần published_date của cả trang để biết đã qua mốc `since` chưa
+                # (chỉ là điều kiện dừng, từng bài đã được lọc trong process_article)
+                wait(page_futures)
+                dates = [
+                    parse_published_date(future.result().get('published_date'))
+                    for future in page_futures if future.result()
+                ]
+                dates = [published for published in dates if published]
+                if dates and max(dates) < since:
+                    logger.info(f"{category} page {page} is older than {since}, stopping backfill")
+                    break
+            
+            url = next_url
+            page += 1
+        
+        if page_future is not None:
+            page_future.cancel()
+        
+        logger.info(f"Backfilled {pages_done} pages of {category}")
+        return futures
+    
+    def _start_run(self, categories: Optional[List[str]]) -> List[str]:
+        """
+        Chuẩn bị một lần chạy: reset stats, Crawl-delay, batch writer
+        
+        Args:
+            categories: List of category slugs, None = all categories
+            
+        Returns:
+            List category cần crawl
+        """
         logger.info(f"Starting {self.name} crawler")
         
         # Reset stats
-        self.stats = {
-            'new': 0,
-            'duplicate': 0,
-            'total': 0,
-            'failed': 0
-        }
+        with self._stats_lock:
+            self.stats = self._empty_stats()
+            self._pending_watermarks = {}
+            self._failed_links = set()
+            self._pending_http_cache = {}
+        
+        # Crawl-delay từ robots.txt (load lazy, một lần mỗi lần chạy)
+        self.rate_limiter.set_crawl_delay(self.robots_checker.get_crawl_delay())
         
         # Get categories to crawl
         if categories is None:
             categories = list(self.config['category_mapping'].keys())
         
-        for category in categories:
-            logger.info(f"Processing category: {category}")
-            
-            # Get article links
-            article_links = self.crawl_list_page(category)
-            
-            for link in article_links:
-                self.stats['total'] += 1
-                
-                # Crawl article
-                article_data = self.crawl_article(link)
-                
-                if not article_data:
-                    self.stats['failed'] += 1
-                    continue
-                
-                # Map category
-                xwise_category = self.config['category_mapping'].get(category)
-                article_data['category_code'] = xwise_category
-                
-                # Check if duplicate before pushing
-                source_url = article_data.get('source_url')
-                if source_url and self.db_client.check_duplicate(source_url):
-                    self.stats['duplicate'] += 1
-                    Console.article(article_data['title'], status="duplicate")
-                    continue
-                
-                # Push to database
-                success = self.db_client.create_news(article_data)
-                
-                if success:
-                    self.stats['new'] += 1
-                    Console.article(article_data['title'], status="new")
-                else:
-                    self.stats['failed'] += 1
+        if self.batch_size > 1 and hasattr(self.db_client, 'create_news_batch'):
+            self.batch_writer = NewsBatchWriter(
+                self.db_client,
+                batch_size=self.batch_size,
+                on_result=self._on_article_saved,
+                domain=self.domain
+            )
+        
+        return categories
+    
+    def _finish_run(self):
+        """Kết thúc một lần chạy: flush batch và log thống kê"""
+        # Flush các bài còn trong batch
+        if self.batch_writer:
+            self.batch_writer.close()
+            self.batch_writer = None
+        
+        # Lần chạy bị dừng giữa chừng: category chưa xử lý xong, không lưu
+        # watermark / HTTP cache để lần sau xử lý lại trang danh sách
+        if self._stopped():
+            logger.warning(f"{self.name} crawler stopped, high-water marks and HTTP cache not updated")
+            self._pending_watermarks = {}
+            self._pending_http_cache = {}
+        
+        # Lưu high-water mark mới: link lỗi không vào watermark mà vào danh
+        # sách retry, lần sau được xử lý lại dù nằm dưới watermark
+        if self.watermarks and self._pending_watermarks:
+            failed = self._failed_links
+            self.watermarks.update(
+                {
+                    category: [link for link in marks if link not in failed]
+                    for category, (marks, _) in self._pending_watermarks.items()
+                },
+                retries={
+                    category: [link for link in links if link in failed]
+                    for category, (_, links) in self._pending_watermarks.items()
+                }
+            )
+        
+        # Lưu validator của trang danh sách sau watermark: lần sau trang không
+        # đổi (304 / cùng body hash) thì mới được bỏ qua
+        if self.http_cache:
+            for entry in self._pending_http_cache.values():
+                self.http_cache.update(**entry)
         
         logger.info(
             f"{self.name} crawler finished: "
-            f"{self.stats['new']} new, {self.stats['duplicate']} duplicates, "
+            f"{self.stats['new']} new, {self.stats['duplicate']} duplicates "
+            f"({self.stats['skipped']} skipped before fetch, "
+            f"{self.stats['near_duplicate']} near-duplicates, "
+            f"{self.stats['below_watermark']} below high-water mark), "
             f"{self.stats['failed']} failed out of {self.stats['total']} total"
         )
+        
+        # Bloom filter trước crawled-URL check (thống kê cho cả process)
+        bloom_stats = self.db_client.duplicate_checker.bloom_stats()
+        if bloom_stats:
+            self.stats['bloom_false_positive_rate'] = bloom_stats['false_positive_rate']
+            self.stats['bloom_memory_bytes'] = bloom_stats['memory_bytes']
+            logger.info(
+                f"Bloom filter: {bloom_stats['items']} URLs, "
+                f"{bloom_stats['memory_bytes'] / 1024 / 1024:.1f} MB, "
+                f"false positive rate {bloom_stats['false_positive_rate']:.2%} "
+                f"(estimated {bloom_stats['estimated_false_positive_rate']:.2%}), "
+                f"{bloom_stats['redis_checks_saved']} Redis checks saved"
+            )
+            self.db_client.duplicate_checker.save_bloom_snapshot()
+        
+        if self.stats['list_pages']:
+            unchanged = self.stats['not_modified'] + self.stats['cache_hits']
+            logger.info(
+                f"{self.name} list pages: {unchanged}/{self.stats['list_pages']} unchanged "
+                f"({self.stats['not_modified']} not modified, {self.stats['cache_hits']} cache hits, "
+                f"{unchanged / self.stats['list_pages']:.0%} hit rate)"
+            )
+        
+        # Latency từng stage (tích lũy từ lúc process start)
+        metrics = get_metrics()
+        if metrics:
+            logger.info(f"{self.name} stage timings: {metrics.summary(self.domain)}")
+            metrics.write_snapshot(self.domain, stats=dict(self.stats))
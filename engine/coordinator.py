@@ -0,0 +1,288 @@
+"""
+Crawl Coordinator
+Chạy nhiều domain song song với giới hạn tổng số request đang bay
+"""
+
+import asyncio
+import threading
+from datetime import date
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+from loguru import logger
+from config import settings
+from engine.base_crawler import BaseCrawler
+from engine.static_crawler import StaticCrawler
+from engine.async_static_crawler import AsyncStaticCrawler
+from engine.parse_pool import ParsePool
+from utils.http_session import create_async_client
+
+
+# crawler_type trong domain config -> crawler class
+CRAWLER_TYPES = {
+    'static': StaticCrawler,
+    'static_async': AsyncStaticCrawler
+}
+
+
+def create_crawler(config: Dict, db_client, in_flight=None) -> Optional[BaseCrawler]:
+    """
+    Tạo crawler theo crawler_type của domain config
+    
+    Args:
+        config: Domain configuration
+        db_client: Database client instance
+        in_flight: Semaphore giới hạn request đang bay (dùng chung);
+            threading.Semaphore cho crawler thường, asyncio.Semaphore cho
+            crawler async
+        
+    Returns:
+        Crawler instance hoặc None nếu crawler_type không được hỗ trợ
+    """
+    crawler_type = config.get('crawler_type', 'static')
+    crawler_class = CRAWLER_TYPES.get(crawler_type)
+    
+    if crawler_class is None:
+        logger.warning(f"Unsupported crawler type: {crawler_type}")
+        return None
+    
+    return crawler_class(config, db_client, in_flight=in_flight)
+
+
+def is_async_crawler(config: Dict) -> bool:
+    """Domain config có dùng crawler async (event loop) không"""
+    crawler_class = CRAWLER_TYPES.get(config.get('crawler_type', 'static'))
+    return crawler_class is not None and crawler_class.is_async
+
+
+class CrawlCoordinator:
+    """
+    Điều phối crawl nhiều domain cùng lúc
+    
+    Mỗi domain chạy trong một thread riêng với rate limiter / robots.txt /
+    worker pool của chính nó; tất cả dùng chung một semaphore giới hạn tổng số
+    request HTTP đang bay (GLOBAL_MAX_IN_FLIGHT). Các domain "static_async"
+    chạy chung một event loop với giới hạn riêng (ASYNC_MAX_IN_FLIGHT). Một domain không bao giờ
+    chạy chồng lên chính nó (scheduled job đến khi lần trước chưa xong sẽ
+    bị bỏ qua).
+    """
+    
+    def __init__(self, db_client, configs: List[Dict] = None, max_in_flight: int = None, max_domains: int = None):
+        """
+        Args:
+            db_client: Database client dùng chung cho mọi domain
+            configs: Các domain sẽ chạy qua submit / run_domain (preload
+                trong parse pool, e.g. mọi domain của scheduler)
+            max_in_flight: Tổng số request đang bay tối đa
+            max_domains: Số domain chạy cùng lúc tối đa
+        """
+        self.db_client = db_client
+        self.configs = configs or []
+        self.max_in_flight = max_in_flight or settings.GLOBAL_MAX_IN_FLIGHT
+        self.in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_domains or settings.MAX_PARALLEL_DOMAINS,
+            thread_name_prefix="domain"
+        )
+        self._running = set()
+        self._lock = threading.Lock()
+        
+        # Được set khi dừng giữa chừng (stop), crawler kiểm tra trước mỗi bài
+        self._stop = threading.Event()
+        
+        # Process pool parse/clean dùng chung, tạo khi chạy lần đầu
+        self.parse_pool: Optional[ParsePool] = None
+    
+    def _ensure_parse_pool(self, configs: List[Dict]) -> Optional[ParsePool]:
+        """Tạo ParsePool (preload configs) nếu PARSE_WORKERS > 0"""
+        if settings.PARSE_WORKERS <= 0:
+            return None
+        
+        with self._lock:
+            if self.parse_pool is None:
+                self.parse_pool = ParsePool(configs)
+            return self.parse_pool
+    
+    def _acquire(self, config: Dict) -> bool:
+        """Đánh dấu domain đang chạy, False nếu lần chạy trước chưa xong"""
+        with self._lock:
+            if config['domain'] in self._running:
+                logger.warning(f"{config['name']} is still running, skipping")
+                return False
+            self._running.add(config['domain'])
+            return True
+    
+    def _release(self, config: Dict):
+        """Bỏ đánh dấu domain đang chạy"""
+        with self._lock:
+            self._running.discard(config['domain'])
+    
+    def run_domain(self, config: Dict, backfill: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Crawl một domain (blocking)
+        
+        Crawler async chạy trong event loop riêng của thread hiện tại.
+        
+        Args:
+            config: Domain configuration
+            backfill: Tham số của crawler.run_backfill (max_pages, since),
+                None = crawl thường
+            
+        Returns:
+            Stats của crawler, None nếu bị bỏ qua hoặc lỗi
+        """
+        if not self._acquire(config):
+            return None
+        
+        try:
+            in_flight = None if is_async_crawler(config) else self.in_flight
+            
+            crawler = create_crawler(config, self.db_client, in_flight=in_flight)
+            if crawler is None:
+                return None
+            
+            crawler.parse_pool = self._ensure_parse_pool(self.configs or [config])
+            crawler.stop_event = self._stop
+            if backfill is not None:
+                crawler.run_backfill(**backfill)
+            else:
+                crawler.run()
+            return dict(crawler.stats)
+        
+        except Exception as e:
+            logger.error(f"Error crawling {config['name']}: {e}")
+            logger.exception(e)
+            return None
+        
+        finally:
+            self._release(config)
+    
+    def run_async_group(self, configs: List[Dict]) -> Dict[str, Optional[Dict]]:
+        """
+        Crawl các domain async trong một event loop, dùng chung một
+        httpx.AsyncClient và một giới hạn ASYNC_MAX_IN_FLIGHT (blocking)
+        
+        Args:
+            configs: Domain configurations có crawler async
+            
+        Returns:
+            Dict domain name -> stats
+        """
+        configs = [config for config in configs if self._acquire(config)]
+        
+        try:
+            return asyncio.run(self._crawl_async(configs))
+        finally:
+            for config in configs:
+                self._release(config)
+    
+    async def _crawl_async(self, configs: List[Dict]) -> Dict[str, Optional[Dict]]:
+        """Chạy song song các crawler async trên event loop hiện tại"""
+        in_flight = asyncio.Semaphore(settings.ASYNC_MAX_IN_FLIGHT)
+        crawlers = [create_crawler(config, self.db_client, in_flight=in_flight) for config in configs]
+        for crawler in crawlers:
+            crawler.parse_pool = self.parse_pool
+            crawler.stop_event = self._stop
+        
+        async with create_async_client() as client:
+            results = await asyncio.gather(
+                *(crawler.run_async(client=client) for crawler in crawlers),
+                return_exceptions=True
+            )
+        
+        stats = {}
+        for config, crawler, result in zip(configs, crawlers, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error crawling {config['name']}: {result}")
+                stats[config['name']] = None
+            else:
+                stats[config['name']] = dict(crawler.stats)
+        return stats
+    
+    def submit(self, config: Dict) -> Future:
+        """
+        Crawl một domain trong background thread
+        
+        Args:
+            config: Domain configuration
+            
+        Returns:
+            Future trả về stats (xem run_domain)
+        """
+        return self._executor.submit(self.run_domain, config)
+    
+    def run_all(self, configs: List[Dict]) -> Dict[str, Optional[Dict]]:
+        """
+        Crawl tất cả domain song song và đợi tất cả xong
+        
+        Mỗi domain thường chạy trong một thread; các domain async chạy chung
+        một thread với một event loop (run_async_group).
+        
+        Args:
+            configs: Domain configurations (đã lọc enabled)
+            
+        Returns:
+            Dict domain name -> stats
+        """
+        self._ensure_parse_pool(configs)
+        async_configs = [config for config in configs if is_async_crawler(config)]
+        
+        futures = {
+            config['name']: self.submit(config)
+            for config in configs if config not in async_configs
+        }
+        if async_configs:
+            # Tất cả domain async chạy chung một thread / event loop
+            async_future = self._executor.submit(self.run_async_group, async_configs)
+        
+        wait(futures.values())
+        results = {name: future.result() for name, future in futures.items()}
+        if async_configs:
+            results.update(async_future.result())
+        
+        # Giữ thứ tự như configs
+        return {config['name']: results.get(config['name']) for config in configs}
+    
+    def run_backfill(self, configs: List[Dict], max_pages: int = None, since: Optional[date] = None) -> Dict[str, Optional[Dict]]:
+        """
+        Backfill tất cả domain song song (theo pagination) và đợi tất cả xong
+        
+        Backfill dùng đường fetch đồng bộ nên mọi domain (kể cả async) chạy
+        trong thread riêng.
+        
+        Args:
+            configs: Domain configurations (đã lọc enabled)
+            max_pages: Số trang tối đa mỗi category
+            since: Chỉ lấy bài từ ngày này trở đi
+            
+        Returns:
+            Dict domain name -> stats
+        """
+        self._ensure_parse_pool(configs)
+        backfill = {'max_pages': max_pages, 'since': since}
+        
+        futures = {
+            config['name']: self._executor.submit(self.run_domain, config, backfill)
+            for config in configs
+        }
+        wait(futures.values())
+        
+        return {name: future.result() for name, future in futures.items()}
+    
+    def stop(self):
+        """
+        Dừng crawl giữa chừng (e.g. Ctrl+C)
+        
+        Domain chưa bắt đầu bị huỷ; crawler đang chạy không lấy thêm trang /
+        bài mới, các bài đã xếp hàng được bỏ qua, chỉ các bài đang xử lý chạy
+        nốt.
+        """
+        self._stop.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def shutdown(self):
+        """Đợi các domain đang chạy xong rồi dừng thread pool và parse pool"""
+        self._executor.shutdown(wait=True)
+        
+        if self.parse_pool:
+            self.parse_pool.close()
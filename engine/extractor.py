@@ -0,0 +1,441 @@
+"""
+Article Extractor
+Trích xuất links / dữ liệu bài viết từ HTML theo selectors trong domain config
+"""
+
+import re
+import time
+import threading
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
+from lxml import etree
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from cssselect import SelectorError
+from urllib.parse import urljoin, urlsplit
+from loguru import logger
+from utils.content_cleaner import ContentCleaner
+
+
+# Text của link "trang sau" trong pagination
+NEXT_PAGE_TEXTS = {'›', '»', '>', 'sau', 'trang sau', 'tiếp', 'next', 'next page'}
+
+_DMY_DATE_RE = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+_ISO_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+_BODY_TAG_RE = re.compile(r'<body\b', re.IGNORECASE)
+_BODY_TAG_BYTES_RE = re.compile(rb'<body\b', re.IGNORECASE)
+
+# href mà urljoin không làm thay đổi gì ngoài việc ghép origin: URL http(s)
+# tuyệt đối hoặc path bắt đầu bằng "/" (không "//", không dot segment, không
+# ";"), không khoảng trắng / ký tự điều khiển, query và fragment (nếu có) không rỗng
+_SIMPLE_HREF_RE = re.compile(
+    r'(?:(https?)://[A-Za-z0-9.\-_~%@:]+)?/(?!/)[^\x00-\x20?#;]*'
+    r'(?:\?[^\x00-\x20#]+)?(?:#[^\x00-\x20]+)?\Z'
+)
+
+# Text node hiển thị của element, giống get_text() của BeautifulSoup
+# (bỏ comment và nội dung script/style/template)
+_TEXT_XPATH = etree.XPath(
+    'descendant-or-self::text()[not(parent::script or parent::style or ancestor::template)]',
+    smart_strings=False
+)
+
+# lxml parser không dùng chung được giữa các thread: mỗi thread một parser / encoding
+_parsers = threading.local()
+
+
+def parse_published_date(text: Optional[str]) -> Optional[date]:
+    """
+    Lấy ngày từ text published_date (e.g., "Thứ hai, 14/10/2024, 10:00 (GMT+7)"
+    hoặc "2024-10-14T10:00:00+07:00")
+    
+    Args:
+        text: Text published_date đã extract
+        
+    Returns:
+        date hoặc None nếu không nhận ra
+    """
+    if not text:
+        return None
+    
+    try:
+        match = _DMY_DATE_RE.search(text)
+        if match:
+            day, month, year = map(int, match.groups())
+            return date(year, month, day)
+        
+        match = _ISO_DATE_RE.search(text)
+        if match:
+            year, month, day = map(int, match.groups())
+            return date(year, month, day)
+    except ValueError:
+        pass
+    
+    return None
+
+
+def compile_selector(selector: Optional[str], name: str = '') -> Optional[CSSSelector]:
+    """
+    Compile CSS selector thành lxml CSSSelector (XPath) một lần
+    
+    Args:
+        selector: CSS selector trong domain config
+        name: Tên field (để log)
+        
+    Returns:
+        CSSSelector hoặc None nếu selector rỗng / không hợp lệ
+    """
+    if not selector:
+        return None
+    
+    try:
+        return CSSSelector(selector, translator='html')
+    except SelectorError as e:
+        logger.warning(f"Invalid selector for {name or 'field'} '{selector}': {e}")
+        return None
+
+
+def _get_parser(encoding: str) -> lxml_html.HTMLParser:
+    """HTMLParser của thread hiện tại cho encoding"""
+    parsers = getattr(_parsers, 'by_encoding', None)
+    if parsers is None:
+        parsers = _parsers.by_encoding = {}
+    
+    parser = parsers.get(encoding)
+    if parser is None:
+        parser = parsers[encoding] = lxml_html.HTMLParser(encoding=encoding)
+    return parser
+
+
+def parse_html(html: Union[str, bytes], encoding: str = None) -> Optional[lxml_html.HtmlElement]:
+    """
+    Parse HTML thành cây lxml
+    
+    Bytes kèm encoding được libxml2 decode trực tiếp (không đoán charset);
+    str được encode lại UTF-8 để lxml không từ chối khai báo encoding
+    trong trang.
+    
+    Args:
+        html: HTML content (str hoặc bytes)
+        encoding: Encoding của html khi là bytes
+        
+    Returns:
+        Root element hoặc None nếu trang rỗng
+    """
+    if isinstance(html, str):
+        html, encoding = html.encode('utf-8'), 'utf-8'
+    
+    try:
+        return etree.fromstring(html, _get_parser(encoding or 'utf-8'))
+    except (etree.ParserError, ValueError) as e:
+        logger.debug(f"Could not parse HTML: {e}")
+        return None
+
+
+def list_region(html: Union[str, bytes], start_marker: str = None, stop_marker: str = None) -> Union[str, bytes]:
+    """
+    Phần của trang danh sách chứa link bài viết và pagination
+    
+    Bỏ <head> (hoặc mọi thứ trước `start_marker`) và phần từ `stop_marker`
+    trở đi, để lxml chỉ dựng cây cho vùng này thay vì cả header / footer /
+    sidebar, và body hash của HTTP cache không đổi khi chỉ phần ngoài vùng
+    thay đổi. Marker không có trong trang thì giữ nguyên phía tương ứng.
+    Với bytes, marker được tìm theo dạng UTF-8 (trùng byte với mọi encoding
+    tương thích ASCII khi marker là ASCII).
+    
+    Args:
+        html: HTML trang danh sách (str hoặc bytes)
+        start_marker: Chuỗi đánh dấu đầu vùng (optional)
+        stop_marker: Chuỗi đánh dấu cuối vùng (optional)
+        
+    Returns:
+        Vùng cần parse, cùng kiểu với html
+    """
+    if isinstance(html, bytes):
+        body_re = _BODY_TAG_BYTES_RE
+        start_marker = start_marker.encode('utf-8') if start_marker else None
+        stop_marker = stop_marker.encode('utf-8') if stop_marker else None
+    else:
+        body_re = _BODY_TAG_RE
+    
+    start = -1
+    if start_marker:
+        start = html.find(start_marker)
+    if start == -1:
+        match = body_re.search(html)
+        start = match.start() if match else 0
+    
+    end = html.find(stop_marker, start) if stop_marker else -1
+    return html[start:end] if end != -1 else html[start:]
+
+
+def resolve_link(href: str, base_url: str, origin: Optional[str] = None) -> str:
+    """
+    Absolute URL của href, kết quả giống hệt urljoin(base_url, href)
+    
+    Các href đơn giản (URL http(s) tuyệt đối, path tuyệt đối) được ghép trực
+    tiếp, không phải parse lại base_url / href cho mỗi link.
+    
+    Args:
+        href: Giá trị href
+        base_url: URL của trang
+        origin: "scheme://netloc" của base_url (http/https)
+        
+    Returns:
+        Absolute URL
+    """
+    match = _SIMPLE_HREF_RE.match(href)
+    if match:
+        if match.group(1):
+            return href
+        if origin and '//' not in href and '/.' not in href:
+            return origin + href
+    return urljoin(base_url, href)
+
+
+def url_origin(url: str) -> Optional[str]:
+    """"scheme://netloc" của URL http(s), None nếu không phải"""
+    parts = urlsplit(url)
+    if parts.scheme in ('http', 'https') and parts.netloc:
+        return f"{parts.scheme}://{parts.netloc}"
+    return None
+
+
+def element_text(element) -> str:
+    """Text của element, tương đương get_text(strip=True) của BeautifulSoup"""
+    return ''.join(text.strip() for text in _TEXT_XPATH(element))
+
+
+class ArticleExtractor:
+    """
+    Phần parse/clean của StaticCrawler, không phụ thuộc session hay database
+    
+    Chỉ cần domain config nên có thể tạo sẵn trong process khác (xem
+    engine/parse_pool.py). Selectors trong config được compile thành lxml
+    CSSSelector một lần khi tạo extractor và chạy trực tiếp trên cây lxml.
+    """
+    
+    # Field của detail page được compile sẵn
+    DETAIL_FIELDS = ('title', 'summary', 'content', 'thumbnail', 'published_date', 'tags', 'author')
+    
+    def __init__(self, config: Dict, content_cleaner: ContentCleaner = None):
+        """
+        Args:
+            config: Domain configuration từ JSON
+            content_cleaner: ContentCleaner dùng chung (optional)
+        """
+        self.config = config
+        self.name = config['name']
+        self.content_cleaner = content_cleaner or ContentCleaner()
+        
+        list_selectors = config['list_page']['selectors']
+        detail_selectors = config['detail_page']['selectors']
+        
+        # Vùng chứa link bài viết / pagination của trang danh sách (optional)
+        self.list_start_marker = config['list_page'].get('start_marker')
+        self.list_stop_marker = config['list_page'].get('stop_marker')
+        
+        self.link_selector = compile_selector(list_selectors.get('article_links'), 'article_links')
+        self.pagination_selector = compile_selector(list_selectors.get('pagination'), 'pagination')
+        self.detail_selectors = {
+            field: compile_selector(detail_selectors.get(field), field)
+            for field in self.DETAIL_FIELDS
+        }
+        self.remove_selectors = [
+            selector for selector in (
+                compile_selector(remove_selector, 'remove_elements')
+                for remove_selector in config['detail_page'].get('remove_elements', [])
+            )
+            if selector is not None
+        ]
+    
+    def _parse_list_page(self, html: Union[str, bytes]):
+        """Parse vùng link của trang danh sách (xem list_region)"""
+        return parse_html(list_region(html, self.list_start_marker, self.list_stop_marker))
+    
+    def extract_article_links(self, html: Union[str, bytes], base_url: str) -> List[str]:
+        """Extract article links từ list page"""
+        return self._extract_links(self._parse_list_page(html), base_url)
+    
+    def extract_list_page(self, html: Union[str, bytes], base_url: str, page: int = 1) -> Tuple[List[str], Optional[str]]:
+        """
+        Extract article links và URL trang tiếp theo từ list page (parse một lần)
+        
+        Args:
+            html: HTML content
+            base_url: URL của trang
+            page: Số thứ tự của trang (1 = trang đầu)
+            
+        Returns:
+            (article links, URL trang sau hoặc None)
+        """
+        root = self._parse_list_page(html)
+        return self._extract_links(root, base_url), self._extract_next_page_url(root, base_url, page)
+    
+    def _extract_next_page_url(self, root, base_url: str, page: int) -> Optional[str]:
+        """
+        Tìm link trang sau trong các phần tử khớp selector `pagination`
+        
+        Ưu tiên link rel="next" / class "next" / text "›", "Trang sau"...;
+        nếu không có thì lấy link số trang nhỏ nhất lớn hơn `page`.
+        """
+        if root is None or self.pagination_selector is None:
+            return None
+        
+        numbered = {}
+        for element in self.pagination_selector(root):
+            href = element.get('href')
+            if not href or href.startswith(('#', 'javascript:')):
+                continue
+            
+            url = urljoin(base_url, href)
+            text = element_text(element).lower()
+            classes = (element.get('class') or '').lower()
+            
+            if 'next' in (element.get('rel') or '').split() or 'next' in classes or text in NEXT_PAGE_TEXTS:
+                return url
+            if text.isdigit():
+                numbered.setdefault(int(text), url)
+        
+        later_pages = [number for number in numbered if number > page]
+        return numbered[min(later_pages)] if later_pages else None
+    
+    def _extract_links(self, root, base_url: str) -> List[str]:
+        """Article links (absolute) khớp selector `article_links`"""
+        if root is None or self.link_selector is None:
+            return []
+        
+        links = []
+        origin = url_origin(base_url)
+        # Một bài thường có nhiều link (ảnh, tiêu đề): chỉ resolve mỗi href một lần
+        resolved = {}
+        for element in self.link_selector(root):
+            href = element.get('href')
+            if href:
+                # Convert to absolute URL
+                absolute_url = resolved.get(href)
+                if absolute_url is None:
+                    absolute_url = resolved[href] = resolve_link(href, base_url, origin)
+                links.append(absolute_url)
+        
+        return links
+    
+    def _select_one(self, root, field: str):
+        """Element đầu tiên (theo thứ tự trong trang) khớp selector của field"""
+        selector = self.detail_selectors.get(field)
+        if selector is None:
+            return None
+        
+        matches = selector(root)
+        return matches[0] if matches else None
+    
+    def extract_article_data(self, html: Union[str, bytes], url: str, encoding: str = None) -> Optional[Dict]:
+        """Extract article data từ detail page"""
+        root = parse_html(html, encoding)
+        if root is None:
+            logger.warning(f"Empty page: {url}")
+            return None
+        
+        try:
+            # Extract title
+            title_elem = self._select_one(root, 'title')
+            if title_elem is None:
+                logger.warning(f"No title found: {url}")
+                return None
+            title = element_text(title_elem)
+            
+            # Extract summary
+            summary_elem = self._select_one(root, 'summary')
+            summary = element_text(summary_elem) if summary_elem is not None else ''
+            
+            # Extract content
+            content_elem = self._select_one(root, 'content')
+            if content_elem is None:
+                logger.warning(f"No content found: {url}")
+                return None
+            
+            # Remove unwanted elements (chỉ phần tử con, không tính chính content)
+            for remove_selector in self.remove_selectors:
+                for elem in remove_selector(content_elem):
+                    if elem is not content_elem:
+                        elem.drop_tree()
+            
+            # Tách content element khỏi cây (các field sau không tìm trong
+            # content), ContentCleaner làm sạch element này và chỉ serialize một lần
+            if content_elem.getparent() is not None:
+                content_elem.drop_tree()
+            
+            # Extract thumbnail
+            thumbnail = ''
+            thumb_elem = self._select_one(root, 'thumbnail')
+            if thumb_elem is not None:
+                thumbnail = thumb_elem.get('content') or thumb_elem.get('src', '')
+            
+            # Extract published date
+            published_date = None
+            date_elem = self._select_one(root, 'published_date')
+            if date_elem is not None:
+                published_date = element_text(date_elem)
+            
+            # Extract tags
+            tags = []
+            if self.detail_selectors['tags'] is not None:
+                tags = [element_text(tag) for tag in self.detail_selectors['tags'](root)]
+            
+            # Extract author
+            author = ''
+            author_elem = self._select_one(root, 'author')
+            if author_elem is not None:
+                author = element_text(author_elem)
+            
+            return {
+                'title': title,
+                'summary': summary,
+                'content': content_elem,
+                'thumbnail': thumbnail,
+                'published_date': published_date,
+                'tags': tags,
+                'author': author
+            }
+        
+        except Exception as e:
+            logger.error(f"Error extracting article data from {url}: {e}")
+            return None
+    
+    def parse_article(self, html: Union[str, bytes], url: str, encoding: str = None,
+                      timings: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+        """
+        Extract và clean dữ liệu bài viết từ HTML trang chi tiết
+        
+        Args:
+            html: HTML content (str hoặc bytes)
+            url: Article URL
+            encoding: Encoding của html khi là bytes
+            timings: Dict nhận thời gian (seconds) của 'parse' và 'clean' (optional)
+            
+        Returns:
+            Article data dictionary (content đã clean) hoặc None
+        """
+        start = time.perf_counter()
+        article_data = self.extract_article_data(html, url, encoding)
+        if timings is not None:
+            timings['parse'] = time.perf_counter() - start
+        
+        if article_data:
+            # Clean content with source name for special handling
+            # (content là element đã parse, cleaner serialize một lần)
+            start = time.perf_counter()
+            article_data['content'] = self.content_cleaner.clean(
+                article_data['content'],
+                source_name=self.name
+            )
+            if timings is not None:
+                timings['clean'] = time.perf_counter() - start
+            
+            # Add metadata
+            article_data['source_url'] = url
+            article_data['source_name'] = self.name
+            
+            logger.success(f"Successfully extracted: {article_data['title'][:50]}...")
+        
+        return article_data
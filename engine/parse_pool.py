@@ -0,0 +1,131 @@
+"""
+Parse Pool
+Chạy parse + clean bài viết trong ProcessPoolExecutor để dùng hết các CPU core
+"""
+
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+from loguru import logger
+from config import settings
+from engine.extractor import ArticleExtractor
+
+
+# ArticleExtractor theo domain, tạo sẵn trong mỗi worker process
+_extractors: Dict[str, ArticleExtractor] = {}
+
+
+def _init_worker(configs: List[Dict]):
+    """Initializer của worker: compile sẵn selectors / cleaner rules cho các domain"""
+    for config in configs:
+        _extractors[config['domain']] = ArticleExtractor(config)
+
+
+def _parse_article(config: Dict, html: Union[str, bytes], url: str, encoding: str = None,
+                   timed: bool = False) -> Union[Optional[Dict], Tuple[Optional[Dict], Dict[str, float]]]:
+    """
+    Chạy trong worker process: extract + clean, trả về article dict
+    (hoặc (article dict, thời gian parse / clean) khi timed)
+    """
+    extractor = _extractors.get(config['domain'])
+    if extractor is None:
+        # Domain chưa được preload (e.g., thêm sau khi pool đã start)
+        extractor = _extractors[config['domain']] = ArticleExtractor(config)
+    
+    if not timed:
+        return extractor.parse_article(html, url, encoding)
+    
+    timings = {}
+    return extractor.parse_article(html, url, encoding, timings), timings
+
+
+class ParsePool:
+    """
+    Process pool cho giai đoạn parse/clean
+    
+    Mỗi task gửi (domain config, html, url) sang worker; worker trả về
+    article dict đã clean (cùng kết quả với ArticleExtractor.parse_article).
+    Bật bằng PARSE_WORKERS > 0.
+    """
+    
+    def __init__(self, configs: List[Dict], workers: int = None):
+        """
+        Args:
+            configs: Domain configs được preload trong mỗi worker
+            workers: Số worker process
+        """
+        self.workers = workers or settings.PARSE_WORKERS
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(configs,)
+        )
+        self._lock = threading.Lock()
+        self._closed = False
+        
+        logger.info(f"Started parse pool ({self.workers} processes)")
+    
+    def submit(self, config: Dict, html: Union[str, bytes], url: str, encoding: str = None,
+               timed: bool = False) -> Future:
+        """
+        Gửi một trang chi tiết sang worker
+        
+        Args:
+            config: Domain configuration
+            html: HTML content (bytes được gửi nguyên, decode trong worker)
+            url: Article URL
+            encoding: Encoding của html khi là bytes
+            timed: Worker trả về kèm thời gian parse / clean (xem unpack_result)
+            
+        Returns:
+            Future trả về article dict hoặc None
+            (timed: tuple (article dict, timings))
+        """
+        return self._executor.submit(_parse_article, config, html, url, encoding, timed)
+    
+    @staticmethod
+    def unpack_result(result, timings: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+        """
+        Article dict từ kết quả của submit
+        
+        Args:
+            result: Kết quả Future của submit
+            timings: Dict nhận thời gian parse / clean; khác None nghĩa là
+                task được submit với timed=True
+            
+        Returns:
+            Article data dictionary hoặc None
+        """
+        if timings is None:
+            return result
+        
+        article_data, worker_timings = result
+        timings.update(worker_timings)
+        return article_data
+    
+    def parse_article(self, config: Dict, html: Union[str, bytes], url: str, encoding: str = None,
+                      timings: Optional[Dict[str, float]] = None) -> Optional[Dict]:
+        """
+        Parse + clean bài viết trong worker (blocking)
+        
+        Args:
+            timings: Dict nhận thời gian (seconds) của 'parse' và 'clean' trong worker (optional)
+        
+        Returns:
+            Article data dictionary hoặc None nếu lỗi
+        """
+        try:
+            result = self.submit(config, html, url, encoding, timed=timings is not None).result()
+            return self.unpack_result(result, timings)
+        except Exception as e:
+            logger.error(f"Error parsing article {url} in parse pool: {e}")
+            return None
+    
+    def close(self):
+        """Dừng các worker process"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        
+        self._executor.shutdown(wait=True)
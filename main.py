@@ -6,15 +6,19 @@ Khởi động crawler system với beautiful console output
 import sys
 import json
 import argparse
+from datetime import date
 from pathlib import Path
+from typing import Dict, Optional
 from loguru import logger
 
 # Setup logger first
 from utils.logger import setup_logger
 from utils.console import Console
 
+from config import settings
 from utils.db_client import DatabaseClient
-from engine.static_crawler import StaticCrawler
+from utils.metrics import get_metrics, start_metrics_server
+from engine.coordinator import CrawlCoordinator
 
 
 def load_domain_configs():
@@ -38,14 +42,18 @@ def load_domain_configs():
     return configs
 
 
-def run_once(domain_name: str = None):
+def run_once(domain_name: str = None, backfill: Optional[Dict] = None):
     """
     Chạy crawler một lần (không dùng scheduler)
     
     Args:
         domain_name: Tên domain cần crawl, None = all domains
+        backfill: Tham số backfill (max_pages, since), None = crawl thường
     """
-    Console.subheader("One-Time Crawl Mode")
+    if backfill is not None:
+        Console.subheader("Backfill Mode")
+    else:
+        Console.subheader("One-Time Crawl Mode")
     
     # Load configs
     configs = load_domain_configs()
@@ -75,41 +83,45 @@ def run_once(domain_name: str = None):
         Console.warning("Please check database configuration in .env file")
         return
     
-    # Run crawlers
+    # Run crawlers: tất cả domain enabled chạy song song
     total_new = 0
     total_duplicate = 0
     
+    enabled_configs = []
     for config in configs:
         if not config.get('enabled', True):
             Console.warning(f"Skipping disabled domain: {config['name']}")
             continue
         
         Console.crawling(config['name'])
+        enabled_configs.append(config)
+    
+    coordinator = CrawlCoordinator(db_client)
+    try:
+        if backfill is not None:
+            results = coordinator.run_backfill(enabled_configs, **backfill)
+        else:
+            results = coordinator.run_all(enabled_configs)
+    except KeyboardInterrupt:
+        # Không đợi crawl xong: chỉ đợi các bài đang xử lý
+        coordinator.stop()
+        raise
+    finally:
+        coordinator.shutdown()
+    
+    for name, stats in results.items():
+        if stats is None:
+            Console.error(f"Error crawling {name}")
+            continue
         
-        try:
-            crawler_type = config.get('crawler_type', 'static')
-            
-            if crawler_type == 'static':
-                crawler = StaticCrawler(config, db_client)
-                result = crawler.run()
-                
-                # Show stats if available
-                if hasattr(crawler, 'stats'):
-                    stats = crawler.stats
-                    Console.stats(
-                        config['name'],
-                        stats.get('new', 0),
-                        stats.get('duplicate', 0),
-                        stats.get('total', 0)
-                    )
-                    total_new += stats.get('new', 0)
-                    total_duplicate += stats.get('duplicate', 0)
-            else:
-                Console.warning(f"Unsupported crawler type: {crawler_type}")
-                
-        except Exception as e:
-            Console.error(f"Error crawling {config['name']}: {e}")
-            logger.exception(e)
+        Console.stats(
+            name,
+            stats.get('new', 0),
+            stats.get('duplicate', 0),
+            stats.get('total', 0)
+        )
+        total_new += stats.get('new', 0)
+        total_duplicate += stats.get('duplicate', 0)
     
     # Show summary
     Console.separator()
@@ -122,6 +134,15 @@ def run_once(domain_name: str = None):
         Console.database_info(total_news)
     except Exception:
         pass
+    finally:
+        db_client.close()
+    
+    # Latency từng stage của tất cả domain
+    metrics = get_metrics()
+    if metrics:
+        path = metrics.write_snapshot()
+        if path:
+            Console.info(f"Stage timings written to {path}")
 
 
 def run_scheduler():
@@ -149,6 +170,11 @@ def run_scheduler():
         Console.error(f"Failed to connect to database: {e}")
         return
     
+    # Scheduled jobs chạy trong thread của coordinator, không chặn main thread;
+    # parse pool preload config của mọi domain được schedule
+    enabled_configs = [config for config in configs if config.get('enabled', True)]
+    coordinator = CrawlCoordinator(db_client, configs=enabled_configs)
+    
     # Setup scheduled jobs for each domain
     Console.subheader("Scheduling Jobs")
     
@@ -172,16 +198,16 @@ def run_scheduler():
             
             # Create job function for this domain
             def create_job(domain_config):
+                def on_done(future):
+                    if future.result() is not None:
+                        Console.success(f"Completed: {domain_config['name']}")
+                    else:
+                        Console.error(f"Scheduled crawl failed or skipped: {domain_config['name']}")
+                
                 def job():
                     Console.timestamp()
                     Console.crawling(f"{domain_config['name']} (Scheduled)")
-                    try:
-                        crawler = StaticCrawler(domain_config, db_client)
-                        crawler.run()
-                        Console.success(f"Completed: {domain_config['name']}")
-                    except Exception as e:
-                        Console.error(f"Error in scheduled crawl for {domain_config['name']}: {e}")
-                        logger.exception(e)
+                    coordinator.submit(domain_config).add_done_callback(on_done)
                 return job
             
             # Schedule based on cron pattern
@@ -205,33 +231,41 @@ def run_scheduler():
     
     if scheduled_count == 0:
         Console.error("No domains scheduled! Please enable at least one domain.")
+        coordinator.shutdown()
+        db_client.close()
         return
     
     Console.success(f"Scheduled {scheduled_count} crawler(s)")
     
-    # Run initial crawl for all domains
-    Console.separator()
-    Console.subheader("Initial Crawl")
-    Console.info("Running initial crawl for all enabled domains...")
-    run_once()
-    
-    # Start scheduler loop
-    Console.separator()
-    Console.waiting()
-    
-    while True:
-        try:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
-        except KeyboardInterrupt:
-            Console.separator()
-            Console.warning("Scheduler stopped by user")
-            Console.info("Goodbye! 👋")
-            break
-        except Exception as e:
-            Console.error(f"Scheduler error: {e}")
-            logger.exception(e)
-            time.sleep(60)
+    try:
+        # Run initial crawl for all domains
+        Console.separator()
+        Console.subheader("Initial Crawl")
+        Console.info("Running initial crawl for all enabled domains...")
+        run_once()
+        
+        # Start scheduler loop
+        Console.separator()
+        Console.waiting()
+        
+        while True:
+            try:
+                schedule.run_pending()
+                time.sleep(60)  # Check every minute
+            except KeyboardInterrupt:
+                coordinator.stop()
+                Console.separator()
+                Console.warning("Scheduler stopped by user")
+                Console.info("Goodbye! 👋")
+                break
+            except Exception as e:
+                Console.error(f"Scheduler error: {e}")
+                logger.exception(e)
+                time.sleep(60)
+    finally:
+        # Đợi các crawl đang chạy, xử lý nốt thumbnail trong hàng đợi rồi đóng pool
+        coordinator.shutdown()
+        db_client.close()
 
 
 def main():
@@ -239,14 +273,24 @@ def main():
     parser = argparse.ArgumentParser(description='X-Wise News Crawler')
     parser.add_argument(
         '--mode',
-        choices=['once', 'scheduler'],
+        choices=['once', 'scheduler', 'backfill'],
         default='once',
-        help='Run mode: once (one-time) or scheduler (continuous)'
+        help='Run mode: once (one-time), scheduler (continuous) or backfill (follow pagination)'
     )
     parser.add_argument(
         '--domain',
         type=str,
-        help='Domain to crawl (only for once mode)'
+        help='Domain to crawl (only for once / backfill mode)'
+    )
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        help='Max list pages per category (only for backfill mode, default BACKFILL_MAX_PAGES)'
+    )
+    parser.add_argument(
+        '--since',
+        type=date.fromisoformat,
+        help='Stop backfill at pages older than this date, YYYY-MM-DD (only for backfill mode)'
     )
     
     args = parser.parse_args()
@@ -254,9 +298,14 @@ def main():
     # Print banner
     Console.banner()
     
+    if settings.METRICS_ENABLED and settings.METRICS_PORT:
+        start_metrics_server()
+    
     try:
         if args.mode == 'once':
             run_once(args.domain)
+        elif args.mode == 'backfill':
+            run_once(args.domain, backfill={'max_pages': args.max_pages, 'since': args.since})
         else:
             run_scheduler()
             
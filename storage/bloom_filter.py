@@ -0,0 +1,180 @@
+"""
+Bloom Filter
+Tập hợp xác suất trong memory, trả lời "chắc chắn chưa có" mà không cần Redis
+"""
+
+import os
+import math
+import time
+import struct
+import threading
+from typing import Optional
+from loguru import logger
+
+
+class BloomFilter:
+    """
+    Bloom filter cho các digest 16 byte (md5)
+    
+    Không có false negative: `might_contain` trả về False thì item chắc chắn
+    chưa được add. Trả về True thì item *có thể* đã có (sai với xác suất
+    ~error_rate khi số item <= capacity), caller cần xác nhận lại ở nguồn
+    chính xác (Redis). Vị trí bit được tính bằng double hashing từ chính
+    digest, không cần hash thêm.
+    """
+    
+    MAGIC = b'XWBF'
+    VERSION = 1
+    # magic, version, num_hashes, num_bits, count, capacity, created_at
+    HEADER = struct.Struct('<4sHHQQQd')
+    
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        """
+        Args:
+            capacity: Số item dự kiến
+            error_rate: False positive rate mong muốn khi đầy capacity
+        """
+        self.capacity = max(1, capacity)
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.created_at = time.time()
+        
+        # Có item mới từ lần save gần nhất
+        self.dirty = False
+        self._lock = threading.Lock()
+        # Các domain thread có thể save cùng lúc: ghi file lần lượt
+        self._save_lock = threading.Lock()
+    
+    def _positions(self, digest: bytes):
+        """Vị trí các bit của digest (double hashing)"""
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+    
+    def add(self, digest: bytes):
+        """
+        Thêm item
+        
+        Args:
+            digest: md5 digest (16 bytes) của item
+        """
+        positions = self._positions(digest)
+        bits = self.bits
+        
+        with self._lock:
+            new = False
+            for pos in positions:
+                mask = 1 << (pos & 7)
+                if not bits[pos >> 3] & mask:
+                    bits[pos >> 3] |= mask
+                    new = True
+            if new:
+                self.count += 1
+                self.dirty = True
+    
+    def might_contain(self, digest: bytes) -> bool:
+        """
+        Kiểm tra item
+        
+        Args:
+            digest: md5 digest (16 bytes) của item
+            
+        Returns:
+            False nếu chắc chắn chưa có, True nếu có thể đã có
+        """
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest))
+    
+    @property
+    def memory_bytes(self) -> int:
+        """Kích thước bit array"""
+        return len(self.bits)
+    
+    def estimated_error_rate(self) -> float:
+        """False positive rate lý thuyết với số item hiện tại"""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+    
+    def save(self, path: str) -> bool:
+        """
+        Ghi snapshot ra file (atomic)
+        
+        Save được serialize bằng _save_lock (snapshot chụp sau luôn được ghi
+        sau), _lock chỉ giữ lúc chụp bits nên add không bị chặn khi ghi file.
+        
+        Args:
+            path: Đường dẫn file snapshot
+            
+        Returns:
+            True nếu thành công
+        """
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        
+        with self._save_lock:
+            try:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                
+                with self._lock:
+                    header = self.HEADER.pack(
+                        self.MAGIC, self.VERSION, self.num_hashes, self.num_bits,
+                        self.count, self.capacity, self.created_at
+                    )
+                    data = bytes(self.bits)
+                    self.dirty = False
+                
+                with open(tmp_path, 'wb') as f:
+                    f.write(header)
+                    f.write(data)
+                os.replace(tmp_path, path)
+                
+                logger.debug(f"Saved Bloom filter snapshot: {path} ({self.count} items)")
+                return True
+            except Exception as e:
+                with self._lock:
+                    self.dirty = True
+                logger.warning(f"Error saving Bloom filter snapshot {path}: {e}")
+                return False
+    
+    @classmethod
+    def load(cls, path: str) -> Optional['BloomFilter']:
+        """
+        Đọc snapshot từ file
+        
+        Args:
+            path: Đường dẫn file snapshot
+            
+        Returns:
+            BloomFilter hoặc None nếu không có file / file hỏng
+        """
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(cls.HEADER.size)
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Error reading Bloom filter snapshot {path}: {e}")
+            return None
+        
+        try:
+            magic, version, num_hashes, num_bits, count, capacity, created_at = cls.HEADER.unpack(header)
+        except struct.error:
+            magic = None
+        
+        if magic != cls.MAGIC or version != cls.VERSION or len(data) != (num_bits + 7) // 8:
+            logger.warning(f"Invalid Bloom filter snapshot: {path}")
+            return None
+        
+        bloom = cls.__new__(cls)
+        bloom.capacity = capacity
+        bloom.num_bits = num_bits
+        bloom.num_hashes = num_hashes
+        bloom.bits = bytearray(data)
+        bloom.count = count
+        bloom.created_at = created_at
+        bloom.dirty = False
+        bloom._lock = threading.Lock()
+        bloom._save_lock = threading.Lock()
+        return bloom
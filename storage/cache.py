@@ -3,77 +3,269 @@ Redis Cache
 Cache để tránh crawl duplicate và lưu trữ tạm
 """
 
+import time
+import threading
 import redis
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Set
 from loguru import logger
 import json
 from config import settings
 
 
+# Process-wide connection pool, dùng chung cho mọi RedisCache
+_connection_pool = None
+_shared_cache = None
+_lock = threading.RLock()
+
+
+def get_connection_pool() -> redis.ConnectionPool:
+    """
+    Lấy connection pool dùng chung cho toàn process (tạo lazy)
+    
+    Returns:
+        redis.ConnectionPool
+    """
+    global _connection_pool
+    
+    with _lock:
+        if _connection_pool is None:
+            _connection_pool = redis.ConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                db=settings.REDIS_DB,
+                password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
+                decode_responses=True,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL
+            )
+        return _connection_pool
+
+
+def get_redis_cache() -> 'RedisCache':
+    """
+    Lấy RedisCache dùng chung cho toàn process
+    
+    Returns:
+        Shared RedisCache instance
+    """
+    global _shared_cache
+    
+    with _lock:
+        if _shared_cache is None:
+            _shared_cache = RedisCache()
+        return _shared_cache
+
+
 class RedisCache:
     """Redis cache wrapper"""
     
-    def __init__(self):
+    def __init__(self, client: redis.Redis = None):
+        """
+        Args:
+            client: Redis client có sẵn (optional), mặc định dùng shared pool
+        """
+        # Khi Redis lỗi kết nối, tạm bỏ qua đến thời điểm này rồi thử lại
+        self._down_until = 0.0
+        
+        if client is not None:
+            self.client = client
+            return
+        
         if not settings.REDIS_ENABLED:
             logger.warning("Redis is disabled")
             self.client = None
             return
-            
+        
+        self.client = redis.Redis(connection_pool=get_connection_pool())
+        
+        if self.ping():
+            logger.info(f"Connected to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+    
+    def ping(self) -> bool:
+        """Health check, đánh dấu Redis down nếu không kết nối được"""
+        if not self.client:
+            return False
+        
         try:
-            self.client = redis.Redis(
-                host=settings.REDIS_HOST,
-                port=settings.REDIS_PORT,
-                db=settings.REDIS_DB,
-                password=settings.REDIS_PASSWORD if settings.REDIS_PASSWORD else None,
-                decode_responses=True
-            )
             self.client.ping()
-            logger.info(f"Connected to Redis at {settings.REDIS_HOST}:{settings.REDIS_PORT}")
+            self._down_until = 0.0
+            return True
         except Exception as e:
             logger.warning(f"Could not connect to Redis: {e}")
-            self.client = None
+            self._mark_down()
+            return False
+    
+    def _mark_down(self):
+        """Tạm ngưng gọi Redis, lazy reconnect sau REDIS_RECONNECT_INTERVAL"""
+        self._down_until = time.time() + settings.REDIS_RECONNECT_INTERVAL
+    
+    def _available(self) -> bool:
+        """Kiểm tra có nên gửi command tới Redis không"""
+        return self.client is not None and time.time() >= self._down_until
+    
+    def _handle_error(self, operation: str, error: Exception):
+        """Log lỗi, lỗi kết nối thì chuyển sang trạng thái down"""
+        if isinstance(error, (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)):
+            logger.warning(
+                f"Redis {operation} connection error: {error}. "
+                f"Retrying in {settings.REDIS_RECONNECT_INTERVAL}s"
+            )
+            self._mark_down()
+        else:
+            logger.error(f"Redis {operation} error: {error}")
     
     def set(self, key: str, value: str, expire: int = None):
         """Set cache value"""
-        if not self.client:
+        if not self._available():
             return
         
         try:
             self.client.set(key, value, ex=expire)
         except Exception as e:
-            logger.error(f"Redis set error: {e}")
+            self._handle_error("set", e)
     
     def get(self, key: str) -> Optional[str]:
         """Get cache value"""
-        if not self.client:
+        if not self._available():
             return None
         
         try:
             return self.client.get(key)
         except Exception as e:
-            logger.error(f"Redis get error: {e}")
+            self._handle_error("get", e)
             return None
     
     def exists(self, key: str) -> bool:
         """Check if key exists"""
-        if not self.client:
+        if not self._available():
             return False
         
         try:
             return self.client.exists(key) > 0
         except Exception as e:
-            logger.error(f"Redis exists error: {e}")
+            self._handle_error("exists", e)
             return False
     
+    def exists_many(self, keys: List[str]) -> List[bool]:
+        """
+        Check nhiều key trong một round-trip (pipeline)
+        
+        Args:
+            keys: List of cache keys
+            
+        Returns:
+            List bool tương ứng với từng key
+        """
+        if not self._available() or not keys:
+            return [False] * len(keys)
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.exists(key)
+            return [result > 0 for result in pipe.execute()]
+        except Exception as e:
+            self._handle_error("exists_many", e)
+            return [False] * len(keys)
+    
+    def set_many(self, mapping: Dict[str, str], expire: int = None):
+        """
+        Set nhiều key trong một round-trip (pipeline)
+        
+        Args:
+            mapping: Dict key -> value
+            expire: TTL in seconds
+        """
+        if not self._available() or not mapping:
+            return
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=expire)
+            pipe.execute()
+        except Exception as e:
+            self._handle_error("set_many", e)
+    
+    def zrange_many(self, keys: List[str], min_score: float = None) -> List[Set[str]]:
+        """
+        Lấy members của nhiều sorted set trong một round-trip (pipeline)
+        
+        Args:
+            keys: List of sorted set keys
+            min_score: Chỉ lấy member có score >= min_score (None = tất cả)
+            
+        Returns:
+            List set members tương ứng với từng key
+        """
+        if not self._available() or not keys:
+            return [set() for _ in keys]
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key in keys:
+                pipe.zrangebyscore(key, '-inf' if min_score is None else min_score, '+inf')
+            return [set(members) for members in pipe.execute()]
+        except Exception as e:
+            self._handle_error("zrange_many", e)
+            return [set() for _ in keys]
+    
+    def zadd_many(self, mapping: Dict[str, str], score: float, min_score: float = None, expire: int = None):
+        """
+        Thêm member vào nhiều sorted set trong một round-trip (pipeline)
+        
+        Args:
+            mapping: Dict sorted set key -> member
+            score: Score của member (e.g., timestamp)
+            min_score: Xóa các member có score < min_score (member cũ hết hạn
+                riêng lẻ thay vì theo TTL của cả key)
+            expire: TTL in seconds của key (xóa key không còn được thêm)
+        """
+        if not self._available() or not mapping:
+            return
+        
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, member in mapping.items():
+                pipe.zadd(key, {member: score})
+                if min_score is not None:
+                    pipe.zremrangebyscore(key, '-inf', f'({min_score}')
+                if expire:
+                    pipe.expire(key, expire)
+            pipe.execute()
+        except Exception as e:
+            self._handle_error("zadd_many", e)
+    
+    def scan_keys(self, pattern: str, count: int = 1000) -> Iterator[str]:
+        """
+        Duyệt các key khớp pattern bằng SCAN (không block Redis như KEYS)
+        
+        Args:
+            pattern: Glob pattern (e.g., 'crawler:article:*')
+            count: Số key mỗi lần SCAN
+            
+        Yields:
+            Key names
+            
+        Raises:
+            redis.exceptions.RedisError nếu lỗi giữa chừng (kết quả sẽ thiếu)
+        """
+        if not self._available():
+            return
+        
+        yield from self.client.scan_iter(match=pattern, count=count)
+    
     def delete(self, key: str):
         """Delete key"""
-        if not self.client:
+        if not self._available():
             return
         
         try:
             self.client.delete(key)
         except Exception as e:
-            logger.error(f"Redis delete error: {e}")
+            self._handle_error("delete", e)
     
     def set_json(self, key: str, value: dict, expire: int = None):
         """Set JSON value"""
@@ -3,24 +3,198 @@ Duplicate Checker
 Kiểm tra bài viết đã được crawl chưa
 """
 
-from storage.cache import RedisCache
+from storage.cache import RedisCache, get_redis_cache
+from storage.bloom_filter import BloomFilter
 from loguru import logger
+from typing import Dict, Iterable, List, Optional, Tuple
+import time
 import hashlib
+import threading
 from config import settings
 
 
+# Bloom filter các URL đã crawl, dùng chung cho toàn process (load lazy)
+_shared_bloom = None
+_bloom_retry_at = 0.0
+_bloom_loading = False
+# Digest được đánh dấu đã crawl trong lúc filter đang được build
+_bloom_pending: List[bytes] = []
+_bloom_lock = threading.Lock()
+
+
+def get_crawled_url_bloom(cache: RedisCache, prefix: str) -> Optional[BloomFilter]:
+    """
+    Lấy Bloom filter các URL đã crawl
+    
+    Lần đầu được load từ snapshot (BLOOM_FILTER_PATH); nếu không có snapshot,
+    snapshot quá cũ (các key Redis đã hết TTL vẫn còn trong filter) hoặc quá
+    capacity thì rebuild từ các key trong Redis. Việc load / rebuild chạy
+    ngoài _bloom_lock trong thread gọi đầu tiên; các thread khác nhận None
+    (hỏi thẳng Redis) cho tới khi filter được publish.
+    
+    Args:
+        cache: RedisCache chứa các key crawled-URL
+        prefix: Prefix của các key
+        
+    Returns:
+        BloomFilter hoặc None nếu chưa build xong / chưa build được (Redis
+        không kết nối được)
+    """
+    global _shared_bloom, _bloom_retry_at, _bloom_loading, _bloom_pending
+    
+    with _bloom_lock:
+        if _shared_bloom is not None or _bloom_loading or time.time() < _bloom_retry_at:
+            return _shared_bloom
+        _bloom_loading = True
+    
+    bloom = None
+    rebuilt = False
+    try:
+        bloom = _load_bloom_snapshot(settings.BLOOM_FILTER_PATH)
+        if bloom is None:
+            bloom = _rebuild_bloom(cache, prefix)
+            rebuilt = True
+    finally:
+        # Publish: thêm các URL được đánh dấu trong lúc build (SCAN có thể
+        # không thấy key mới) rồi mới cho các thread khác dùng
+        with _bloom_lock:
+            _bloom_loading = False
+            pending, _bloom_pending = _bloom_pending, []
+            if bloom is None:
+                _bloom_retry_at = time.time() + settings.REDIS_RECONNECT_INTERVAL
+            else:
+                for digest in pending:
+                    bloom.add(digest)
+                _shared_bloom = bloom
+    
+    if bloom is None:
+        return None
+    
+    if rebuilt:
+        bloom.save(settings.BLOOM_FILTER_PATH)
+    
+    logger.info(
+        f"Loaded Bloom filter: {bloom.count} URLs, "
+        f"{bloom.memory_bytes / 1024 / 1024:.1f} MB, "
+        f"estimated false positive rate {bloom.estimated_error_rate():.2%}"
+    )
+    return bloom
+
+
+def add_crawled_digests(digests: Iterable[bytes]):
+    """
+    Thêm digest của URL vừa đánh dấu đã crawl vào Bloom filter dùng chung
+    
+    Filter đang được build thì digest được giữ lại và thêm khi publish.
+    
+    Args:
+        digests: md5 digest của các URL
+    """
+    with _bloom_lock:
+        bloom = _shared_bloom
+        if bloom is None:
+            if _bloom_loading:
+                _bloom_pending.extend(digests)
+            return
+    
+    for digest in digests:
+        bloom.add(digest)
+
+
+def _load_bloom_snapshot(path: str) -> Optional[BloomFilter]:
+    """Snapshot của Bloom filter, None nếu không có / quá cũ / khác capacity"""
+    bloom = BloomFilter.load(path)
+    if bloom is None:
+        return None
+    
+    age = time.time() - bloom.created_at
+    if age > settings.BLOOM_FILTER_MAX_AGE:
+        logger.info(f"Bloom filter snapshot is {age / 86400:.1f} days old, rebuilding")
+        return None
+    if bloom.capacity != settings.BLOOM_FILTER_CAPACITY or bloom.count > bloom.capacity:
+        logger.info(f"Bloom filter snapshot capacity changed or exceeded ({bloom.count}/{bloom.capacity}), rebuilding")
+        return None
+    
+    return bloom
+
+
+def _rebuild_bloom(cache: RedisCache, prefix: str) -> Optional[BloomFilter]:
+    """Tạo Bloom filter từ các key crawled-URL trong Redis (SCAN)"""
+    if not cache.ping():
+        logger.warning("Redis unavailable, Bloom filter disabled until it reconnects")
+        return None
+    
+    bloom = BloomFilter(settings.BLOOM_FILTER_CAPACITY, settings.BLOOM_FILTER_ERROR_RATE)
+    start = time.time()
+    
+    try:
+        for key in cache.scan_keys(f"{prefix}*", count=10000):
+            try:
+                bloom.add(bytes.fromhex(key[len(prefix):]))
+            except ValueError:
+                continue
+    except Exception as e:
+        logger.warning(f"Error rebuilding Bloom filter from Redis: {e}")
+        return None
+    
+    logger.info(f"Rebuilt Bloom filter from Redis: {bloom.count} URLs in {time.time() - start:.1f}s")
+    if bloom.count > bloom.capacity:
+        logger.warning(
+            f"Bloom filter holds {bloom.count} URLs, over BLOOM_FILTER_CAPACITY={bloom.capacity}; "
+            f"false positive rate will be higher than configured"
+        )
+    return bloom
+
+
 class DuplicateChecker:
-    """Kiểm tra duplicate articles"""
+    """
+    Kiểm tra duplicate articles
     
-    def __init__(self):
-        self.cache = RedisCache()
+    Khi BLOOM_FILTER_ENABLED, filter_uncrawled hỏi Bloom filter trong process
+    trước: URL chắc chắn chưa crawl không tốn round-trip Redis, chỉ các URL
+    có thể đã crawl mới được xác nhận lại trong Redis.
+    """
+    
+    def __init__(self, cache: RedisCache = None, use_bloom: bool = None):
+        """
+        Args:
+            cache: RedisCache instance, mặc định dùng cache chung của process
+            use_bloom: Dùng Bloom filter, mặc định theo BLOOM_FILTER_ENABLED
+        """
+        self.cache = cache or get_redis_cache()
         self.prefix = "crawler:article:"
         self.ttl = settings.CACHE_TTL  # 90 days default
+        self.use_bloom = settings.BLOOM_FILTER_ENABLED if use_bloom is None else use_bloom
+        
+        # Kết quả tra Bloom filter: negatives (bỏ qua Redis), positives (hỏi
+        # Redis) và false_positives (Redis xác nhận chưa crawl)
+        self._bloom_counts = {'negatives': 0, 'positives': 0, 'false_positives': 0}
+        self._counts_lock = threading.Lock()
+    
+    def _get_digest(self, url: str) -> bytes:
+        """md5 digest của URL"""
+        return hashlib.md5(url.encode()).digest()
     
     def _get_key(self, url: str) -> str:
         """Generate cache key từ URL"""
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        return f"{self.prefix}{url_hash}"
+        return self._digest_key(self._get_digest(url))
+    
+    def _digest_key(self, digest: bytes) -> str:
+        """Cache key từ md5 digest"""
+        return f"{self.prefix}{digest.hex()}"
+    
+    def _get_bloom(self) -> Optional[BloomFilter]:
+        """Bloom filter dùng chung, None nếu tắt hoặc chưa load được"""
+        if not self.use_bloom:
+            return None
+        return get_crawled_url_bloom(self.cache, self.prefix)
+    
+    def _add_to_bloom(self, digests: Iterable[bytes]):
+        """Thêm URL vừa đánh dấu vào Bloom filter (load filter nếu chưa load)"""
+        if not self.use_bloom:
+            return
+        self._get_bloom()
+        add_crawled_digests(digests)
     
     def is_crawled(self, url: str) -> bool:
         """
@@ -35,6 +209,39 @@ class DuplicateChecker:
         key = self._get_key(url)
         return self.cache.exists(key)
     
+    def filter_uncrawled(self, urls: List[str], exact: bool = False) -> List[str]:
+        """
+        Lọc ra các URL chưa được crawl (giữ nguyên thứ tự)
+        
+        Toàn bộ batch chỉ tốn một network round-trip tới Redis; khi có Bloom
+        filter, chỉ các URL Bloom filter báo "có thể đã crawl" mới được gửi.
+        
+        Args:
+            urls: List of article URLs
+            exact: Bỏ qua Bloom filter, luôn hỏi Redis (dùng trước khi ghi DB,
+                vì snapshot có thể thiếu URL do process khác crawl)
+            
+        Returns:
+            List các URL chưa crawl
+        """
+        digests = [self._get_digest(url) for url in urls]
+        bloom = None if exact else self._get_bloom()
+        
+        if bloom is None:
+            crawled = self.cache.exists_many([self._digest_key(digest) for digest in digests])
+            return [url for url, is_crawled in zip(urls, crawled) if not is_crawled]
+        
+        maybe = [i for i, digest in enumerate(digests) if bloom.might_contain(digest)]
+        crawled = self.cache.exists_many([self._digest_key(digests[i]) for i in maybe])
+        crawled_indexes = {i for i, is_crawled in zip(maybe, crawled) if is_crawled}
+        
+        with self._counts_lock:
+            self._bloom_counts['negatives'] += len(urls) - len(maybe)
+            self._bloom_counts['positives'] += len(maybe)
+            self._bloom_counts['false_positives'] += len(maybe) - len(crawled_indexes)
+        
+        return [url for i, url in enumerate(urls) if i not in crawled_indexes]
+    
     def mark_crawled(self, url: str, article_id: str = None):
         """
         Đánh dấu URL đã được crawl
@@ -43,11 +250,30 @@ class DuplicateChecker:
             url: Article URL
             article_id: X-Wise news ID (optional)
         """
-        key = self._get_key(url)
+        digest = self._get_digest(url)
         value = article_id or "crawled"
-        self.cache.set(key, value, expire=self.ttl)
+        self.cache.set(self._digest_key(digest), value, expire=self.ttl)
+        self._add_to_bloom([digest])
+        
         logger.debug(f"Marked as crawled: {url}")
     
+    def mark_crawled_many(self, pairs: Iterable[Tuple[str, Optional[str]]]):
+        """
+        Đánh dấu nhiều URL đã crawl trong một round-trip
+        
+        Args:
+            pairs: Iterable of (url, article_id), article_id có thể None
+        """
+        digests = {
+            self._get_digest(url): article_id or "crawled"
+            for url, article_id in pairs
+        }
+        mapping = {self._digest_key(digest): value for digest, value in digests.items()}
+        self.cache.set_many(mapping, expire=self.ttl)
+        self._add_to_bloom(digests)
+        
+        logger.debug(f"Marked {len(mapping)} URLs as crawled")
+    
     def get_article_id(self, url: str) -> str:
         """
         Lấy article ID từ cache
@@ -60,3 +286,35 @@ class DuplicateChecker:
         """
         key = self._get_key(url)
         return self.cache.get(key)
+    
+    def bloom_stats(self) -> Optional[Dict]:
+        """
+        Thống kê Bloom filter
+        
+        Returns:
+            Dict (items, memory_bytes, false_positive_rate đo được trên các URL
+            chưa crawl, estimated_false_positive_rate, redis_checks_saved) hoặc
+            None nếu không dùng Bloom filter
+        """
+        if not self.use_bloom or _shared_bloom is None:
+            return None
+        
+        with self._counts_lock:
+            counts = dict(self._bloom_counts)
+        
+        # URL chưa crawl = negatives + false_positives
+        uncrawled = counts['negatives'] + counts['false_positives']
+        
+        return {
+            'items': _shared_bloom.count,
+            'memory_bytes': _shared_bloom.memory_bytes,
+            'false_positive_rate': counts['false_positives'] / uncrawled if uncrawled else 0.0,
+            'estimated_false_positive_rate': _shared_bloom.estimated_error_rate(),
+            'redis_checks_saved': counts['negatives'],
+            'redis_checks': counts['positives']
+        }
+    
+    def save_bloom_snapshot(self):
+        """Ghi snapshot Bloom filter nếu có URL mới từ lần ghi trước"""
+        if self.use_bloom and _shared_bloom is not None and _shared_bloom.dirty:
+            _shared_bloom.save(settings.BLOOM_FILTER_PATH)
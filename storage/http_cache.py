@@ -0,0 +1,118 @@
+"""
+HTTP Cache
+Lưu validator (ETag, Last-Modified) và hash nội dung của trang danh sách
+trên disk để gửi conditional GET ở lần chạy sau
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from loguru import logger
+from config import settings
+
+
+class HTTPCache:
+    """
+    On-disk HTTP cache, key theo URL
+    
+    Mỗi URL là một file JSON nhỏ trong cache_dir:
+        {"url", "etag", "last_modified", "body_hash", "updated_at"}
+    Chỉ lưu metadata, không lưu body.
+    """
+    
+    def __init__(self, cache_dir: str = None):
+        """
+        Args:
+            cache_dir: Thư mục lưu cache, mặc định settings.HTTP_CACHE_DIR
+        """
+        self.cache_dir = Path(cache_dir or settings.HTTP_CACHE_DIR)
+        self._lock = threading.Lock()
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not create HTTP cache dir {self.cache_dir}: {e}")
+    
+    def _path(self, url: str) -> Path:
+        """File cache của URL"""
+        return self.cache_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+    
+    @staticmethod
+    def hash_body(body: str) -> str:
+        """SHA-256 của response body"""
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Lấy entry đã lưu của URL
+        
+        Args:
+            url: URL trang danh sách
+            
+        Returns:
+            Dict entry hoặc None nếu chưa có / lỗi đọc
+        """
+        path = self._path(url)
+        
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read HTTP cache for {url}: {e}")
+            return None
+    
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """
+        Header If-None-Match / If-Modified-Since từ entry đã lưu
+        
+        Args:
+            entry: Entry từ get()
+            
+        Returns:
+            Dict headers (rỗng nếu không có validator)
+        """
+        headers = {}
+        if not entry:
+            return headers
+        
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        
+        return headers
+    
+    def update(self, url: str, etag: str = None, last_modified: str = None, body_hash: str = None):
+        """
+        Lưu validator và body hash mới nhất của URL
+        
+        Args:
+            url: URL trang danh sách
+            etag: ETag header của response
+            last_modified: Last-Modified header của response
+            body_hash: hash_body() của response body
+        """
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body_hash': body_hash,
+            'updated_at': time.time()
+        }
+        path = self._path(url)
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        
+        with self._lock:
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+                # Ghi atomic: không để lại file dở dang nếu process bị dừng
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write HTTP cache for {url}: {e}")
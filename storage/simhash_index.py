@@ -0,0 +1,202 @@
+"""
+SimHash Index
+Phát hiện bài viết gần trùng (cùng một tin đăng lại ở nhiều nguồn)
+"""
+
+import re
+import time
+import hashlib
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from loguru import logger
+from config import settings
+from storage.cache import RedisCache, get_redis_cache
+
+
+_shared_index = None
+_lock = threading.Lock()
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def get_simhash_index() -> 'SimHashIndex':
+    """
+    Lấy SimHashIndex dùng chung cho toàn process
+    
+    Returns:
+        Shared SimHashIndex instance
+    """
+    global _shared_index
+    
+    with _lock:
+        if _shared_index is None:
+            _shared_index = SimHashIndex()
+        return _shared_index
+
+
+class SimHashIndex:
+    """
+    Index SimHash 64-bit của nội dung đã clean
+    
+    Fingerprint được chia thành 4 band 16-bit; mỗi band là một bucket (Redis
+    sorted set, hoặc dict trong memory khi không có Redis). Hai fingerprint
+    cách nhau <= 3 bit chắc chắn trùng ít nhất một band (pigeonhole), nên chỉ
+    cần so Hamming distance với các fingerprint trong 4 bucket thay vì toàn bộ
+    index.
+    
+    Score của member là thời điểm thêm: fingerprint cũ hơn CACHE_TTL bị bỏ
+    qua khi đọc và bị xóa khi bucket được thêm, nên bucket được thêm thường
+    xuyên không tăng kích thước mãi.
+    """
+    
+    BITS = 64
+    BANDS = 4
+    BAND_BITS = BITS // BANDS
+    SHINGLE_SIZE = 3  # Số từ mỗi shingle
+    
+    def __init__(self, cache: RedisCache = None, max_distance: int = None, min_words: int = None):
+        """
+        Args:
+            cache: RedisCache instance, mặc định dùng cache chung của process
+            max_distance: Hamming distance tối đa để coi là gần trùng
+            min_words: Bỏ qua bài quá ngắn (fingerprint không đáng tin)
+        """
+        self.cache = cache or get_redis_cache()
+        self.prefix = "crawler:simhash:"
+        self.ttl = settings.CACHE_TTL
+        self.max_distance = max_distance if max_distance is not None else settings.NEAR_DUPLICATE_MAX_DISTANCE
+        self.min_words = min_words or settings.NEAR_DUPLICATE_MIN_WORDS
+        
+        if self.max_distance >= self.BANDS:
+            logger.warning(
+                f"NEAR_DUPLICATE_MAX_DISTANCE={self.max_distance} >= {self.BANDS} bands, "
+                f"some near-duplicates may be missed"
+            )
+        
+        # Fallback khi Redis bị tắt: bucket key -> {member: thời điểm thêm}
+        self._memory: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._memory_lock = threading.Lock()
+    
+    def fingerprint(self, content: str) -> Optional[int]:
+        """
+        Tính SimHash 64-bit của nội dung
+        
+        Args:
+            content: HTML hoặc text đã clean
+            
+        Returns:
+            Fingerprint hoặc None nếu nội dung quá ngắn
+        """
+        words = _WORD_RE.findall(_TAG_RE.sub(' ', content or '').lower())
+        if len(words) < self.min_words:
+            return None
+        
+        # Mỗi shingle -> hash 64-bit dạng chuỗi bit; bit i của fingerprint là 1
+        # nếu quá nửa số shingle có bit i = 1 (đếm theo cột, chạy trong C)
+        hashes = [
+            format(int.from_bytes(
+                hashlib.blake2b(' '.join(words[i:i + self.SHINGLE_SIZE]).encode('utf-8'), digest_size=8).digest(),
+                'big'
+            ), '064b')
+            for i in range(len(words) - self.SHINGLE_SIZE + 1)
+        ]
+        half = len(hashes) / 2
+        
+        return int(''.join('1' if column.count('1') > half else '0' for column in zip(*hashes)), 2)
+    
+    def _bucket_keys(self, fingerprint: int) -> List[str]:
+        """Key của 4 bucket (band index + giá trị band)"""
+        mask = (1 << self.BAND_BITS) - 1
+        return [
+            f"{self.prefix}{band}:{fingerprint >> (band * self.BAND_BITS) & mask:04x}"
+            for band in range(self.BANDS)
+        ]
+    
+    def _use_memory(self) -> bool:
+        """Redis bị tắt thì dùng index trong memory"""
+        return self.cache.client is None
+    
+    def _get_buckets(self, keys: List[str]) -> List[set]:
+        """Members chưa hết hạn của các bucket"""
+        min_time = time.time() - self.ttl
+        
+        if self._use_memory():
+            with self._memory_lock:
+                return [
+                    {member for member, added in self._memory.get(key, {}).items() if added >= min_time}
+                    for key in keys
+                ]
+        return self.cache.zrange_many(keys, min_score=min_time)
+    
+    def _add_to_buckets(self, keys: List[str], member: str):
+        """Thêm member vào các bucket, xóa member đã hết hạn"""
+        now = time.time()
+        min_time = now - self.ttl
+        
+        if self._use_memory():
+            with self._memory_lock:
+                for key in keys:
+                    bucket = self._memory[key]
+                    bucket[member] = now
+                    for expired in [m for m, added in bucket.items() if added < min_time]:
+                        del bucket[expired]
+            return
+        self.cache.zadd_many({key: member for key in keys}, now, min_score=min_time, expire=self.ttl)
+    
+    def find_near_duplicate(self, fingerprint: int, ref: str = None) -> Optional[Tuple[str, int]]:
+        """
+        Tìm bài đã lưu gần trùng với fingerprint
+        
+        Args:
+            fingerprint: SimHash của bài mới
+            ref: Định danh bài mới (source URL), bỏ qua match với chính nó
+            
+        Returns:
+            (ref của bài đã có, hamming distance) hoặc None
+        """
+        best = None
+        
+        for members in self._get_buckets(self._bucket_keys(fingerprint)):
+            for member in members:
+                stored_hex, _, stored_ref = member.partition(' ')
+                if stored_ref == ref:
+                    continue
+                
+                distance = bin(int(stored_hex, 16) ^ fingerprint).count('1')
+                if distance <= self.max_distance and (best is None or distance < best[1]):
+                    best = (stored_ref, distance)
+        
+        return best
+    
+    def add(self, fingerprint: int, ref: str):
+        """
+        Thêm fingerprint vào index
+        
+        Args:
+            fingerprint: SimHash
+            ref: Định danh bài viết (source URL)
+        """
+        self._add_to_buckets(self._bucket_keys(fingerprint), f"{fingerprint:016x} {ref}")
+    
+    def check(self, content: str, ref: str) -> Tuple[Optional[int], Optional[Tuple[str, int]]]:
+        """
+        Kiểm tra gần trùng (không thêm vào index)
+        
+        Bài mới chỉ được add sau khi đã lưu thành công, để bài lưu lỗi không
+        làm các bản đăng lại sau đó bị coi là gần trùng.
+        
+        Args:
+            content: Nội dung đã clean
+            ref: Source URL của bài mới
+            
+        Returns:
+            (fingerprint, match): fingerprint None nếu nội dung quá ngắn để
+            so sánh; match là (ref bài đã có, distance) nếu gần trùng
+        """
+        fingerprint = self.fingerprint(content)
+        if fingerprint is None:
+            return None, None
+        
+        return fingerprint, self.find_near_duplicate(fingerprint, ref)
@@ -0,0 +1,107 @@
+"""
+Watermark Store
+Lưu high-water mark của từng (domain, category): các bài mới nhất đã thấy ở
+trang danh sách, để lần chạy sau chỉ xử lý phần mới
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from loguru import logger
+from config import settings
+
+
+class WatermarkStore:
+    """
+    High-water marks của một domain, lưu trên disk
+    
+    Mỗi domain là một file JSON trong cache_dir:
+        {category: {"urls": [...], "retry": [...], "updated_at": ...}}
+    `urls` là các link đầu trang danh sách (mới nhất trước) đã xử lý ở lần
+    chạy trước, `retry` là các link bị lỗi cần thử lại dù nằm dưới watermark.
+    """
+    
+    def __init__(self, domain: str, cache_dir: str = None):
+        """
+        Args:
+            domain: Domain của crawler
+            cache_dir: Thư mục lưu watermark, mặc định settings.WATERMARK_DIR
+        """
+        self.domain = domain
+        self.cache_dir = Path(cache_dir or settings.WATERMARK_DIR)
+        self.path = self.cache_dir / f"{domain}.json"
+        self._lock = threading.Lock()
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not create watermark dir {self.cache_dir}: {e}")
+        
+        self._marks = self._load()
+    
+    def _load(self) -> Dict[str, Dict]:
+        """Đọc watermark đã lưu của domain"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read watermarks for {self.domain}: {e}")
+            return {}
+    
+    def get(self, category: str) -> Optional[Dict]:
+        """
+        Watermark của category
+        
+        Args:
+            category: Category slug
+            
+        Returns:
+            Dict {"urls", "retry", "updated_at"} hoặc None nếu chưa có
+        """
+        with self._lock:
+            return self._marks.get(category)
+    
+    def known_urls(self, category: str) -> set:
+        """Các URL thuộc watermark của category"""
+        mark = self.get(category)
+        return set(mark['urls']) if mark else set()
+    
+    def retry_urls(self, category: str) -> set:
+        """Các URL bị lỗi ở lần chạy trước của category"""
+        mark = self.get(category)
+        return set(mark.get('retry', ())) if mark else set()
+    
+    def update(self, marks: Dict[str, List[str]], retries: Dict[str, List[str]] = None):
+        """
+        Lưu watermark mới cho các category (ghi file một lần)
+        
+        Args:
+            marks: Dict category -> các link đầu trang danh sách (mới nhất trước)
+            retries: Dict category -> các link bị lỗi cần thử lại (optional)
+        """
+        if not marks:
+            return
+        
+        now = time.time()
+        tmp_path = self.path.with_suffix(f'.{threading.get_ident()}.tmp')
+        
+        with self._lock:
+            for category, urls in marks.items():
+                self._marks[category] = {
+                    'urls': urls[:settings.WATERMARK_SIZE],
+                    'retry': (retries or {}).get(category, [])[:settings.WATERMARK_SIZE],
+                    'updated_at': now
+                }
+            
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._marks, f)
+                # Ghi atomic: không để lại file dở dang nếu process bị dừng
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"Could not write watermarks for {self.domain}: {e}")
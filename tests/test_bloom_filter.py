@@ -0,0 +1,90 @@
+"""
+Test BloomFilter (snapshot save/load) và Bloom filter dùng chung của DuplicateChecker
+"""
+
+import hashlib
+import fakeredis
+import pytest
+import storage.duplicate_checker as duplicate_checker
+from config import settings
+from storage.bloom_filter import BloomFilter
+from storage.cache import RedisCache
+from storage.duplicate_checker import DuplicateChecker
+
+
+def digest(i: int) -> bytes:
+    """md5 digest của URL thứ i"""
+    return hashlib.md5(f'https://example.com/a-{i}.html'.encode()).digest()
+
+
+def test_save_load_round_trip_has_no_false_negatives(tmp_path):
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(digest(i))
+    assert bloom.dirty
+    
+    path = str(tmp_path / 'bloom' / 'crawled_urls.bloom')
+    assert bloom.save(path)
+    assert not bloom.dirty
+    
+    loaded = BloomFilter.load(path)
+    assert (loaded.count, loaded.capacity, loaded.num_bits, loaded.num_hashes) == \
+        (bloom.count, bloom.capacity, bloom.num_bits, bloom.num_hashes)
+    assert loaded.created_at == bloom.created_at
+    assert all(loaded.might_contain(digest(i)) for i in range(5000))
+    
+    # False positive rate gần error_rate khi đầy capacity
+    false_positives = sum(loaded.might_contain(digest(i)) for i in range(5000, 25000))
+    assert false_positives / 20000 < 0.02
+
+
+@pytest.mark.parametrize('content', [b'', b'XWBF', b'NOPE' + bytes(100)])
+def test_load_rejects_invalid_snapshot(tmp_path, content):
+    path = tmp_path / 'crawled_urls.bloom'
+    path.write_bytes(content)
+    
+    assert BloomFilter.load(str(path)) is None
+
+
+def test_load_truncated_snapshot(tmp_path):
+    path = str(tmp_path / 'crawled_urls.bloom')
+    BloomFilter(capacity=1000).save(path)
+    with open(path, 'rb+') as f:
+        f.truncate(BloomFilter.HEADER.size + 10)
+    
+    assert BloomFilter.load(path) is None
+    assert BloomFilter.load(str(tmp_path / 'missing.bloom')) is None
+
+
+@pytest.fixture
+def shared_bloom(tmp_path, monkeypatch):
+    """Reset Bloom filter dùng chung của process, snapshot trong tmp_path"""
+    monkeypatch.setattr(duplicate_checker, '_shared_bloom', None)
+    monkeypatch.setattr(duplicate_checker, '_bloom_retry_at', 0.0)
+    monkeypatch.setattr(duplicate_checker, '_bloom_loading', False)
+    monkeypatch.setattr(duplicate_checker, '_bloom_pending', [])
+    monkeypatch.setattr(settings, 'BLOOM_FILTER_PATH', str(tmp_path / 'crawled_urls.bloom'))
+    monkeypatch.setattr(settings, 'BLOOM_FILTER_CAPACITY', 10000)
+    return tmp_path / 'crawled_urls.bloom'
+
+
+def test_checker_rebuilds_from_redis_and_saves_snapshot(shared_bloom):
+    cache = RedisCache(client=fakeredis.FakeRedis(decode_responses=True))
+    crawled = [f'https://example.com/a-{i}.html' for i in range(100)]
+    DuplicateChecker(cache=cache, use_bloom=False).mark_crawled_many((url, None) for url in crawled)
+    
+    checker = DuplicateChecker(cache=cache, use_bloom=True)
+    new = [f'https://example.com/b-{i}.html' for i in range(100)]
+    
+    assert checker.filter_uncrawled(crawled + new) == new
+    assert shared_bloom.exists()
+    
+    stats = checker.bloom_stats()
+    assert stats['items'] == 100
+    assert stats['redis_checks_saved'] + stats['redis_checks'] == 200
+    assert stats['redis_checks_saved'] > 90
+    
+    # URL đánh dấu sau khi load được thêm vào filter
+    checker.mark_crawled(new[0])
+    assert checker.filter_uncrawled(new[:2]) == new[1:2]
+    assert checker.bloom_stats()['items'] == 101
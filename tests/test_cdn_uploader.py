@@ -0,0 +1,81 @@
+"""
+Test dedup cache của CDNUploader (Redis giả lập bằng fakeredis, không gọi CDN thật)
+"""
+
+import fakeredis
+import pytest
+import utils.cdn_uploader as cdn_uploader
+from storage.cache import RedisCache
+from utils.cdn_uploader import CDNUploader
+
+IMAGES = {
+    'https://img.example.com/a.jpg': b'image-a',
+    'https://mirror.example.com/copy-of-a.jpg': b'image-a',
+    'https://img.example.com/b.jpg': b'image-b'
+}
+
+
+class FakeResponse:
+    """Response của CDN upload API"""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return {
+            'success': True,
+            'data': {'key': self.filename, 'url': f'https://cdn.example.com/images/{self.filename}'}
+        }
+
+
+@pytest.fixture
+def uploader(monkeypatch):
+    """CDNUploader đếm số lần download / upload"""
+    uploader = CDNUploader(cache=RedisCache(client=fakeredis.FakeRedis(decode_responses=True)))
+    uploader.downloads = []
+    uploader.uploads = []
+    
+    def download_image(image_url):
+        uploader.downloads.append(image_url)
+        return IMAGES[image_url]
+    
+    def post(url, files, **kwargs):
+        filename = files['file'][0]
+        uploader.uploads.append(filename)
+        return FakeResponse(filename)
+    
+    monkeypatch.setattr(uploader, 'download_image', download_image)
+    monkeypatch.setattr(cdn_uploader.requests, 'post', post)
+    return uploader
+
+
+def test_same_url_is_uploaded_once(uploader):
+    first = uploader.upload_to_cdn('https://img.example.com/a.jpg')
+    second = uploader.upload_to_cdn('https://img.example.com/a.jpg')
+    
+    assert first == second
+    assert first['url'] == 'https://cdn.example.com/images/a.jpg'
+    assert uploader.downloads == ['https://img.example.com/a.jpg']
+    assert uploader.uploads == ['a.jpg']
+    assert uploader.get_cache_stats()['url_hits'] == 1
+
+
+def test_same_content_is_uploaded_once(uploader):
+    first = uploader.upload_to_cdn('https://img.example.com/a.jpg')
+    copy = uploader.upload_to_cdn('https://mirror.example.com/copy-of-a.jpg')
+    other = uploader.upload_to_cdn('https://img.example.com/b.jpg')
+    
+    assert copy == first
+    assert other['url'] == 'https://cdn.example.com/images/b.jpg'
+    assert uploader.uploads == ['a.jpg', 'b.jpg']
+    
+    stats = uploader.get_cache_stats()
+    assert (stats['content_hits'], stats['misses']) == (1, 2)
+    
+    # URL của bản sao cũng được cache, lần sau không cần download
+    uploader.upload_to_cdn('https://mirror.example.com/copy-of-a.jpg')
+    assert len(uploader.downloads) == 3
+    assert uploader.get_cache_stats()['url_hits'] == 1
@@ -0,0 +1,79 @@
+"""
+Golden-output test của ContentCleaner
+
+Input và golden nằm trong tests/fixtures/content_cleaner/:
+    pages/<domain>/<page>.html            trang chi tiết
+    pages/<domain>/<page>.golden.html     content của parse_article
+    fragments/<name>.html                 HTML fragment (nhiều rule cleaner)
+    fragments/<name>.<source>.golden.html output của cleaner
+
+Golden ban đầu là output của crawler baseline (BeautifulSoup). Khi cleaner
+chuyển sang serialize bằng lxml.html.tostring, golden được sinh lại sau khi
+đối chiếu với golden cũ: cùng cây element / attribute / text, chỉ khác format
+serialize (<br> thay cho <br/>, thứ tự attribute như trong trang, không còn
+wrapper <html><body>) và text "&lt;!--" không còn bị bỏ. Chỉ sinh lại golden
+khi cố ý đổi output.
+"""
+
+import json
+from pathlib import Path
+import pytest
+from engine.static_crawler import StaticCrawler
+from utils.content_cleaner import ContentCleaner
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures' / 'content_cleaner'
+CONFIG_DIR = Path(__file__).parent.parent / 'config' / 'domains'
+
+# Tên file golden của fragment -> source_name truyền cho cleaner
+FRAGMENT_SOURCES = {
+    'vnexpress': 'VnExpress',
+    'dantri': 'Dân Trí'
+}
+
+
+def load_config(domain: str) -> dict:
+    """Domain config theo domain"""
+    for config_file in CONFIG_DIR.glob('*.json'):
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if config['domain'] == domain:
+            return config
+    raise LookupError(domain)
+
+
+def golden_cases(kind: str):
+    """(input, golden) của pages hoặc fragments"""
+    return sorted(
+        (path.with_name(path.name.split('.')[0] + '.html'), path)
+        for path in (FIXTURES_DIR / kind).rglob('*.golden.html')
+    )
+
+
+@pytest.mark.parametrize('page, golden', golden_cases('pages'), ids=lambda path: path.parent.name + '/' + path.name)
+def test_parse_article_matches_golden(page: Path, golden: Path):
+    domain = page.parent.name
+    crawler = StaticCrawler(load_config(domain), db_client=None)
+    
+    article = crawler.parse_article(page.read_bytes(), f"https://{domain}/{page.name}", 'utf-8')
+    
+    assert article is not None
+    assert article['content'] == golden.read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('fragment, golden', golden_cases('fragments'), ids=lambda path: path.name)
+def test_clean_fragment_matches_golden(fragment: Path, golden: Path):
+    source_name = FRAGMENT_SOURCES[golden.name.split('.')[1]]
+    
+    output = ContentCleaner().clean(fragment.read_text(encoding='utf-8'), source_name=source_name)
+    
+    assert output == golden.read_text(encoding='utf-8')
+
+
+@pytest.mark.parametrize('html, expected', [
+    ('<!-- c -->', '<!-- c -->'),
+    ('hello', 'hello'),
+    ('<html><head><title>t</title></head><body><p>x</p></body></html>', '<p>x</p>'),
+    ('  ', '')
+])
+def test_clean_string_input(html: str, expected: str):
+    assert ContentCleaner().clean(html) == expected
@@ -0,0 +1,47 @@
+"""
+Test batch lookup của DuplicateChecker (Redis giả lập bằng fakeredis)
+"""
+
+import fakeredis
+import pytest
+from storage.cache import RedisCache
+from storage.duplicate_checker import DuplicateChecker
+
+
+@pytest.fixture
+def checker():
+    """DuplicateChecker trên Redis trong bộ nhớ, không dùng Bloom filter"""
+    cache = RedisCache(client=fakeredis.FakeRedis(decode_responses=True))
+    return DuplicateChecker(cache=cache, use_bloom=False)
+
+
+def test_filter_uncrawled_keeps_order(checker):
+    urls = [f'https://example.com/a-{i}.html' for i in range(10)]
+    checker.mark_crawled(urls[3], '42')
+    checker.mark_crawled(urls[7])
+    
+    assert checker.filter_uncrawled(urls) == [url for i, url in enumerate(urls) if i not in (3, 7)]
+    assert checker.filter_uncrawled([]) == []
+
+
+def test_mark_crawled_many(checker):
+    checker.mark_crawled_many([
+        ('https://example.com/a.html', '1'),
+        ('https://example.com/b.html', None)
+    ])
+    
+    assert checker.is_crawled('https://example.com/a.html')
+    assert checker.is_crawled('https://example.com/b.html')
+    assert checker.get_article_id('https://example.com/a.html') == '1'
+    assert checker.get_article_id('https://example.com/b.html') == 'crawled'
+    assert checker.filter_uncrawled([
+        'https://example.com/a.html',
+        'https://example.com/c.html'
+    ]) == ['https://example.com/c.html']
+
+
+def test_keys_expire_after_ttl(checker):
+    checker.mark_crawled_many([('https://example.com/a.html', '1')])
+    
+    key = checker._get_key('https://example.com/a.html')
+    assert 0 < checker.cache.client.ttl(key) <= checker.ttl
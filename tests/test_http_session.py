@@ -0,0 +1,80 @@
+"""
+Test đọc body theo chunk có giới hạn (BoundedBody) và kiểm tra Content-Type
+"""
+
+import pytest
+from utils.http_session import BoundedBody, is_html_content_type
+
+BODY = b'<html><body><article>' + b'x' * 50 + b'</article><footer>links</footer></body></html>'
+MARKER = b'<footer'
+BEFORE_MARKER = BODY[:BODY.index(MARKER)]
+
+
+def feed_chunks(body: BoundedBody, data: bytes, chunk_size: int) -> int:
+    """Feed `data` theo chunk như response stream, trả về số chunk đã đọc"""
+    for count, start in enumerate(range(0, len(data), chunk_size), 1):
+        if body.feed(data[start:start + chunk_size]):
+            return count
+    return -1
+
+
+def test_marker_spanning_two_chunks():
+    split = BODY.index(MARKER) + 3
+    body = BoundedBody(max_bytes=1000, stop_marker=MARKER)
+    
+    assert not body.feed(BODY[:split])
+    assert body.feed(BODY[split:])
+    assert body.content == BEFORE_MARKER
+    assert body.stopped_at_marker and not body.truncated
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 16, 64, len(BODY)])
+def test_result_does_not_depend_on_chunking(chunk_size):
+    body = BoundedBody(max_bytes=1000, stop_marker=MARKER)
+    
+    chunks = feed_chunks(body, BODY, chunk_size)
+    
+    assert body.content == BEFORE_MARKER
+    # Dừng ngay ở chunk chứa byte cuối của marker
+    assert chunks == -(-(len(BEFORE_MARKER) + len(MARKER)) // chunk_size)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 4, 10, 64])
+def test_stops_at_size_limit(chunk_size):
+    body = BoundedBody(max_bytes=10)
+    
+    chunks = feed_chunks(body, BODY, chunk_size)
+    
+    assert body.content == BODY[:10]
+    assert body.truncated and not body.stopped_at_marker
+    assert chunks == -(-10 // chunk_size)
+
+
+def test_marker_after_size_limit_truncates():
+    body = BoundedBody(max_bytes=20, stop_marker=MARKER)
+    
+    feed_chunks(body, BODY, 64)
+    
+    assert body.content == BODY[:20]
+    assert body.truncated and not body.stopped_at_marker
+
+
+def test_small_body_is_read_completely():
+    body = BoundedBody(max_bytes=1000, stop_marker=b'<nav')
+    
+    assert feed_chunks(body, BODY, 16) == -1
+    assert body.content == BODY
+    assert not body.truncated and not body.stopped_at_marker
+
+
+@pytest.mark.parametrize('content_type, expected', [
+    ('text/html; charset=utf-8', True),
+    ('application/xhtml+xml', True),
+    ('TEXT/HTML', True),
+    ('', True),
+    (None, True),
+    ('application/pdf', False),
+    ('image/jpeg', False)
+])
+def test_is_html_content_type(content_type, expected):
+    assert is_html_content_type(content_type) is expected
@@ -0,0 +1,103 @@
+"""
+Test vùng link của trang danh sách (list_region) và body hash của HTTP cache
+tính trên vùng đó
+"""
+
+import json
+from pathlib import Path
+import pytest
+from config import settings
+from engine.extractor import list_region
+from engine.static_crawler import StaticCrawler
+from storage.http_cache import HTTPCache
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'domains' / 'vnexpress.json'
+LIST_URL = 'https://vnexpress.net/thoi-su'
+
+START = '<div id="list-news">'
+STOP = '<footer'
+
+
+def list_page(links: str, head: str = '', sidebar: str = '', footer: str = '') -> str:
+    """Trang danh sách: head, sidebar, vùng link rồi footer"""
+    return (
+        f'<html><head><title>Thời sự</title>{head}</head>'
+        f'<body class="list"><nav>{sidebar}</nav>'
+        f'{START}{links}</div>'
+        f'<footer>{footer}</footer></body></html>'
+    )
+
+
+PAGE = list_page('<a href="/a-1.html">Bài 1</a>', sidebar='Xu hướng', footer='© 2026')
+REGION = f'{START}<a href="/a-1.html">Bài 1</a></div>'
+
+
+@pytest.mark.parametrize('html', [PAGE, PAGE.encode('utf-8')], ids=['str', 'bytes'])
+def test_region_between_markers(html):
+    region = list_region(html, START, STOP)
+    
+    assert type(region) is type(html)
+    assert (region.decode('utf-8') if isinstance(region, bytes) else region) == REGION
+
+
+@pytest.mark.parametrize('start_marker, stop_marker, expected', [
+    (None, None, PAGE[PAGE.index('<body'):]),
+    ('<div id="missing">', STOP, PAGE[PAGE.index('<body'):PAGE.index(STOP)]),
+    (START, '<div id="missing">', PAGE[PAGE.index(START):]),
+    (START, '<nav', PAGE[PAGE.index(START):])  # stop marker chỉ được tìm sau start
+])
+def test_missing_markers_keep_that_side(start_marker, stop_marker, expected):
+    assert list_region(PAGE, start_marker, stop_marker) == expected
+    assert list_region(PAGE.encode('utf-8'), start_marker, stop_marker) == expected.encode('utf-8')
+
+
+def test_non_ascii_marker_in_bytes():
+    html = '<body><p>Quảng cáo</p><h2>Tin mới</h2><a href="/a.html">A</a><h2>Đọc nhiều</h2>'
+    
+    region = list_region(html.encode('utf-8'), '<h2>Tin mới', '<h2>Đọc nhiều')
+    
+    assert region == '<h2>Tin mới</h2><a href="/a.html">A</a>'.encode('utf-8')
+
+
+def test_fragment_without_body_is_kept():
+    assert list_region('<a href="/a.html">A</a>') == '<a href="/a.html">A</a>'
+
+
+@pytest.fixture
+def crawler(tmp_path, monkeypatch):
+    """StaticCrawler có start/stop marker cho trang danh sách, HTTP cache trong tmp_path"""
+    monkeypatch.setattr(settings, 'WATERMARK_ENABLED', False)
+    
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    config['list_page'].update(start_marker=START, stop_marker=STOP)
+    
+    crawler = StaticCrawler(config, db_client=None)
+    crawler.http_cache = HTTPCache(cache_dir=str(tmp_path))
+    return crawler
+
+
+def fetch(crawler: StaticCrawler, html: str):
+    """Xử lý response 200 như fetch_list_page rồi lưu validator như _finish_run"""
+    entry = crawler._get_list_cache_entry(LIST_URL, 'thoi-su')
+    result = crawler._handle_list_response(LIST_URL, 'thoi-su', entry, 200, {}, html)
+    for pending in crawler._pending_http_cache.values():
+        crawler.http_cache.update(**pending)
+    return result
+
+
+def test_changes_outside_region_are_cache_hits(crawler):
+    assert fetch(crawler, PAGE) == PAGE
+    
+    changed = list_page(
+        '<a href="/a-1.html">Bài 1</a>',
+        head='<meta name="build" content="42">',
+        sidebar='Xu hướng mới',
+        footer='© 2027'
+    )
+    assert fetch(crawler, changed) is None
+    assert crawler.stats['cache_hits'] == 1
+    
+    new_article = list_page('<a href="/a-2.html">Bài 2</a><a href="/a-1.html">Bài 1</a>')
+    assert fetch(crawler, new_article) == new_article
+    assert crawler.stats['cache_hits'] == 1
@@ -0,0 +1,98 @@
+"""
+Test bulk insert: fallback insert từng bài khi batch lỗi và kết quả
+NewsBatchWriter báo qua on_result (không cần PostgreSQL)
+"""
+
+import fakeredis
+import pytest
+from storage.cache import RedisCache
+from storage.duplicate_checker import DuplicateChecker
+from utils.db_client import DatabaseClient
+from utils.news_batch_writer import NewsBatchWriter
+
+
+def make_article(i: int) -> dict:
+    """article_data tối thiểu hợp lệ"""
+    return {
+        'title': f'Title {i}',
+        'content': f'<p>Content {i}</p>',
+        'category_code': 'NEWS_TEST',
+        'source_url': f'https://example.com/a-{i}.html',
+        'source_name': 'Example'
+    }
+
+
+@pytest.fixture
+def db_client(monkeypatch):
+    """
+    DatabaseClient không kết nối database: bulk insert luôn lỗi, insert
+    từng bài lỗi với bài có title 'Title 1'
+    """
+    client = DatabaseClient.__new__(DatabaseClient)
+    cache = RedisCache(client=fakeredis.FakeRedis(decode_responses=True))
+    client.duplicate_checker = DuplicateChecker(cache=cache, use_bloom=False)
+    client.single_inserts = []
+    
+    def insert_row_single(news_row):
+        client.single_inserts.append(news_row[1])
+        return news_row[1] != 'Title 1'
+    
+    monkeypatch.setattr(client, '_insert_rows_bulk', lambda news_rows: False)
+    monkeypatch.setattr(client, '_insert_row_single', insert_row_single)
+    return client
+
+
+def test_batch_falls_back_to_single_inserts(db_client):
+    articles = [make_article(i) for i in range(3)]
+    
+    results = db_client.create_news_batch(articles)
+    
+    assert results == [True, False, True]
+    assert db_client.single_inserts == ['Title 0', 'Title 1', 'Title 2']
+    
+    # Chỉ bài insert thành công được đánh dấu crawled
+    assert db_client.filter_uncrawled([a['source_url'] for a in articles]) == [articles[1]['source_url']]
+
+
+def test_batch_skips_invalid_and_repeated_articles(db_client):
+    invalid = make_article(5)
+    del invalid['content']
+    articles = [make_article(0), make_article(0), invalid]
+    
+    assert db_client.create_news_batch(articles) == [True, False, False]
+    assert db_client.single_inserts == ['Title 0']
+
+
+def test_writer_reports_result_per_article(db_client):
+    reported = []
+    writer = NewsBatchWriter(
+        db_client,
+        batch_size=3,
+        flush_interval=60,
+        on_result=lambda article, success: reported.append((article['title'], success))
+    )
+    
+    for i in range(3):
+        writer.add(make_article(i))
+    writer.close()
+    
+    assert reported == [('Title 0', True), ('Title 1', False), ('Title 2', True)]
+
+
+def test_writer_marks_batch_failed_when_insert_raises():
+    class FailingClient:
+        def create_news_batch(self, articles):
+            raise RuntimeError('connection lost')
+    
+    reported = []
+    writer = NewsBatchWriter(
+        FailingClient(),
+        batch_size=10,
+        flush_interval=60,
+        on_result=lambda article, success: reported.append(success)
+    )
+    writer.add(make_article(0))
+    writer.add(make_article(1))
+    writer.close()
+    
+    assert reported == [False, False]
@@ -0,0 +1,64 @@
+"""
+Test RateLimiter: Retry-After, Crawl-delay và điều chỉnh interval
+
+Dùng _reserve() (số giây phải đợi) thay vì wait_if_needed để test không sleep.
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+import pytest
+from utils.rate_limiter import RateLimiter, parse_retry_after
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120.0),
+    (' 5 ', 5.0),
+    (None, None),
+    ('', None),
+    ('soon', None),
+    (format_datetime(datetime(2000, 1, 1, tzinfo=timezone.utc), usegmt=True), 0.0)
+])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=60)
+    
+    assert parse_retry_after(format_datetime(retry_at, usegmt=True)) == pytest.approx(60, abs=2)
+
+
+def test_retry_after_pauses_next_request():
+    limiter = RateLimiter(requests_per_minute=600)
+    assert limiter._reserve() == 0
+    
+    limiter.record_response(429, 0.1, retry_after=30)
+    
+    assert limiter._reserve() == pytest.approx(30, abs=1)
+    assert limiter.interval >= 1.0
+
+
+def test_crawl_delay_sets_minimum_interval():
+    limiter = RateLimiter(requests_per_minute=600, crawl_delay=5)
+    assert limiter.min_interval == 5
+    
+    limiter.set_crawl_delay(10)
+    assert limiter._reserve() == 0
+    assert limiter._reserve() == pytest.approx(10, abs=0.1)
+    
+    # Phản hồi tốt không giảm interval dưới Crawl-delay
+    for _ in range(20):
+        limiter.record_response(200, 0.1)
+    assert limiter.interval == 10
+
+
+def test_interval_backs_off_and_recovers():
+    limiter = RateLimiter(requests_per_minute=60)
+    
+    limiter.record_response(503, 0.1)
+    limiter.record_response(None, 0.1)
+    assert limiter.interval == 4.0
+    
+    for _ in range(50):
+        limiter.record_response(200, 0.1)
+    assert limiter.interval == limiter.min_interval == 1.0
@@ -0,0 +1,105 @@
+"""
+Test RobotsCache: dùng chung qua disk, TTL và refresh nền (không gọi mạng)
+"""
+
+import json
+import threading
+import time
+import pytest
+from utils.robots_checker import ROBOTS_ERROR_TTL, RobotsCache, RobotsChecker
+
+DOMAIN = 'example.com'
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+
+
+class FakeSession:
+    """Session trả lần lượt các response (hoặc raise exception) trong `responses`"""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = 0
+    
+    def get(self, url, timeout=None):
+        self.requests += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def wait_for_refresh():
+    """Đợi thread refresh nền của DOMAIN"""
+    for thread in threading.enumerate():
+        if thread.name == f'robots-{DOMAIN}':
+            thread.join(timeout=5)
+
+
+def test_robots_cached_on_disk_across_instances(tmp_path):
+    session = FakeSession(FakeResponse(200, 'User-agent: *\nDisallow: /private/\nCrawl-delay: 2'))
+    checker = RobotsChecker(DOMAIN, cache=RobotsCache(cache_dir=tmp_path, ttl=3600, session=session))
+    
+    assert not checker.can_fetch(f'https://{DOMAIN}/private/a.html')
+    assert checker.can_fetch(f'https://{DOMAIN}/news/a.html')
+    assert checker.get_crawl_delay() == 2.0
+    assert session.requests == 1
+    
+    # Lần chạy sau đọc từ disk, không tải lại
+    other_session = FakeSession()
+    other = RobotsChecker(DOMAIN, cache=RobotsCache(cache_dir=tmp_path, ttl=3600, session=other_session))
+    
+    assert not other.can_fetch(f'https://{DOMAIN}/private/a.html')
+    assert other_session.requests == 0
+
+
+def test_expired_entry_is_served_while_refreshing(tmp_path):
+    with open(tmp_path / f'{DOMAIN}.json', 'w', encoding='utf-8') as f:
+        json.dump({'status': 200, 'body': 'User-agent: *\nDisallow: /old/', 'fetched_at': time.time() - 7200}, f)
+    
+    session = FakeSession(FakeResponse(200, 'User-agent: *\nDisallow: /new/'))
+    checker = RobotsChecker(DOMAIN, cache=RobotsCache(cache_dir=tmp_path, ttl=3600, session=session))
+    
+    # Bản cũ được trả ngay, bản mới thay thế sau khi thread nền tải xong
+    assert not checker.can_fetch(f'https://{DOMAIN}/old/a.html')
+    wait_for_refresh()
+    
+    assert session.requests == 1
+    assert checker.can_fetch(f'https://{DOMAIN}/old/a.html')
+    assert not checker.can_fetch(f'https://{DOMAIN}/new/a.html')
+    
+    with open(tmp_path / f'{DOMAIN}.json', 'r', encoding='utf-8') as f:
+        assert 'Disallow: /new/' in json.load(f)['body']
+
+
+def test_failed_refresh_keeps_stale_rules(tmp_path):
+    with open(tmp_path / f'{DOMAIN}.json', 'w', encoding='utf-8') as f:
+        json.dump({'status': 200, 'body': 'User-agent: *\nDisallow: /old/', 'fetched_at': time.time() - 7200}, f)
+    
+    session = FakeSession(FakeResponse(503, ''))
+    cache = RobotsCache(cache_dir=tmp_path, ttl=3600, session=session)
+    checker = RobotsChecker(DOMAIN, cache=cache)
+    
+    checker.can_fetch(f'https://{DOMAIN}/a.html')
+    wait_for_refresh()
+    
+    assert not checker.can_fetch(f'https://{DOMAIN}/old/a.html')
+    assert cache._entries[DOMAIN]['expires_at'] == pytest.approx(time.time() + ROBOTS_ERROR_TTL, abs=5)
+    assert session.requests == 1
+
+
+@pytest.mark.parametrize('response, allowed', [
+    (ConnectionError('unreachable'), True),
+    (FakeResponse(404, ''), True),
+    (FakeResponse(403, ''), False)
+])
+def test_first_fetch_errors(tmp_path, response, allowed):
+    cache = RobotsCache(cache_dir=tmp_path, ttl=3600, session=FakeSession(response))
+    
+    assert RobotsChecker(DOMAIN, cache=cache).can_fetch(f'https://{DOMAIN}/a.html') is allowed
+    
+    # Lỗi mạng không được lưu xuống disk
+    assert (tmp_path / f'{DOMAIN}.json').exists() is not isinstance(response, Exception)
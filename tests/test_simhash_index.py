@@ -0,0 +1,74 @@
+"""
+Test SimHashIndex: tra cứu theo band với Hamming distance <= ngưỡng
+
+Chạy trên cả Redis (fakeredis) và index trong memory (Redis bị tắt).
+"""
+
+import fakeredis
+import pytest
+from config import settings
+from storage.cache import RedisCache
+from storage.simhash_index import SimHashIndex
+
+FINGERPRINT = 0x0123456789abcdef
+
+
+def flip(fingerprint: int, *bits: int) -> int:
+    """Đảo các bit cho trước"""
+    for bit in bits:
+        fingerprint ^= 1 << bit
+    return fingerprint
+
+
+@pytest.fixture(params=['redis', 'memory'])
+def index(request, monkeypatch):
+    """SimHashIndex với max_distance = 3"""
+    if request.param == 'redis':
+        cache = RedisCache(client=fakeredis.FakeRedis(decode_responses=True))
+    else:
+        monkeypatch.setattr(settings, 'REDIS_ENABLED', False)
+        cache = RedisCache()
+    
+    index = SimHashIndex(cache=cache, max_distance=3, min_words=5)
+    index.add(FINGERPRINT, 'https://a.example.com/story.html')
+    return index
+
+
+@pytest.mark.parametrize('bits', [
+    (),
+    (0,),
+    (0, 1, 2),      # cùng một band, 3 band còn lại trùng
+    (0, 16, 32),    # mỗi band một bit, band cuối trùng
+    (5, 40, 63)
+])
+def test_finds_fingerprint_within_threshold(index, bits):
+    match = index.find_near_duplicate(flip(FINGERPRINT, *bits), 'https://b.example.com/story.html')
+    
+    assert match == ('https://a.example.com/story.html', len(bits))
+
+
+@pytest.mark.parametrize('bits', [
+    (0, 1, 2, 3),       # trùng 3 band nhưng distance 4
+    (0, 16, 32, 48)     # không trùng band nào
+])
+def test_ignores_fingerprint_beyond_threshold(index, bits):
+    assert index.find_near_duplicate(flip(FINGERPRINT, *bits), 'https://b.example.com/story.html') is None
+
+
+def test_ignores_own_ref(index):
+    assert index.find_near_duplicate(FINGERPRINT, 'https://a.example.com/story.html') is None
+
+
+def test_republished_story_is_near_duplicate(index):
+    words = ' '.join(f'từ{i}' for i in range(300))
+    original = f'<p>{words}</p>'
+    republished = f'<p>Nguồn: báo khác</p><p>{words}</p>'
+    
+    fingerprint, _ = index.check(original, 'https://a.example.com/long.html')
+    index.add(fingerprint, 'https://a.example.com/long.html')
+    
+    _, match = index.check(republished, 'https://b.example.com/long.html')
+    assert match is not None and match[0] == 'https://a.example.com/long.html'
+    
+    # Nội dung quá ngắn thì không so sánh
+    assert index.check('<p>quá ngắn</p>', 'https://c.example.com/short.html') == (None, None)
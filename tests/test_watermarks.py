@@ -0,0 +1,101 @@
+"""
+Test high-water mark của trang danh sách: cắt tại watermark và giữ lại
+link bị lỗi ở lần chạy trước
+"""
+
+import json
+from pathlib import Path
+import pytest
+from config import settings
+from engine.static_crawler import StaticCrawler
+from storage.watermarks import WatermarkStore
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config' / 'domains' / 'vnexpress.json'
+LIST_URL = 'https://vnexpress.net/thoi-su'
+
+
+def url(name: str) -> str:
+    return f'https://vnexpress.net/{name}.html'
+
+
+def list_page(*names: str) -> str:
+    """Trang danh sách VnExpress với các bài theo thứ tự"""
+    items = ''.join(
+        f'<article class="item-news"><h3 class="title-news"><a href="/{name}.html">{name}</a></h3></article>'
+        for name in names
+    )
+    return f'<html><body>{items}</body></html>'
+
+
+class FakeDuplicateChecker:
+    def bloom_stats(self):
+        return None
+
+
+class FakeDBClient:
+    duplicate_checker = FakeDuplicateChecker()
+
+
+@pytest.fixture
+def crawler(tmp_path, monkeypatch):
+    """StaticCrawler với watermark trong tmp_path, dừng sau 3 link đã biết"""
+    monkeypatch.setattr(settings, 'HTTP_CACHE_ENABLED', False)
+    monkeypatch.setattr(settings, 'WATERMARK_STOP_AFTER', 3)
+    
+    with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+        crawler = StaticCrawler(json.load(f), db_client=FakeDBClient())
+    crawler.watermarks = WatermarkStore(crawler.domain, cache_dir=str(tmp_path))
+    monkeypatch.setattr(crawler.robots_checker, 'get_crawl_delay', lambda user_agent='*': 0.0)
+    return crawler
+
+
+def test_without_watermark_keeps_all_links(crawler):
+    links = [url(f'n{i}') for i in range(5)]
+    
+    assert crawler._cut_at_watermark(links, 'thoi-su') == links
+
+
+def test_cuts_after_consecutive_known_links(crawler):
+    crawler.watermarks.update({'thoi-su': [url('a1'), url('a2'), url('a3'), url('a4')]})
+    
+    # a1 được ghim đầu trang: một link đã biết không làm dừng sớm
+    links = [url(name) for name in ('a1', 'n1', 'n2', 'a2', 'a3', 'a4', 'o1', 'o2')]
+    
+    assert crawler._cut_at_watermark(links, 'thoi-su') == [url('a1'), url('n1'), url('n2')]
+    assert crawler.stats['below_watermark'] == 5
+
+
+def test_keeps_retry_links_below_watermark(crawler):
+    crawler.watermarks.update(
+        {'thoi-su': [url('a1'), url('a2'), url('a3')]},
+        retries={'thoi-su': [url('failed')]}
+    )
+    
+    links = [url(name) for name in ('n1', 'a1', 'a2', 'a3', 'o1', 'failed', 'o2')]
+    
+    assert crawler._cut_at_watermark(links, 'thoi-su') == [url('n1'), url('failed')]
+    assert crawler.stats['below_watermark'] == 5
+
+
+def test_failed_link_is_retried_next_run(crawler):
+    crawler._start_run(['thoi-su'])
+    links = crawler.parse_list_page(list_page('a1', 'a2', 'a3', 'a4', 'a5'), LIST_URL, 'thoi-su')
+    assert len(links) == 5
+    
+    crawler._record_failed_link(url('a4'))
+    crawler._finish_run()
+    
+    mark = crawler.watermarks.get('thoi-su')
+    assert mark['urls'] == [url(name) for name in ('a1', 'a2', 'a3', 'a5')]
+    assert mark['retry'] == [url('a4')]
+    
+    # Lần sau: chỉ bài mới và bài lỗi lần trước
+    crawler._start_run(['thoi-su'])
+    links = crawler.parse_list_page(list_page('n1', 'a1', 'a2', 'a3', 'a4', 'a5'), LIST_URL, 'thoi-su')
+    assert links == [url('n1'), url('a4')]
+    
+    crawler._finish_run()
+    
+    mark = crawler.watermarks.get('thoi-su')
+    assert mark['urls'] == [url(name) for name in ('n1', 'a1', 'a2', 'a3', 'a4', 'a5')]
+    assert mark['retry'] == []
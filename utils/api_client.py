@@ -7,12 +7,19 @@ import requests
 from typing import Dict, Optional, List
 from loguru import logger
 from config import settings
+from storage.duplicate_checker import DuplicateChecker
 
 
 class XWiseAPIClient:
     """Client để tương tác với X-Wise CMS API"""
     
-    def __init__(self):
+    def __init__(self, duplicate_checker: DuplicateChecker = None):
+        """
+        Args:
+            duplicate_checker: DuplicateChecker dùng chung (optional)
+        """
+        self.duplicate_checker = duplicate_checker or DuplicateChecker()
+        
         self.base_url = settings.XWISE_API_BASE_URL
         self.jwt_token = settings.XWISE_JWT_TOKEN
         
@@ -134,11 +141,8 @@ class XWiseAPIClient:
                 return False
             
             # Check duplicate using cache
-            from storage.duplicate_checker import DuplicateChecker
-            duplicate_checker = DuplicateChecker()
-            
             source_url = article_data.get('source_url')
-            if source_url and duplicate_checker.is_crawled(source_url):
+            if source_url and self.duplicate_checker.is_crawled(source_url):
                 logger.info(f"Article already crawled: {source_url}")
                 return False
             
@@ -175,7 +179,7 @@ class XWiseAPIClient:
             if news_id:
                 # Mark as crawled in cache
                 if source_url:
-                    duplicate_checker.mark_crawled(source_url, news_id)
+                    self.duplicate_checker.mark_crawled(source_url, news_id)
                 
                 logger.success(f"Created news: {news_id} - {article_data['title'][:50]}...")
                 return True
@@ -209,6 +213,16 @@ class XWiseAPIClient:
         Returns:
             True nếu đã tồn tại, False nếu chưa
         """
-        from storage.duplicate_checker import DuplicateChecker
-        duplicate_checker = DuplicateChecker()
-        return duplicate_checker.is_crawled(source_url)
+        return self.duplicate_checker.is_crawled(source_url)
+    
+    def filter_uncrawled(self, source_urls: List[str]) -> List[str]:
+        """
+        Lọc batch các URL chưa được crawl, dùng trước khi fetch trang chi tiết
+        
+        Args:
+            source_urls: List URL nguồn (đã normalize)
+            
+        Returns:
+            List các URL chưa tồn tại (giữ nguyên thứ tự)
+        """
+        return self.duplicate_checker.filter_uncrawled(source_urls)
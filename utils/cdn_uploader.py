@@ -4,21 +4,73 @@ Upload images to 0x2labs CDN
 """
 
 import requests
+import hashlib
+import threading
 from typing import Optional, Dict
 from loguru import logger
 from config import settings
 import os
 from urllib.parse import urlparse
+from storage.cache import RedisCache, get_redis_cache
+from utils.url_normalizer import URLNormalizer
+from utils.metrics import domain_of, stage_timer
 
 
 class CDNUploader:
     """Upload images to CDN"""
     
-    def __init__(self):
+    def __init__(self, cache: RedisCache = None):
+        """
+        Args:
+            cache: RedisCache cho dedup cache (optional), mặc định dùng cache chung
+        """
         self.upload_url = settings.CDN_UPLOAD_URL
         self.api_key = settings.CDN_API_KEY
         self.bucket = settings.CDN_BUCKET
         
+        # Content-addressed dedup cache: URL đã chuẩn hoá / SHA-256 -> CDN data
+        self.cache = cache or get_redis_cache()
+        self.cache_prefix = "crawler:cdn:"
+        self.cache_ttl = settings.CDN_CACHE_TTL
+        self.url_normalizer = URLNormalizer()
+        
+        self._stats_lock = threading.Lock()
+        self.cache_stats = {
+            'url_hits': 0,
+            'content_hits': 0,
+            'misses': 0
+        }
+    
+    def _url_key(self, image_url: str) -> str:
+        """Cache key theo URL ảnh đã normalize"""
+        normalized = self.url_normalizer.normalize(image_url)
+        url_hash = hashlib.sha256(normalized.encode()).hexdigest()
+        return f"{self.cache_prefix}url:{url_hash}"
+    
+    def _content_key(self, image_data: bytes) -> str:
+        """Cache key theo SHA-256 của nội dung ảnh"""
+        return f"{self.cache_prefix}sha256:{hashlib.sha256(image_data).hexdigest()}"
+    
+    def _record_cache(self, key: str):
+        """Tăng counter hit/miss (thread-safe)"""
+        with self._stats_lock:
+            self.cache_stats[key] += 1
+    
+    def get_cache_stats(self) -> Dict:
+        """
+        Thống kê dedup cache
+        
+        Returns:
+            Dict gồm url_hits, content_hits, misses, hit_rate
+        """
+        with self._stats_lock:
+            stats = dict(self.cache_stats)
+        
+        hits = stats['url_hits'] + stats['content_hits']
+        total = hits + stats['misses']
+        stats['hit_rate'] = hits / total if total else 0.0
+        return stats
+    
     def download_image(self, image_url: str) -> Optional[bytes]:
         """
         Download image from URL
@@ -86,12 +138,16 @@ class CDNUploader:
         
         return filename
     
-    def upload_to_cdn(self, image_url: str) -> Optional[Dict]:
+    def upload_to_cdn(self, image_url: str, domain: str = None) -> Optional[Dict]:
         """
         Download image and upload to CDN
         
+        Ảnh đã upload trước đó (cùng URL hoặc cùng nội dung SHA-256) được
+        lấy từ dedup cache, không download/upload lại.
+        
         Args:
             image_url: URL of the image to upload
+            domain: Domain của bài viết (label cho metrics), mặc định domain của ảnh
             
         Returns:
             Dictionary with CDN info or None if failed
@@ -104,13 +160,34 @@ class CDNUploader:
             }
         """
         try:
+            # Ảnh đã upload từ URL này
+            url_key = self._url_key(image_url)
+            cached = self.cache.get_json(url_key)
+            if cached:
+                self._record_cache('url_hits')
+                logger.debug(f"CDN cache hit (url): {image_url}")
+                return cached
+            
             # Download image
             logger.debug(f"Downloading image from: {image_url}")
-            image_data = self.download_image(image_url)
+            domain = domain or domain_of(image_url)
+            with stage_timer('cdn_download', domain):
+                image_data = self.download_image(image_url)
             
             if not image_data:
                 return None
             
+            # Cùng nội dung ảnh đã upload từ URL khác
+            content_key = self._content_key(image_data)
+            cached = self.cache.get_json(content_key)
+            if cached:
+                self._record_cache('content_hits')
+                self.cache.set_json(url_key, cached, expire=self.cache_ttl)
+                logger.debug(f"CDN cache hit (content): {image_url}")
+                return cached
+            
+            self._record_cache('misses')
+            
             # Get filename
             filename = self.get_filename_from_url(image_url)
             
@@ -131,13 +208,14 @@ class CDNUploader:
             # Upload to CDN
             logger.debug(f"Uploading to CDN: {filename}")
             
-            response = requests.post(
-                self.upload_url,
-                headers=headers,
-                files=files,
-                data=data,
-                timeout=60
-            )
+            with stage_timer('cdn_upload', domain):
+                response = requests.post(
+                    self.upload_url,
+                    headers=headers,
+                    files=files,
+                    data=data,
+                    timeout=60
+                )
             
             response.raise_for_status()
             result = response.json()
@@ -145,6 +223,12 @@ class CDNUploader:
             if result.get('success'):
                 cdn_data = result.get('data', {})
                 logger.success(f"Uploaded to CDN: {cdn_data.get('url')}")
+                
+                # Lưu vào dedup cache
+                if cdn_data.get('url'):
+                    self.cache.set_json(content_key, cdn_data, expire=self.cache_ttl)
+                    self.cache.set_json(url_key, cdn_data, expire=self.cache_ttl)
+                
                 return cdn_data
             else:
                 logger.error(f"CDN upload failed: {result}")
@@ -154,20 +238,21 @@ class CDNUploader:
             logger.error(f"Error uploading to CDN: {e}")
             return None
     
-    def upload_with_retry(self, image_url: str, retries: int = 3) -> Optional[Dict]:
+    def upload_with_retry(self, image_url: str, retries: int = 3, domain: str = None) -> Optional[Dict]:
         """
         Upload to CDN with retry logic
         
         Args:
             image_url: URL of the image
             retries: Number of retry attempts
+            domain: Domain của bài viết (label cho metrics)
             
         Returns:
             CDN data or None
         """
         for attempt in range(retries):
             try:
-                result = self.upload_to_cdn(image_url)
+                result = self.upload_to_cdn(image_url, domain)
                 if result:
                     return result
                 
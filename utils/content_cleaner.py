@@ -3,13 +3,27 @@ Content Cleaner
 Làm sạch và chuẩn hóa nội dung HTML
 """
 
-from bs4 import BeautifulSoup
 import re
+from typing import Dict, List, Optional, Union
+from lxml import etree
+from lxml import html as lxml_html
 from loguru import logger
 
 
+# Container bọc HTML string khi parse thành fragment
+_CONTAINER_TAG = 'div'
+
+
 class ContentCleaner:
-    """Làm sạch nội dung HTML"""
+    """
+    Làm sạch nội dung HTML
+    
+    Tất cả rule (tag/class/id cần bỏ, regex styling, regex text) được compile
+    một lần trong __init__ và áp dụng trong một lượt duyệt cây duy nhất
+    (xem _walk). Riêng Dân Trí cần thêm một lượt vì rule đặc thù phải chạy
+    sau bước loại bỏ và trước bước chuẩn hóa. Cleaner làm việc trên cây lxml
+    (cùng cây extractor đã parse) và serialize bằng lxml.html.tostring.
+    """
     
     def __init__(self):
         # Danh sách các class/id thường chứa quảng cáo
@@ -22,6 +36,16 @@ class ContentCleaner:
             r'commercial'
         ]
         
+        # Class/id của video container
+        self.video_patterns = [
+            r'video[-_]?',
+            r'player[-_]?',
+            r'media[-_]?player',
+            r'youtube',
+            r'vimeo',
+            r'dailymotion'
+        ]
+        
         # Danh sách các tag không mong muốn (bao gồm video)
         self.unwanted_tags = [
             'script', 'style', 'iframe', 'noscript',
@@ -33,154 +57,303 @@ class ContentCleaner:
         self.standard_font = 'Arial, sans-serif'
         self.standard_font_size = '16px'
         self.standard_line_height = '1.6'
+        
+        self._compile_rules()
     
-    def clean(self, html: str, source_name: str = '') -> str:
+    def _compile_rules(self):
+        """Compile tất cả rule một lần"""
+        # Loại bỏ element
+        self._unwanted_tag_set = frozenset(self.unwanted_tags)
+        self._removal_regex = re.compile(
+            '|'.join(self.video_patterns + self.ad_patterns),
+            re.IGNORECASE
+        )
+        
+        # Thẻ bị unwrap (giữ nội dung): link và font
+        self._unwrap_tags = frozenset(['a', 'font'])
+        
+        # Ảnh
+        self._lazy_src_attrs = ('data-src', 'data-original', 'data-lazy-src')
+        self._fallback_src_attrs = ('data-url', 'data-image', 'data-img')
+        self._img_attrs_to_keep = frozenset(['src', 'alt', 'title', 'width', 'height'])
+        
+        # Styling
+        self._style_regexes = [
+            re.compile(r'font-family:[^;]+;?', re.IGNORECASE),
+            re.compile(r'font-size:[^;]+;?', re.IGNORECASE),
+            re.compile(r'line-height:[^;]+;?', re.IGNORECASE),
+            re.compile(r'color:[^;]+;?', re.IGNORECASE)
+        ]
+        self._text_align_regex = re.compile(r'text-align:\s*([^;]+)', re.IGNORECASE)
+        self._font_attrs = ('size', 'color', 'face')
+        self._heading_tags = frozenset(f'h{i}' for i in range(1, 7))
+        
+        # Text sau khi serialize
+        self._text_rules = [
+            (re.compile(r'>\s+<'), '><'),                # Whitespace giữa các tag
+            (re.compile(r'[ \t]+'), ' '),                # Nhiều khoảng trắng
+            (re.compile(r'\s+([.,;:!?])'), r'\1'),       # Khoảng trắng trước dấu câu
+            (re.compile(r'\n{3,}'), '\n\n'),              # Nhiều dòng trống
+            (re.compile(r'<p>\s+'), '<p>'),              # Khoảng trắng đầu đoạn
+            (re.compile(r'\s+</p>'), '</p>')             # Khoảng trắng cuối đoạn
+        ]
+        self._dantri_prefix_regex = re.compile(r'^\s*\(Dân trí\)\s*[-–—]\s*', re.IGNORECASE)
+        self._dantri_paragraph_prefix_regex = re.compile(
+            r'<p[^>]*>\s*\(Dân trí\)\s*[-–—]\s*', re.IGNORECASE
+        )
+    
+    def clean(self, html: Union[str, etree._Element], source_name: str = '') -> str:
         """
         Làm sạch HTML content
         
+        Có thể truyền thẳng element lxml đã parse (ví dụ content element từ
+        extract_article_data) để không phải serialize rồi parse lại: element
+        được làm sạch tại chỗ và chỉ serialize một lần ở cuối.
+        
         Args:
-            html: Raw HTML content
+            html: Raw HTML content hoặc element lxml đã parse
             source_name: Tên nguồn tin (để xử lý đặc biệt cho từng nguồn)
             
         Returns:
             Cleaned HTML content
         """
-        if not html:
+        if html is None or (isinstance(html, str) and not html):
             return ''
         
         try:
-            soup = BeautifulSoup(html, 'lxml')
-            
-            # Remove unwanted tags (bao gồm video)
-            for tag_name in self.unwanted_tags:
-                for tag in soup.find_all(tag_name):
-                    tag.decompose()
-            
-            # Remove video containers by common class names
-            video_patterns = [
-                r'video[-_]?',
-                r'player[-_]?',
-                r'media[-_]?player',
-                r'youtube',
-                r'vimeo',
-                r'dailymotion'
-            ]
-            for pattern in video_patterns:
-                regex = re.compile(pattern, re.IGNORECASE)
-                for tag in soup.find_all(class_=regex):
-                    tag.decompose()
-                for tag in soup.find_all(id=regex):
-                    tag.decompose()
-            
-            # Remove elements with ad-related class/id
-            for pattern in self.ad_patterns:
-                regex = re.compile(pattern, re.IGNORECASE)
-                
-                # Remove by class
-                for tag in soup.find_all(class_=regex):
-                    tag.decompose()
-                
-                # Remove by id
-                for tag in soup.find_all(id=regex):
-                    tag.decompose()
+            if isinstance(html, str):
+                # Fragment: các node cấp cao nhất nằm trong một container
+                root = lxml_html.fragment_fromstring(html, create_parent=_CONTAINER_TAG)
+            else:
+                root = html
             
-            # Xử lý đặc biệt cho Dân Trí
             if 'dân trí' in source_name.lower() or 'dantri' in source_name.lower():
-                self._clean_dantri_specific(soup)
-            
-            # Remove all links from content (convert to plain text)
-            self._remove_links(soup)
-            
-            # Fix images - convert lazy loading to actual src
-            self._fix_images(soup)
-            
-            # Normalize font and styling
-            self._normalize_styling(soup)
-            
-            # Remove empty paragraphs and excessive whitespace
-            self._remove_empty_elements(soup)
-            
-            # Remove comments
-            for comment in soup.find_all(string=lambda text: isinstance(text, str) and '<!--' in text):
-                comment.extract()
+                # Dân Trí: loại bỏ -> rule đặc thù -> chuẩn hóa
+                self._walk(root, remove=True, normalize=False)
+                self._clean_dantri_specific(root)
+                self._walk(root, remove=False, normalize=True)
+            else:
+                # Loại bỏ tag/quảng cáo/video, bỏ link, sửa ảnh, chuẩn hóa
+                # styling và bỏ element rỗng trong cùng một lượt duyệt
+                self._walk(root, remove=True, normalize=True)
             
             # Get cleaned HTML
-            cleaned_html = str(soup)
+            cleaned_html = lxml_html.tostring(root, encoding='unicode', with_tail=False)
+            if root is not html:
+                # Bỏ thẻ của container, chỉ giữ nội dung
+                cleaned_html = cleaned_html[len(_CONTAINER_TAG) + 2:-(len(_CONTAINER_TAG) + 3)]
             
             # Additional text cleaning
             cleaned_html = self._clean_text(cleaned_html)
             
             # Remove "(Dân trí) - " prefix
-            cleaned_html = re.sub(r'^\s*\(Dân trí\)\s*[-–—]\s*', '', cleaned_html, flags=re.IGNORECASE)
-            cleaned_html = re.sub(r'<p[^>]*>\s*\(Dân trí\)\s*[-–—]\s*', '<p>', cleaned_html, flags=re.IGNORECASE)
+            cleaned_html = self._dantri_prefix_regex.sub('', cleaned_html)
+            cleaned_html = self._dantri_paragraph_prefix_regex.sub('<p>', cleaned_html)
             
             return cleaned_html
             
         except Exception as e:
             logger.error(f"Error cleaning content: {e}")
-            return html
+            return html if isinstance(html, str) else lxml_html.tostring(html, encoding='unicode', with_tail=False)
+    
+    def _walk(self, root: etree._Element, remove: bool, normalize: bool):
+        """
+        Duyệt cây một lượt (pre-order + post-order, không đệ quy)
+        
+        Pre-order: loại bỏ element không mong muốn, sửa ảnh, chuẩn hóa styling.
+        Post-order (khi con đã xử lý xong): bỏ <br> liên tiếp, unwrap link/font,
+        bỏ <p>/<div> rỗng. Root không bị loại bỏ hay chuẩn hóa.
+        
+        Args:
+            root: Element cần làm sạch (sửa tại chỗ)
+            remove: Áp dụng rule loại bỏ tag/quảng cáo/video
+            normalize: Áp dụng rule link/ảnh/styling/element rỗng
+        """
+        # Flag (has_text, has_img) của các element đã xử lý xong. Giữ chính
+        # element làm key để lxml trả lại cùng proxy object khi duyệt lại
+        flags: Dict[etree._Element, tuple] = {}
+        
+        stack = [(root, list(root), 0)]
+        
+        while stack:
+            node, children, index = stack.pop()
+            
+            if index < len(children):
+                stack.append((node, children, index + 1))
+                child = children[index]
+                
+                if not isinstance(child.tag, str):
+                    # Comment / processing instruction
+                    continue
+                
+                if remove and self._should_remove(child):
+                    _drop(child)
+                    continue
+                
+                if normalize:
+                    if child.tag == 'img' and not self._fix_image(child):
+                        continue
+                    self._normalize_element_styling(child)
+                
+                stack.append((child, list(child), 0))
+                continue
+            
+            # Post-order
+            if not normalize:
+                continue
+            
+            name = node.tag
+            if node is not root and name in self._unwrap_tags:
+                # Nội dung được đẩy lên parent, parent sẽ xử lý <br> và flag
+                _unwrap(node)
+                continue
+            
+            self._remove_consecutive_br(node)
+            has_text, has_img = self._element_flags(node, flags)
+            
+            if node is root:
+                continue
+            
+            if name == 'p':
+                text = ''.join(node.itertext()).strip()
+                # Remove if empty or only contains whitespace/special chars
+                if not text or text in ['&nbsp;', '\xa0', ' ']:
+                    _drop(node)
+                    continue
+            elif name == 'div' and not has_text and not has_img:
+                _drop(node)
+                continue
+            
+            flags[node] = (has_text, has_img)
+    
+    def _should_remove(self, tag: etree._Element) -> bool:
+        """Tag không mong muốn hoặc class/id giống quảng cáo/video"""
+        if tag.tag in self._unwanted_tag_set:
+            return True
+        
+        # Pattern không chứa khoảng trắng nên search cả chuỗi class
+        # tương đương search từng class
+        classes = tag.get('class')
+        if classes and self._removal_regex.search(classes):
+            return True
+        
+        element_id = tag.get('id')
+        if element_id and self._removal_regex.search(element_id):
+            return True
+        
+        return False
+    
+    def _element_flags(self, node: etree._Element, flags: Dict[etree._Element, tuple]) -> tuple:
+        """
+        Tính (has_text, has_img) của element từ các con đã xử lý xong
+        
+        has_text: element có text khác khoảng trắng
+        """
+        has_text = bool(node.text and node.text.strip())
+        has_img = False
+        
+        for child in node:
+            if isinstance(child.tag, str):
+                if child.tag == 'img':
+                    has_img = True
+                child_text, child_img = flags.get(child, (False, False))
+                has_text = has_text or child_text
+                has_img = has_img or child_img
+            
+            if child.tail and child.tail.strip():
+                has_text = True
+            
+            if has_text and has_img:
+                break
+        
+        return has_text, has_img
+    
+    def _remove_consecutive_br(self, node: etree._Element):
+        """Bỏ <br> nếu ngay sau nó là một <br> khác"""
+        for child in list(node):
+            if child.tag == 'br' and not child.tail:
+                next_sibling = child.getnext()
+                if next_sibling is not None and next_sibling.tag == 'br':
+                    _drop(child)
+    
+    def _find_all(self, root: etree._Element, tag: str, class_=None, href=None) -> List[etree._Element]:
+        """
+        Element con cháu (không tính root) theo tag và điều kiện trên class/href
+        
+        class_ / href nhận giá trị attribute (None nếu không có).
+        """
+        return [
+            element for element in root.iterdescendants(tag)
+            if (class_ is None or class_(element.get('class')))
+            and (href is None or href(element.get('href')))
+        ]
+    
+    def _find(self, root: etree._Element, tag: str, href=None) -> Optional[etree._Element]:
+        """Element con cháu đầu tiên khớp (xem _find_all)"""
+        matches = self._find_all(root, tag, href=href)
+        return matches[0] if matches else None
     
-    def _clean_dantri_specific(self, soup: BeautifulSoup):
+    def _clean_dantri_specific(self, root: etree._Element):
         """
         Xử lý đặc biệt cho nội dung Dân Trí
         
         Args:
-            soup: BeautifulSoup object
+            root: Element cần làm sạch (sửa tại chỗ)
         """
         # Remove h1 title (it's already saved separately in title field)
-        for h1 in soup.find_all('h1'):
-            h1.decompose()
+        for h1 in self._find_all(root, 'h1'):
+            _drop(h1)
         
         # Remove category tags (THỜI SỰ, etc.)
         # e-magazine__maincate contains category name
-        for div in soup.find_all('div', class_=lambda x: x and 'maincate' in str(x).lower()):
-            div.decompose()
+        for div in self._find_all(root, 'div', class_=lambda x: x and 'maincate' in x.lower()):
+            _drop(div)
         
         # Remove author info section (Thực hiện:, etc.)
         # e-magazine__info and e-magazine__meta contain author info
-        for div in soup.find_all('div', class_=lambda x: x and ('e-magazine__info' in str(x) or 'e-magazine__meta' in str(x))):
-            div.decompose()
+        for div in self._find_all(root, 'div', class_=lambda x: x and ('e-magazine__info' in x or 'e-magazine__meta' in x)):
+            _drop(div)
         
         # Remove any remaining author meta items
-        for span in soup.find_all('span', class_=lambda x: x and 'author' in str(x).lower()):
-            span.decompose()
+        for span in self._find_all(root, 'span', class_=lambda x: x and 'author' in x.lower()):
+            _drop(span)
         
         # Remove category tags (usually at the beginning of content)
         # Dantri uses div with class containing 'tag' or 'category'
-        for div in soup.find_all('div', class_=lambda x: x and ('tag' in str(x).lower() or 'category' in str(x).lower())):
-            div.decompose()
+        for div in self._find_all(root, 'div', class_=lambda x: x and ('tag' in x.lower() or 'category' in x.lower())):
+            _drop(div)
         
         # Remove breadcrumb navigation
-        for nav in soup.find_all('nav'):
-            nav.decompose()
+        for nav in self._find_all(root, 'nav'):
+            _drop(nav)
         
-        for ul in soup.find_all('ul', class_=lambda x: x and 'breadcrumb' in str(x).lower()):
-            ul.decompose()
+        for ul in self._find_all(root, 'ul', class_=lambda x: x and 'breadcrumb' in x.lower()):
+            _drop(ul)
         
         # Remove author info container (avatar, name, time)
         # Dantri uses specific structure: div.dt-flex.dt-items-center.dt-gap-1
-        for div in soup.find_all('div', class_=lambda x: x and 'dt-flex' in x and 'dt-items-center' in x):
+        for div in self._find_all(root, 'div', class_=lambda x: x and 'dt-flex' in x and 'dt-items-center' in x):
             # Check if contains author link or avatar
-            if div.find('a', href=lambda x: x and 'tac-gia' in x):
-                div.decompose()
+            if self._find(div, 'a', href=lambda x: x and 'tac-gia' in x) is not None:
+                _drop(div)
                 continue
             # Check if contains time element
-            if div.find('time'):
-                div.decompose()
+            if self._find(div, 'time') is not None:
+                _drop(div)
                 continue
         
         # Remove all links to author pages
-        for a in soup.find_all('a', href=lambda x: x and 'tac-gia' in x):
-            parent = a.parent
-            if parent:
-                parent.decompose()
+        for a in self._find_all(root, 'a', href=lambda x: x and 'tac-gia' in x):
+            parent = a.getparent()
+            if parent is not None:
+                _drop(parent)
         
         # Remove time/date elements
-        for time_tag in soup.find_all('time'):
-            time_tag.decompose()
+        for time_tag in self._find_all(root, 'time'):
+            _drop(time_tag)
         
         # Remove avatar images (small images, usually 24x24 or 36x36)
-        for img in soup.find_all('img'):
+        for img in self._find_all(root, 'img'):
             width = img.get('width', '')
             height = img.get('height', '')
             alt = img.get('alt', '').lower()
@@ -188,180 +361,157 @@ class ContentCleaner:
             
             # Remove if it's a small avatar image
             if (width and int(width) <= 50) or (height and int(height) <= 50):
-                img.decompose()
+                _drop(img)
             elif 'avatar' in alt or 'avatar' in src or 'tac-gia' in src:
-                img.decompose()
+                _drop(img)
         
         # Remove "(Dân trí) - " from h2 sapo
-        for h2 in soup.find_all('h2'):
-            text = h2.get_text()
+        for h2 in self._find_all(root, 'h2'):
+            text = ''.join(h2.itertext())
             if text.startswith('(Dân trí)') or text.startswith('(Dân Trí)'):
                 # Remove the prefix
                 new_text = re.sub(r'^\s*\(Dân [tT]rí\)\s*[-–—]\s*', '', text)
-                h2.string = new_text
+                for child in list(h2):
+                    h2.remove(child)
+                h2.text = new_text
     
-    def _remove_links(self, soup: BeautifulSoup):
+    def _fix_image(self, img: etree._Element) -> bool:
         """
-        Remove all links from content (convert to plain text)
+        Fix image tag - convert lazy loading to actual src
         
         Args:
-            soup: BeautifulSoup object
-        """
-        for a in soup.find_all('a'):
-            # Keep the text but remove the link
-            a.unwrap()
-    
-    def _fix_images(self, soup: BeautifulSoup):
-        """
-        Fix image tags - convert lazy loading to actual src
-        
-        Args:
-            soup: BeautifulSoup object
-        """
-        for img in soup.find_all('img'):
-            # Check for lazy loading attributes
-            if img.has_attr('data-src'):
-                img['src'] = img['data-src']
-                del img['data-src']
-            
-            if img.has_attr('data-original'):
-                img['src'] = img['data-original']
-                del img['data-original']
+            img: <img> element
             
-            if img.has_attr('data-lazy-src'):
-                img['src'] = img['data-lazy-src']
-                del img['data-lazy-src']
-            
-            # Remove loading="lazy" attribute
-            if img.has_attr('loading'):
-                del img['loading']
-            
-            # Ensure img has src attribute
-            if not img.has_attr('src') or not img['src'] or img['src'].startswith('data:'):
-                # Try to find src in other attributes
-                for attr in ['data-url', 'data-image', 'data-img']:
-                    if img.has_attr(attr):
-                        img['src'] = img[attr]
-                        break
-                else:
-                    # If still no valid src, remove the img tag
-                    img.decompose()
-                    continue
-            
-            # Add alt text if missing
-            if not img.has_attr('alt'):
-                img['alt'] = 'Image'
-            
-            # Remove excessive attributes
-            attrs_to_keep = ['src', 'alt', 'title', 'width', 'height']
-            attrs_to_remove = [attr for attr in img.attrs if attr not in attrs_to_keep]
-            for attr in attrs_to_remove:
-                del img[attr]
-    
-    def _remove_empty_elements(self, soup: BeautifulSoup):
+        Returns:
+            False nếu ảnh không có src hợp lệ và đã bị bỏ
         """
-        Remove empty elements and excessive whitespace
+        attrs = img.attrib
+        
+        # Check for lazy loading attributes
+        for attr in self._lazy_src_attrs:
+            if attr in attrs:
+                attrs['src'] = attrs[attr]
+                del attrs[attr]
+        
+        # Remove loading="lazy" attribute
+        if 'loading' in attrs:
+            del attrs['loading']
+        
+        # Ensure img has src attribute
+        if not attrs.get('src') or attrs['src'].startswith('data:'):
+            # Try to find src in other attributes
+            for attr in self._fallback_src_attrs:
+                if attr in attrs:
+                    attrs['src'] = attrs[attr]
+                    break
+            else:
+                # If still no valid src, remove the img tag
+                _drop(img)
+                return False
         
-        Args:
-            soup: BeautifulSoup object
-        """
-        # Remove empty paragraphs
-        for p in soup.find_all('p'):
-            text = p.get_text(strip=True)
-            # Remove if empty or only contains whitespace/special chars
-            if not text or text in ['&nbsp;', '\xa0', ' ']:
-                p.decompose()
-        
-        # Remove empty divs
-        for div in soup.find_all('div'):
-            if not div.get_text(strip=True) and not div.find_all('img'):
-                div.decompose()
-        
-        # Remove excessive br tags
-        for br in soup.find_all('br'):
-            # Check if there are multiple consecutive br tags
-            next_sibling = br.next_sibling
-            if next_sibling and next_sibling.name == 'br':
-                br.decompose()
+        # Add alt text if missing
+        if 'alt' not in attrs:
+            attrs['alt'] = 'Image'
+        
+        # Remove excessive attributes
+        attrs_to_remove = [attr for attr in attrs if attr not in self._img_attrs_to_keep]
+        for attr in attrs_to_remove:
+            del attrs[attr]
+        
+        return True
     
-    def _normalize_styling(self, soup: BeautifulSoup):
+    def _normalize_element_styling(self, tag: etree._Element):
         """
-        Chuẩn hóa font, cỡ chữ và styling
+        Chuẩn hóa font, cỡ chữ và styling của một element
         
         Args:
-            soup: BeautifulSoup object
+            tag: Element cần chuẩn hóa
         """
+        attrs = tag.attrib
+        
         # Remove inline styles that affect font/size
-        for tag in soup.find_all(style=True):
-            style = tag.get('style', '')
-            # Remove font-related styles
-            style = re.sub(r'font-family:[^;]+;?', '', style, flags=re.IGNORECASE)
-            style = re.sub(r'font-size:[^;]+;?', '', style, flags=re.IGNORECASE)
-            style = re.sub(r'line-height:[^;]+;?', '', style, flags=re.IGNORECASE)
-            style = re.sub(r'color:[^;]+;?', '', style, flags=re.IGNORECASE)
+        if 'style' in attrs:
+            style = attrs['style']
+            for regex in self._style_regexes:
+                style = regex.sub('', style)
             
             if style.strip():
-                tag['style'] = style.strip()
+                attrs['style'] = style.strip()
             else:
-                del tag['style']
-        
-        # Remove font tags
-        for font_tag in soup.find_all('font'):
-            font_tag.unwrap()
+                del attrs['style']
         
         # Remove size/color attributes
-        for tag in soup.find_all():
-            if tag.has_attr('size'):
-                del tag['size']
-            if tag.has_attr('color'):
-                del tag['color']
-            if tag.has_attr('face'):
-                del tag['face']
-        
-        # Normalize heading tags
-        for i in range(1, 7):
-            for heading in soup.find_all(f'h{i}'):
-                # Remove inline styles from headings
-                if heading.has_attr('style'):
-                    del heading['style']
-        
-        # Normalize paragraph tags
-        for p in soup.find_all('p'):
-            # Remove inline styles from paragraphs
-            if p.has_attr('style'):
-                style = p.get('style', '')
-                # Keep only important styles like text-align
-                important_styles = []
-                if 'text-align' in style.lower():
-                    align_match = re.search(r'text-align:\s*([^;]+)', style, re.IGNORECASE)
-                    if align_match:
-                        important_styles.append(f'text-align: {align_match.group(1).strip()}')
-                
-                if important_styles:
-                    p['style'] = '; '.join(important_styles)
-                else:
-                    del p['style']
+        for attr in self._font_attrs:
+            if attr in attrs:
+                del attrs[attr]
+        
+        # Remove inline styles from headings
+        if tag.tag in self._heading_tags:
+            if 'style' in attrs:
+                del attrs['style']
+        
+        # Paragraph: keep only important styles like text-align
+        elif tag.tag == 'p' and 'style' in attrs:
+            style = attrs['style']
+            important_styles = []
+            if 'text-align' in style.lower():
+                align_match = self._text_align_regex.search(style)
+                if align_match:
+                    important_styles.append(f'text-align: {align_match.group(1).strip()}')
+            
+            if important_styles:
+                attrs['style'] = '; '.join(important_styles)
+            else:
+                del attrs['style']
     
     def _clean_text(self, html: str) -> str:
         """Làm sạch text trong HTML"""
-        # Remove excessive whitespace between tags
-        html = re.sub(r'>\s+<', '><', html)
-        
-        # Remove multiple spaces within text
-        html = re.sub(r'[ \t]+', ' ', html)
-        
-        # Remove spaces before punctuation
-        html = re.sub(r'\s+([.,;:!?])', r'\1', html)
-        
-        # Remove multiple line breaks (more than 2)
-        html = re.sub(r'\n{3,}', '\n\n', html)
-        
-        # Remove leading/trailing whitespace in paragraphs
-        html = re.sub(r'<p>\s+', '<p>', html)
-        html = re.sub(r'\s+</p>', '</p>', html)
+        for regex, replacement in self._text_rules:
+            html = regex.sub(replacement, html)
         
         # Remove &nbsp; entities
         html = html.replace('&nbsp;', ' ')
         html = html.replace('\xa0', ' ')
         
         return html.strip()
+
+
+
+def _drop(element: etree._Element):
+    """Bỏ element (kèm nội dung) nhưng giữ lại tail text của nó"""
+    parent = element.getparent()
+    if parent is None:
+        return
+    
+    if element.tail:
+        previous = element.getprevious()
+        if previous is None:
+            parent.text = (parent.text or '') + element.tail
+        else:
+            previous.tail = (previous.tail or '') + element.tail
+    
+    parent.remove(element)
+
+
+def _unwrap(element: etree._Element):
+    """Thay element bằng nội dung của nó (text, con, tail giữ nguyên vị trí)"""
+    parent = element.getparent()
+    previous = element.getprevious()
+    
+    if element.text:
+        if previous is None:
+            parent.text = (parent.text or '') + element.text
+        else:
+            previous.tail = (previous.tail or '') + element.text
+    
+    if element.tail:
+        if len(element):
+            last = element[-1]
+            last.tail = (last.tail or '') + element.tail
+        elif previous is None:
+            parent.text = (parent.text or '') + element.tail
+        else:
+            previous.tail = (previous.tail or '') + element.tail
+    
+    index = parent.index(element)
+    parent[index:index + 1] = list(element)
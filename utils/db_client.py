@@ -3,19 +3,51 @@ Database Client
 Kết nối trực tiếp với PostgreSQL database
 """
 
+import threading
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2 import extensions, pool
+from psycopg2.extras import RealDictCursor, execute_values
 from typing import Dict, Optional, List
 from loguru import logger
 from config import settings
+from storage.duplicate_checker import DuplicateChecker
+from utils.metrics import domain_of
 import uuid
 from datetime import datetime
 
 
+# Các INSERT được PREPARE một lần trên mỗi connection trong pool
+PREPARED_STATEMENTS = {
+    'insert_news': """
+        INSERT INTO news (id, title, content, status, category_code, created_at, reaction_count)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+    """,
+    'insert_attachment': """
+        INSERT INTO attachment (id, url, object_type, object_id, created_at, status, file_name, extension)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+    """
+}
+
+
+class PreparedConnection(extensions.connection):
+    """psycopg2 connection ghi nhớ các statement đã PREPARE"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+
 class DatabaseClient:
     """Client để tương tác trực tiếp với PostgreSQL"""
     
-    def __init__(self):
+    def __init__(self, duplicate_checker: DuplicateChecker = None):
+        """
+        Args:
+            duplicate_checker: DuplicateChecker dùng chung (optional),
+                mặc định dùng Redis connection pool chung của process
+        """
+        self.duplicate_checker = duplicate_checker or DuplicateChecker()
+        
         self.connection_params = {
             'host': settings.DB_WISE_HOST,
             'port': settings.DB_WISE_PORT,
@@ -24,10 +56,21 @@ class DatabaseClient:
             'database': settings.DB_WISE_NAME
         }
         
+        # Connection pool dùng chung cho các crawler worker
+        # Semaphore để worker đợi khi pool hết connection thay vì PoolError
+        self._pool = None
+        self._pool_slots = threading.BoundedSemaphore(settings.DB_POOL_MAX_CONN)
+        
         # Test connection
         try:
+            self._pool = pool.ThreadedConnectionPool(
+                settings.DB_POOL_MIN_CONN,
+                settings.DB_POOL_MAX_CONN,
+                connection_factory=PreparedConnection,
+                **self.connection_params
+            )
             conn = self._get_connection()
-            conn.close()
+            self._release_connection(conn)
             logger.info(f"Connected to database: {settings.DB_WISE_NAME}@{settings.DB_WISE_HOST}")
         except Exception as e:
             logger.error(f"Failed to connect to database: {e}")
@@ -35,10 +78,68 @@ class DatabaseClient:
         
         # Cache categories
         self._categories_cache = None
+        
+        # Thumbnail pipeline (tạo lazy khi có thumbnail đầu tiên)
+        self._thumbnail_pipeline = None
+        self._thumbnail_lock = threading.Lock()
     
     def _get_connection(self):
-        """Get database connection"""
-        return psycopg2.connect(**self.connection_params)
+        """
+        Lấy connection từ pool (đợi nếu tất cả connection đang được dùng)
+        
+        Mọi connection lấy ra phải được trả lại bằng _release_connection
+        """
+        self._pool_slots.acquire()
+        try:
+            return self._pool.getconn()
+        except Exception:
+            self._pool_slots.release()
+            raise
+    
+    def _release_connection(self, conn, discard: bool = False):
+        """
+        Trả connection về pool
+        
+        Args:
+            conn: Connection lấy từ _get_connection
+            discard: True để đóng connection (ví dụ sau khi lỗi)
+        """
+        try:
+            self._pool.putconn(conn, close=discard or conn.closed)
+        except Exception as e:
+            logger.warning(f"Error returning connection to pool: {e}")
+        finally:
+            self._pool_slots.release()
+    
+    def _execute_prepared(self, cursor, name: str, params: tuple):
+        """
+        Chạy statement đã PREPARE, PREPARE lần đầu trên connection này
+        
+        Args:
+            cursor: Cursor của connection lấy từ pool
+            name: Key trong PREPARED_STATEMENTS
+            params: Tham số theo thứ tự $1, $2, ...
+        """
+        prepared = cursor.connection.prepared_statements
+        if name not in prepared:
+            cursor.execute(f"PREPARE {name} AS {PREPARED_STATEMENTS[name]}")
+            prepared.add(name)
+        
+        placeholders = ', '.join(['%s'] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+    
+    def close(self):
+        """Đợi thumbnail pipeline xử lý xong, lưu snapshot Bloom filter rồi đóng tất cả connection trong pool"""
+        with self._thumbnail_lock:
+            pipeline, self._thumbnail_pipeline = self._thumbnail_pipeline, None
+        if pipeline:
+            pipeline.close()
+        
+        self.duplicate_checker.save_bloom_snapshot()
+        
+        if self._pool and not self._pool.closed:
+            self._pool.closeall()
+            logger.info("Closed database connection pool")
     
     def get_categories(self) -> List[Dict]:
         """
@@ -50,6 +151,7 @@ class DatabaseClient:
         if self._categories_cache:
             return self._categories_cache
         
+        conn = None
         try:
             conn = self._get_connection()
             cursor = conn.cursor(cursor_factory=RealDictCursor)
@@ -64,12 +166,14 @@ class DatabaseClient:
             self._categories_cache = [dict(row) for row in cursor.fetchall()]
             
             cursor.close()
-            conn.close()
+            self._release_connection(conn)
             
             logger.info(f"Loaded {len(self._categories_cache)} categories")
             return self._categories_cache
             
         except Exception as e:
+            if conn:
+                self._release_connection(conn, discard=True)
             logger.error(f"Error fetching categories: {e}")
             return []
     
@@ -89,10 +193,118 @@ class DatabaseClient:
         # Deprecated - không sử dụng
         return None
     
+    def _validate_article(self, article_data: Dict) -> bool:
+        """Kiểm tra các trường bắt buộc của bài viết"""
+        for field in ('title', 'content', 'category_code'):
+            if not article_data.get(field):
+                logger.error(f"Missing required field: {field}")
+                return False
+        return True
+    
+    def _build_news_row(self, news_id: str, article_data: Dict) -> tuple:
+        """
+        Tạo tuple giá trị cho INSERT INTO news
+        
+        Args:
+            news_id: UUID của news mới
+            article_data: Dữ liệu bài viết đã validate
+            
+        Returns:
+            (id, title, content, status, category_code, created_at, reaction_count)
+        """
+        content = article_data['content']
+        
+        # Add source info to content as HTML comment
+        source_url = article_data.get('source_url')
+        if source_url:
+            source_name = article_data.get('source_name', 'Unknown')
+            content += f'\n<!-- Source: {source_name} | URL: {source_url} -->'
+        
+        return (
+            news_id,
+            article_data['title'][:500],  # Max 500 chars for title
+            content,
+            'ACTIVE',
+            article_data['category_code'],
+            datetime.now(),
+            0
+        )
+    
+    def _build_attachment_row(self, news_id: str, cdn_data: Dict) -> tuple:
+        """
+        Tạo tuple giá trị cho INSERT INTO attachment từ CDN response
+        
+        Returns:
+            (id, url, object_type, object_id, created_at, status, file_name, extension)
+        """
+        return (
+            str(uuid.uuid4()),
+            cdn_data['url'],  # CDN URL
+            'news',  # lowercase object_type
+            news_id,
+            datetime.now(),
+            'ACTIVE',
+            cdn_data.get('key', ''),
+            cdn_data.get('mimetype', 'image/jpeg').split('/')[-1]
+        )
+    
+    def _queue_thumbnail(self, news_id: str, thumbnail_url: str, domain: str = None):
+        """
+        Đưa thumbnail vào image pipeline, attachment được tạo khi upload xong
+        
+        Args:
+            news_id: ID của news đã commit
+            thumbnail_url: URL ảnh gốc
+            domain: Domain của bài viết (label cho metrics)
+        """
+        with self._thumbnail_lock:
+            if self._thumbnail_pipeline is None:
+                from utils.thumbnail_pipeline import ThumbnailPipeline
+                self._thumbnail_pipeline = ThumbnailPipeline(self)
+            pipeline = self._thumbnail_pipeline
+        
+        pipeline.submit(news_id, thumbnail_url, domain)
+    
+    def create_attachment(self, news_id: str, cdn_data: Dict) -> bool:
+        """
+        Tạo attachment record cho news từ CDN response
+        
+        Args:
+            news_id: ID của news
+            cdn_data: Dict trả về từ CDNUploader (url, key, mimetype, ...)
+            
+        Returns:
+            True nếu thành công, False nếu thất bại
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            self._execute_prepared(
+                cursor, 'insert_attachment', self._build_attachment_row(news_id, cdn_data)
+            )
+            conn.commit()
+            
+            cursor.close()
+            self._release_connection(conn)
+            
+            logger.success(f"Created attachment: {cdn_data['url']}")
+            return True
+            
+        except Exception as e:
+            if conn:
+                self._release_connection(conn, discard=True)
+            logger.error(f"Error creating attachment for news {news_id}: {e}")
+            return False
+    
     def create_news(self, article_data: Dict) -> bool:
         """
         Tạo tin tức mới trong database với thumbnail upload lên CDN
         
+        News row được commit ngay; thumbnail được đưa vào ThumbnailPipeline
+        và attachment record được tạo khi upload CDN xong.
+        
         Args:
             article_data: Dictionary chứa dữ liệu bài viết
                 - title: str (required)
@@ -108,24 +320,12 @@ class DatabaseClient:
         conn = None
         try:
             # Validate required fields
-            if not article_data.get('title'):
-                logger.error("Missing required field: title")
-                return False
-            
-            if not article_data.get('content'):
-                logger.error("Missing required field: content")
-                return False
-            
-            if not article_data.get('category_code'):
-                logger.error("Missing required field: category_code")
+            if not self._validate_article(article_data):
                 return False
             
             # Check duplicate using cache
-            from storage.duplicate_checker import DuplicateChecker
-            duplicate_checker = DuplicateChecker()
-            
             source_url = article_data.get('source_url')
-            if source_url and duplicate_checker.is_crawled(source_url):
+            if source_url and self.duplicate_checker.is_crawled(source_url):
                 logger.info(f"Article already crawled: {source_url}")
                 return False
             
@@ -134,79 +334,144 @@ class DatabaseClient:
             
             # Create news record
             news_id = str(uuid.uuid4())
-            content = article_data['content']
+            self._execute_prepared(cursor, 'insert_news', self._build_news_row(news_id, article_data))
+            
+            conn.commit()
+            cursor.close()
+            self._release_connection(conn)
+            conn = None
             
-            # Add source info to content as HTML comment
+            # Mark as crawled in cache
             if source_url:
-                source_name = article_data.get('source_name', 'Unknown')
-                content += f'\n<!-- Source: {source_name} | URL: {source_url} -->'
+                self.duplicate_checker.mark_crawled(source_url, news_id)
             
-            cursor.execute("""
-                INSERT INTO news (id, title, content, status, category_code, created_at, reaction_count)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                news_id,
-                article_data['title'][:500],  # Max 500 chars for title
-                content,
-                'ACTIVE',
-                article_data['category_code'],
-                datetime.now(),
-                0
-            ))
-            
-            # Upload thumbnail to CDN and create attachment record
+            logger.success(f"Created news: {news_id} - {article_data['title'][:50]}...")
+            
+            # Upload thumbnail to CDN ngoài transaction, attachment tạo sau
             if article_data.get('thumbnail'):
-                try:
-                    from utils.cdn_uploader import CDNUploader
-                    
-                    cdn_uploader = CDNUploader()
-                    cdn_data = cdn_uploader.upload_with_retry(article_data['thumbnail'])
-                    
-                    if cdn_data:
-                        # Create attachment record with CDN URL
-                        attachment_id = str(uuid.uuid4())
-                        
-                        cursor.execute("""
-                            INSERT INTO attachment (id, url, object_type, object_id, created_at, status, file_name, extension)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                        """, (
-                            attachment_id,
-                            cdn_data['url'],  # CDN URL
-                            'news',  # lowercase object_type
-                            news_id,
-                            datetime.now(),
-                            'ACTIVE',
-                            cdn_data.get('key', ''),
-                            cdn_data.get('mimetype', 'image/jpeg').split('/')[-1]
-                        ))
-                        
-                        logger.success(f"Created attachment: {cdn_data['url']}")
-                    else:
-                        logger.warning(f"Failed to upload thumbnail to CDN for news: {news_id}")
-                        
-                except Exception as e:
-                    logger.error(f"Error uploading thumbnail to CDN: {e}")
-                    # Continue without thumbnail - don't fail the whole operation
+                self._queue_thumbnail(news_id, article_data['thumbnail'], domain_of(source_url))
             
-            conn.commit()
+            return True
             
-            # Mark as crawled in cache
+        except Exception as e:
+            if conn:
+                # Đóng connection sẽ rollback transaction đang dở
+                self._release_connection(conn, discard=True)
+            logger.error(f"Error creating news: {e}")
+            return False
+    
+    def create_news_batch(self, articles: List[Dict]) -> List[bool]:
+        """
+        Tạo nhiều tin tức trong một transaction (bulk insert)
+        
+        News được ghi bằng execute_values và cả batch được đánh dấu crawled
+        trong Redis sau khi commit, thumbnail được đưa vào ThumbnailPipeline.
+        Nếu bulk insert lỗi, từng bài được insert lại riêng để một bài lỗi
+        không kéo theo cả batch.
+        
+        Args:
+            articles: List article_data (cùng format với create_news)
+            
+        Returns:
+            List bool, kết quả tương ứng với từng bài viết
+        """
+        results = [False] * len(articles)
+        
+        # Validate + bỏ bài đã crawl (một round-trip Redis cho cả batch)
+        valid = [i for i, article in enumerate(articles) if self._validate_article(article)]
+        source_urls = [articles[i]['source_url'] for i in valid if articles[i].get('source_url')]
+        uncrawled = set(self.duplicate_checker.filter_uncrawled(source_urls, exact=True))
+        
+        pending = []
+        batch_urls = set()
+        for i in valid:
+            source_url = articles[i].get('source_url')
             if source_url:
-                duplicate_checker.mark_crawled(source_url, news_id)
+                if source_url not in uncrawled or source_url in batch_urls:
+                    logger.info(f"Article already crawled: {source_url}")
+                    continue
+                batch_urls.add(source_url)
+            pending.append(i)
+        
+        if not pending:
+            return results
+        
+        # Chuẩn bị news rows
+        rows = {i: self._build_news_row(str(uuid.uuid4()), articles[i]) for i in pending}
+        
+        if self._insert_rows_bulk(list(rows.values())):
+            inserted = pending
+        else:
+            logger.warning(f"Bulk insert of {len(pending)} articles failed, inserting one by one")
+            inserted = [i for i in pending if self._insert_row_single(rows[i])]
+        
+        for i in inserted:
+            results[i] = True
+        
+        # Mark cả batch crawled sau khi commit
+        self.duplicate_checker.mark_crawled_many(
+            (articles[i]['source_url'], rows[i][0])
+            for i in inserted if articles[i].get('source_url')
+        )
+        
+        logger.success(f"Created {len(inserted)}/{len(articles)} news in batch")
+        
+        # Thumbnail xử lý ngoài transaction
+        for i in inserted:
+            if articles[i].get('thumbnail'):
+                self._queue_thumbnail(rows[i][0], articles[i]['thumbnail'], domain_of(articles[i].get('source_url')))
+        
+        return results
+    
+    def _insert_rows_bulk(self, news_rows: List[tuple]) -> bool:
+        """
+        INSERT news rows bằng execute_values trong một transaction
+        
+        Args:
+            news_rows: List tuple từ _build_news_row
             
-            logger.success(f"Created news: {news_id} - {article_data['title'][:50]}...")
+        Returns:
+            True nếu commit thành công
+        """
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
             
+            execute_values(cursor, """
+                INSERT INTO news (id, title, content, status, category_code, created_at, reaction_count)
+                VALUES %s
+            """, news_rows, page_size=len(news_rows))
+            
+            conn.commit()
             cursor.close()
-            conn.close()
+            self._release_connection(conn)
+            return True
+            
+        except Exception as e:
+            if conn:
+                self._release_connection(conn, discard=True)
+            logger.error(f"Error bulk inserting news: {e}")
+            return False
+    
+    def _insert_row_single(self, news_row: tuple) -> bool:
+        """INSERT một news row trong transaction riêng"""
+        conn = None
+        try:
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            
+            self._execute_prepared(cursor, 'insert_news', news_row)
             
+            conn.commit()
+            cursor.close()
+            self._release_connection(conn)
             return True
             
         except Exception as e:
             if conn:
-                conn.rollback()
-                conn.close()
-            logger.error(f"Error creating news: {e}")
+                self._release_connection(conn, discard=True)
+            logger.error(f"Error creating news {news_row[1][:50]}: {e}")
             return False
     
     def check_duplicate(self, source_url: str) -> bool:
@@ -219,12 +484,11 @@ class DatabaseClient:
         Returns:
             True nếu đã tồn tại, False nếu chưa
         """
-        from storage.duplicate_checker import DuplicateChecker
-        duplicate_checker = DuplicateChecker()
-        return duplicate_checker.is_crawled(source_url)
+        return self.duplicate_checker.is_crawled(source_url)
     
     def get_news_count(self) -> int:
         """Get total news count"""
+        conn = None
         try:
             conn = self._get_connection()
             cursor = conn.cursor()
@@ -233,9 +497,23 @@ class DatabaseClient:
             count = cursor.fetchone()[0]
             
             cursor.close()
-            conn.close()
+            self._release_connection(conn)
             
             return count
         except Exception as e:
+            if conn:
+                self._release_connection(conn, discard=True)
             logger.error(f"Error getting news count: {e}")
             return 0
+    
+    def filter_uncrawled(self, source_urls: List[str]) -> List[str]:
+        """
+        Lọc batch các URL chưa được crawl, dùng trước khi fetch trang chi tiết
+        
+        Args:
+            source_urls: List URL nguồn (đã normalize)
+            
+        Returns:
+            List các URL chưa tồn tại (giữ nguyên thứ tự)
+        """
+        return self.duplicate_checker.filter_uncrawled(source_urls)
@@ -0,0 +1,112 @@
+"""
+Encoding
+Xác định charset của trang mà không chạy charset detection trên toàn body
+"""
+
+import re
+import codecs
+import threading
+from typing import Dict, Optional
+from loguru import logger
+
+
+DEFAULT_ENCODING = 'utf-8'
+
+# Số byte đầu trang được tìm <meta charset>
+META_SNIFF_BYTES = 4096
+
+_CONTENT_TYPE_CHARSET_RE = re.compile(r'charset\s*=\s*["\']?([\w\-:.]+)', re.IGNORECASE)
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([\w\-:.]+)', re.IGNORECASE)
+
+# Encoding đã biết của từng domain (dùng chung giữa các lần chạy trong process)
+_domain_encodings: Dict[str, str] = {}
+_configured_domains = set()
+_lock = threading.Lock()
+
+
+def normalize_encoding(name: Optional[str]) -> Optional[str]:
+    """
+    Chuẩn hóa tên encoding (e.g., 'UTF8' -> 'utf-8')
+    
+    Args:
+        name: Tên encoding
+        
+    Returns:
+        Tên chuẩn của codec hoặc None nếu không hợp lệ
+    """
+    if not name:
+        return None
+    
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        logger.debug(f"Unknown encoding: {name}")
+        return None
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Charset khai báo trong header Content-Type"""
+    if not content_type:
+        return None
+    
+    match = _CONTENT_TYPE_CHARSET_RE.search(content_type)
+    return normalize_encoding(match.group(1)) if match else None
+
+
+def sniff_meta_charset(content: bytes) -> Optional[str]:
+    """Charset trong <meta charset> / <meta http-equiv> ở đầu trang"""
+    match = _META_CHARSET_RE.search(content[:META_SNIFF_BYTES])
+    return normalize_encoding(match.group(1).decode('ascii', 'ignore')) if match else None
+
+
+def set_domain_encoding(domain: str, encoding: str):
+    """
+    Cố định encoding của domain (từ `encoding` trong domain config)
+    
+    Args:
+        domain: Domain
+        encoding: Tên encoding
+    """
+    encoding = normalize_encoding(encoding)
+    if not encoding:
+        return
+    
+    with _lock:
+        _domain_encodings[domain] = encoding
+        _configured_domains.add(domain)
+
+
+def resolve_encoding(domain: str, content_type: Optional[str], content: bytes) -> str:
+    """
+    Encoding để decode body của một trang
+    
+    Thứ tự: encoding cấu hình cho domain, charset trong Content-Type,
+    encoding đã biết của domain, <meta charset> trong 4 KB đầu, UTF-8.
+    Encoding tìm được được ghi nhớ cho domain.
+    
+    Args:
+        domain: Domain của trang
+        content_type: Header Content-Type
+        content: Body (bytes)
+        
+    Returns:
+        Tên encoding
+    """
+    with _lock:
+        if domain in _configured_domains:
+            return _domain_encodings[domain]
+        known = _domain_encodings.get(domain)
+    
+    encoding = charset_from_content_type(content_type)
+    if not encoding and known:
+        return known
+    
+    if not encoding:
+        encoding = sniff_meta_charset(content) or DEFAULT_ENCODING
+    
+    if encoding != known:
+        with _lock:
+            _domain_encodings[domain] = encoding
+        logger.debug(f"Encoding of {domain}: {encoding}")
+    
+    return encoding
@@ -0,0 +1,171 @@
+"""
+HTTP Session
+Tạo HTTP session/client có connection pool và header chuẩn của crawler
+"""
+
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from loguru import logger
+from config import settings
+
+
+# Header mặc định cho mọi request của crawler
+DEFAULT_HEADERS = {
+    'User-Agent': settings.CRAWLER_USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'vi-VN,vi;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Content-Type được tải về (header không có Content-Type vẫn được tải)
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Session dùng chung cho các request phụ (robots.txt, ...)
+_shared_session = None
+_lock = threading.Lock()
+
+
+def is_html_content_type(content_type: str) -> bool:
+    """
+    Kiểm tra Content-Type header trước khi tải body
+    
+    Args:
+        content_type: Giá trị header Content-Type (có thể rỗng)
+        
+    Returns:
+        True nếu là HTML hoặc server không khai báo
+    """
+    if not content_type:
+        return True
+    return content_type.split(';', 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+class BoundedBody:
+    """
+    Buffer body của response đọc theo chunk (stream)
+    
+    Ngừng đọc khi đủ `max_bytes` hoặc khi gặp `stop_marker` (chuỗi byte
+    đánh dấu phần sau nội dung cần lấy, e.g. mở đầu footer). Body được cắt
+    đúng tại giới hạn / trước marker nên kết quả không phụ thuộc cách chia chunk.
+    """
+    
+    def __init__(self, max_bytes: int, stop_marker: bytes = None):
+        """
+        Args:
+            max_bytes: Số byte tối đa được đọc
+            stop_marker: Dừng đọc khi gặp chuỗi byte này (optional)
+        """
+        self.max_bytes = max_bytes
+        self.stop_marker = stop_marker
+        self.buffer = bytearray()
+        self.truncated = False
+        self.stopped_at_marker = False
+    
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Thêm một chunk
+        
+        Args:
+            chunk: Bytes vừa đọc
+            
+        Returns:
+            True nếu nên ngừng đọc
+        """
+        start = len(self.buffer)
+        self.buffer += chunk
+        
+        if self.stop_marker:
+            # Marker có thể nằm vắt qua hai chunk
+            position = self.buffer.find(self.stop_marker, max(0, start - len(self.stop_marker) + 1))
+            if position != -1 and position <= self.max_bytes:
+                del self.buffer[position:]
+                self.stopped_at_marker = True
+                return True
+        
+        if len(self.buffer) >= self.max_bytes:
+            self.truncated = True
+            del self.buffer[self.max_bytes:]
+            return True
+        
+        return False
+    
+    @property
+    def content(self) -> bytes:
+        """Body đã đọc"""
+        return bytes(self.buffer)
+
+
+def create_session(pool_maxsize: int = 10, pool_connections: int = 1) -> requests.Session:
+    """
+    Tạo session với connection pool và header mặc định của crawler
+    
+    Args:
+        pool_maxsize: Số connection tối đa giữ lại cho mỗi host
+        pool_connections: Số host được giữ pool
+        
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_shared_session() -> requests.Session:
+    """
+    Lấy session dùng chung cho toàn process (tạo lazy)
+    
+    Returns:
+        Shared requests.Session
+    """
+    global _shared_session
+    
+    with _lock:
+        if _shared_session is None:
+            # Nhiều domain dùng chung nên giữ pool cho nhiều host
+            _shared_session = create_session(pool_maxsize=4, pool_connections=20)
+        return _shared_session
+
+
+def create_async_client(max_connections: int = None):
+    """
+    Tạo httpx.AsyncClient dùng chung cho các AsyncStaticCrawler
+    
+    HTTP/2 được bật khi có package h2 (pip install httpx[http2]), nếu không
+    thì dùng HTTP/1.1 với keep-alive.
+    
+    Args:
+        max_connections: Số connection tối đa của client
+        
+    Returns:
+        httpx.AsyncClient
+    """
+    import httpx
+    
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        logger.warning("h2 is not installed, async client falls back to HTTP/1.1")
+        http2 = False
+    
+    max_connections = max_connections or settings.ASYNC_MAX_CONNECTIONS
+    
+    return httpx.AsyncClient(
+        http2=http2,
+        # HTTP/2 không cho phép connection-specific header
+        headers={k: v for k, v in DEFAULT_HEADERS.items() if k != 'Connection'},
+        timeout=settings.CRAWLER_TIMEOUT,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections
+        )
+    )
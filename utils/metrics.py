@@ -0,0 +1,362 @@
+"""
+Metrics
+Histogram latency của từng stage trong pipeline crawl, theo domain
+"""
+
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+from loguru import logger
+from config import settings
+
+
+# Các stage được đo
+STAGES = (
+    'robots',        # robots.txt check
+    'rate_limit',    # Thời gian đợi rate limiter
+    'fetch',         # HTTP request + đọc body
+    'parse',         # Extract dữ liệu bài viết
+    'clean',         # ContentCleaner
+    'dedup',         # Crawled-URL check cho batch link trước khi fetch
+    'near_dedup',    # SimHash check trước khi lưu
+    'db_insert',     # INSERT một bài hoặc một batch
+    'cdn_download',  # Download thumbnail
+    'cdn_upload'     # Upload thumbnail lên CDN
+)
+
+# Upper bound (seconds) của các bucket, giống bucket mặc định của Prometheus
+# client nhưng thêm 30s / 60s cho request chậm và rate limit wait
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Timer không làm gì khi metrics bị tắt (dùng lại được, không tạo object mới)
+_NO_TIMER = nullcontext()
+
+_shared_registry = None
+_lock = threading.Lock()
+
+
+def get_metrics() -> Optional['MetricsRegistry']:
+    """
+    Lấy MetricsRegistry dùng chung cho toàn process
+    
+    Returns:
+        Shared MetricsRegistry, None nếu METRICS_ENABLED tắt
+    """
+    global _shared_registry
+    
+    if not settings.METRICS_ENABLED:
+        return None
+    
+    with _lock:
+        if _shared_registry is None:
+            _shared_registry = MetricsRegistry()
+        return _shared_registry
+
+
+def stage_timer(stage: str, domain: str):
+    """
+    Context manager đo thời gian một stage
+    
+    Args:
+        stage: Tên stage (xem STAGES)
+        domain: Domain của crawler
+        
+    Returns:
+        Timer ghi vào registry chung, hoặc no-op khi metrics bị tắt
+    """
+    registry = get_metrics()
+    if registry is None:
+        return _NO_TIMER
+    return registry.timer(stage, domain)
+
+
+def observe(stage: str, domain: str, seconds: float):
+    """Ghi một giá trị đã đo sẵn (no-op khi metrics bị tắt)"""
+    registry = get_metrics()
+    if registry is not None:
+        registry.observe(stage, domain, seconds)
+
+
+def domain_of(url: Optional[str]) -> str:
+    """Domain label từ URL (bỏ "www.")"""
+    host = urlsplit(url or '').hostname or 'unknown'
+    return host[4:] if host.startswith('www.') else host
+
+
+class Histogram:
+    """Histogram với bucket cố định (không thread-safe, registry giữ lock)"""
+    
+    __slots__ = ('counts', 'count', 'sum', 'max')
+    
+    def __init__(self):
+        # counts[i] = số giá trị trong (BUCKETS[i-1], BUCKETS[i]], phần tử cuối là +Inf
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+    
+    def observe(self, value: float):
+        """Thêm một giá trị"""
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+    
+    def cumulative(self) -> List[int]:
+        """Số giá trị <= mỗi bucket (kiểu Prometheus), phần tử cuối là +Inf"""
+        total = 0
+        result = []
+        for count in self.counts:
+            total += count
+            result.append(total)
+        return result
+    
+    def quantile(self, q: float) -> float:
+        """
+        Ước lượng quantile bằng nội suy tuyến tính trong bucket
+        (như histogram_quantile của Prometheus)
+        
+        Args:
+            q: Quantile (0..1)
+            
+        Returns:
+            Giá trị ước lượng (seconds), 0 nếu chưa có dữ liệu
+        """
+        if not self.count:
+            return 0.0
+        
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if i == len(BUCKETS):
+                    return self.max
+                lower = BUCKETS[i - 1] if i else 0.0
+                upper = min(BUCKETS[i], self.max)
+                return lower + (max(upper, lower) - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+    
+    def to_dict(self) -> Dict:
+        """Tóm tắt cho JSON snapshot"""
+        cumulative = self.cumulative()
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6),
+            'p50': round(self.quantile(0.5), 6),
+            'p95': round(self.quantile(0.95), 6),
+            'p99': round(self.quantile(0.99), 6),
+            'buckets': {
+                **{str(bound): cumulative[i] for i, bound in enumerate(BUCKETS)},
+                '+Inf': cumulative[-1]
+            }
+        }
+
+
+class _StageTimer:
+    """Context manager đo một lần chạy của stage (ghi cả khi có exception)"""
+    
+    __slots__ = ('registry', 'stage', 'domain', 'start')
+    
+    def __init__(self, registry: 'MetricsRegistry', stage: str, domain: str):
+        self.registry = registry
+        self.stage = stage
+        self.domain = domain
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.stage, self.domain, time.perf_counter() - self.start)
+        return False
+
+
+class MetricsRegistry:
+    """
+    Histogram latency theo (stage, domain)
+    
+    Giá trị tích lũy từ lúc process start (như counter của Prometheus). Có
+    thể export dạng Prometheus text (render_prometheus / start_metrics_server)
+    hoặc ghi JSON snapshot (write_snapshot).
+    """
+    
+    def __init__(self):
+        self._histograms: Dict[tuple, Histogram] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+    
+    def timer(self, stage: str, domain: str) -> _StageTimer:
+        """Context manager đo một lần chạy của stage"""
+        return _StageTimer(self, stage, domain)
+    
+    def observe(self, stage: str, domain: str, seconds: float):
+        """
+        Ghi một giá trị latency
+        
+        Args:
+            stage: Tên stage (xem STAGES)
+            domain: Domain
+            seconds: Thời gian (seconds)
+        """
+        key = (domain, stage)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+    
+    def snapshot(self, domain: str = None) -> Dict[str, Dict[str, Dict]]:
+        """
+        Tóm tắt histogram
+        
+        Args:
+            domain: Chỉ lấy domain này (None = tất cả)
+            
+        Returns:
+            Dict domain -> stage -> tóm tắt (count, sum, mean, max, p50, p95, p99, buckets)
+        """
+        result: Dict[str, Dict[str, Dict]] = {}
+        with self._lock:
+            for (key_domain, stage), histogram in sorted(self._histograms.items()):
+                if domain is None or key_domain == domain:
+                    result.setdefault(key_domain, {})[stage] = histogram.to_dict()
+        return result
+    
+    def summary(self, domain: str, limit: int = 5) -> str:
+        """
+        Một dòng log: các stage tốn thời gian nhất của domain
+        
+        Args:
+            domain: Domain
+            limit: Số stage tối đa
+            
+        Returns:
+            e.g. "fetch 12.3s (n=50, p95 0.81s), parse 2.1s (n=48, p95 0.06s)"
+        """
+        stages = self.snapshot(domain).get(domain, {})
+        top = sorted(stages.items(), key=lambda item: item[1]['sum'], reverse=True)[:limit]
+        return ', '.join(
+            f"{stage} {data['sum']:.1f}s (n={data['count']}, p95 {data['p95']:.2f}s)"
+            for stage, data in top
+        )
+    
+    def render_prometheus(self) -> str:
+        """Tất cả histogram theo Prometheus text exposition format"""
+        name = 'crawler_stage_duration_seconds'
+        lines = [
+            f"# HELP {name} Latency of each crawl pipeline stage",
+            f"# TYPE {name} histogram"
+        ]
+        
+        with self._lock:
+            items = [
+                (domain, stage, histogram.cumulative(), histogram.sum, histogram.count)
+                for (domain, stage), histogram in sorted(self._histograms.items())
+            ]
+        
+        for domain, stage, cumulative, total, count in items:
+            labels = f'domain="{_escape_label(domain)}",stage="{_escape_label(stage)}"'
+            for bound, value in zip(BUCKETS, cumulative):
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {value}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative[-1]}')
+            lines.append(f'{name}_sum{{{labels}}} {total}')
+            lines.append(f'{name}_count{{{labels}}} {count}')
+        
+        return '\n'.join(lines) + '\n'
+    
+    def write_snapshot(self, domain: str = None, stats: Dict = None, metrics_dir: str = None) -> Optional[str]:
+        """
+        Ghi JSON snapshot (atomic) vào METRICS_DIR/<domain>.json
+        (hoặc all.json khi domain là None)
+        
+        Args:
+            domain: Domain cần ghi, None = tất cả
+            stats: Stats của lần chạy (optional, ghi kèm)
+            metrics_dir: Thư mục, mặc định settings.METRICS_DIR
+            
+        Returns:
+            Đường dẫn file hoặc None nếu lỗi
+        """
+        directory = Path(metrics_dir or settings.METRICS_DIR)
+        path = directory / f"{domain or 'all'}.json"
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        
+        data = {
+            'generated_at': time.time(),
+            'started_at': self.started_at,
+            'domains': self.snapshot(domain)
+        }
+        if stats is not None:
+            data['stats'] = stats
+        
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+            return str(path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot {path}: {e}")
+            return None
+
+
+def _escape_label(value: str) -> str:
+    """Escape giá trị label Prometheus"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics -> Prometheus text format"""
+    
+    def do_GET(self):
+        registry = get_metrics()
+        if self.path.split('?')[0] != '/metrics' or registry is None:
+            self.send_error(404)
+            return
+        
+        body = registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        """Không log từng lần scrape"""
+        pass
+
+
+def start_metrics_server(port: int = None, host: str = '0.0.0.0') -> Optional[ThreadingHTTPServer]:
+    """
+    Chạy endpoint Prometheus (GET /metrics) trong daemon thread
+    
+    Args:
+        port: Port, mặc định settings.METRICS_PORT
+        host: Địa chỉ bind
+        
+    Returns:
+        HTTP server hoặc None nếu không start được
+    """
+    port = port or settings.METRICS_PORT
+    
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"Could not start metrics endpoint on port {port}: {e}")
+        return None
+    
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Metrics endpoint: http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,114 @@
+"""
+News Batch Writer
+Gom bài viết đã clean thành batch để bulk insert vào database
+"""
+
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+from loguru import logger
+from config import settings
+from utils.metrics import stage_timer
+
+
+class NewsBatchWriter:
+    """
+    Buffer bài viết và flush bằng DatabaseClient.create_news_batch
+    
+    Batch được flush khi đủ `batch_size` bài hoặc khi bài cũ nhất trong
+    buffer đã đợi quá `flush_interval` giây. Kết quả từng bài được báo lại
+    qua callback `on_result(article_data, success)`.
+    """
+    
+    def __init__(
+        self,
+        db_client,
+        batch_size: int = None,
+        flush_interval: float = None,
+        on_result: Optional[Callable[[Dict, bool], None]] = None,
+        domain: str = None
+    ):
+        """
+        Args:
+            db_client: DatabaseClient instance (có create_news_batch)
+            batch_size: Số bài mỗi batch
+            flush_interval: Số giây tối đa một bài nằm trong buffer
+            on_result: Callback nhận (article_data, success) sau khi flush
+            domain: Domain của crawler (label cho metrics)
+        """
+        self.db_client = db_client
+        self.batch_size = batch_size or settings.DB_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.DB_BATCH_FLUSH_INTERVAL
+        self.on_result = on_result
+        self.domain = domain or 'unknown'
+        
+        self._buffer: List[Dict] = []
+        self._oldest = None
+        self._lock = threading.Lock()
+        
+        # Chỉ một flush chạy tại một thời điểm
+        self._flush_lock = threading.Lock()
+        
+        # Thread nền flush theo thời gian
+        self._closed = threading.Event()
+        self._timer = threading.Thread(
+            target=self._flush_periodically,
+            name="news-batch-writer",
+            daemon=True
+        )
+        self._timer.start()
+    
+    def add(self, article_data: Dict):
+        """
+        Thêm bài viết vào buffer, flush nếu đủ batch
+        
+        Args:
+            article_data: Dữ liệu bài viết (cùng format với create_news)
+        """
+        with self._lock:
+            if not self._buffer:
+                self._oldest = time.time()
+            self._buffer.append(article_data)
+            full = len(self._buffer) >= self.batch_size
+        
+        if full:
+            self.flush()
+    
+    def flush(self):
+        """Ghi toàn bộ buffer hiện tại xuống database"""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+                self._oldest = None
+            
+            if not batch:
+                return
+            
+            try:
+                with stage_timer('db_insert', self.domain):
+                    results = self.db_client.create_news_batch(batch)
+            except Exception as e:
+                logger.error(f"Error flushing batch of {len(batch)} articles: {e}")
+                results = [False] * len(batch)
+            
+            if self.on_result:
+                for article_data, success in zip(batch, results):
+                    try:
+                        self.on_result(article_data, success)
+                    except Exception as e:
+                        logger.error(f"Error in batch result callback: {e}")
+    
+    def _flush_periodically(self):
+        """Flush buffer khi bài cũ nhất đợi quá flush_interval"""
+        while not self._closed.wait(1):
+            with self._lock:
+                expired = self._oldest is not None and time.time() - self._oldest >= self.flush_interval
+            
+            if expired:
+                self.flush()
+    
+    def close(self):
+        """Dừng thread nền và flush phần còn lại"""
+        self._closed.set()
+        self._timer.join()
+        self.flush()
@@ -1,47 +1,173 @@
 """
 Rate Limiter
-Giới hạn số request per minute
+Giới hạn tốc độ request cho từng domain, tự điều chỉnh theo phản hồi của server
 """
 
 import time
-from collections import deque
+import asyncio
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
 from loguru import logger
+from config import settings
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse header Retry-After (số giây hoặc HTTP date)
+    
+    Args:
+        value: Giá trị header
+        
+    Returns:
+        Số giây cần đợi hoặc None nếu không hợp lệ
+    """
+    if not value:
+        return None
+    
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
 
 
 class RateLimiter:
-    """Rate limiter sử dụng sliding window"""
+    """
+    Adaptive rate limiter (thread-safe)
+    
+    Các request được giãn cách đều nhau bởi `interval` giây. Interval nhỏ
+    nhất là max(60 / requests_per_minute, Crawl-delay); khi server trả
+    429/503 hoặc latency tăng thì interval tăng lên (tối đa max_interval),
+    khi phản hồi ổn định thì giảm dần về mức nhỏ nhất. Retry-After được
+    tôn trọng bằng cách tạm dừng mọi request tới thời điểm đó.
+    """
     
-    def __init__(self, requests_per_minute: int = 30):
+    # Hệ số điều chỉnh interval
+    BACKOFF_FACTOR = 2.0
+    SLOW_FACTOR = 1.5
+    RECOVERY_FACTOR = 0.9
+    LATENCY_ALPHA = 0.3  # EWMA smoothing
+    
+    def __init__(self, requests_per_minute: int = 30, crawl_delay: float = 0.0):
         """
         Args:
-            requests_per_minute: Số request tối đa mỗi phút
+            requests_per_minute: Số request tối đa mỗi phút (trần tốc độ)
+            crawl_delay: Crawl-delay từ robots.txt (seconds)
         """
         self.requests_per_minute = requests_per_minute
-        self.window_size = 60  # seconds
-        self.requests = deque()
+        self.crawl_delay = crawl_delay
+        self.max_interval = settings.RATE_LIMIT_MAX_INTERVAL
+        self.latency_threshold = settings.RATE_LIMIT_LATENCY_THRESHOLD
+        
+        self.min_interval = self._compute_min_interval()
+        self.interval = self.min_interval
+        
+        # Thời điểm sớm nhất request tiếp theo được gửi
+        self._next_request_at = 0.0
+        
+        # Latency trung bình (EWMA) và mức thấp nhất đã thấy
+        self._latency = None
+        self._baseline_latency = None
+        
+        # Lock để nhiều worker thread dùng chung một limiter
+        self._lock = threading.Lock()
+    
+    def _compute_min_interval(self) -> float:
+        """Interval nhỏ nhất từ RPM và Crawl-delay"""
+        rpm_interval = 60.0 / self.requests_per_minute if self.requests_per_minute > 0 else 0.0
+        return max(rpm_interval, self.crawl_delay or 0.0)
+    
+    def set_crawl_delay(self, crawl_delay: float):
+        """
+        Cập nhật Crawl-delay (từ robots.txt)
+        
+        Args:
+            crawl_delay: Crawl-delay in seconds
+        """
+        with self._lock:
+            self.crawl_delay = crawl_delay
+            self.min_interval = self._compute_min_interval()
+            self.interval = max(self.interval, self.min_interval)
+        
+        if crawl_delay:
+            logger.info(f"Honoring Crawl-delay {crawl_delay}s (interval {self.min_interval:.2f}s)")
+    
+    def _reserve(self) -> float:
+        """
+        Giữ chỗ cho request tiếp theo
+        
+        Returns:
+            Số giây caller cần đợi trước khi gửi request
+        """
+        with self._lock:
+            now = time.time()
+            send_at = max(now, self._next_request_at)
+            self._next_request_at = send_at + self.interval
+            return send_at - now
     
     def wait_if_needed(self):
-        """Đợi nếu đã vượt quá rate limit"""
-        now = time.time()
-        
-        # Remove old requests outside window
-        while self.requests and self.requests[0] < now - self.window_size:
-            self.requests.popleft()
-        
-        # Check if we need to wait
-        if len(self.requests) >= self.requests_per_minute:
-            # Calculate wait time
-            oldest_request = self.requests[0]
-            wait_time = self.window_size - (now - oldest_request)
+        """Đợi tới lượt gửi request"""
+        wait_time = self._reserve()
+        
+        if wait_time > 0:
+            logger.debug(f"Rate limit: waiting {wait_time:.2f}s...")
+            time.sleep(wait_time)
+    
+    async def wait_if_needed_async(self):
+        """Đợi tới lượt gửi request mà không chặn event loop (AsyncStaticCrawler)"""
+        wait_time = self._reserve()
+        
+        if wait_time > 0:
+            logger.debug(f"Rate limit: waiting {wait_time:.2f}s...")
+            await asyncio.sleep(wait_time)
+    
+    def record_response(self, status_code: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """
+        Điều chỉnh interval theo kết quả request
+        
+        Args:
+            status_code: HTTP status (None nếu timeout / lỗi kết nối)
+            latency: Thời gian phản hồi (seconds)
+            retry_after: Giá trị Retry-After đã parse (seconds)
+        """
+        with self._lock:
+            old_interval = self.interval
+            
+            if self._latency is None:
+                self._latency = latency
+            else:
+                self._latency += self.LATENCY_ALPHA * (latency - self._latency)
+            
+            if self._baseline_latency is None or self._latency < self._baseline_latency:
+                self._baseline_latency = self._latency
             
-            if wait_time > 0:
-                logger.debug(f"Rate limit reached. Waiting {wait_time:.2f}s...")
-                time.sleep(wait_time)
-                
-                # Clean up again after waiting
-                now = time.time()
-                while self.requests and self.requests[0] < now - self.window_size:
-                    self.requests.popleft()
-        
-        # Record this request
-        self.requests.append(time.time())
+            if status_code in (429, 503) or status_code is None:
+                # Server quá tải / từ chối: giảm tốc mạnh
+                self.interval = max(self.interval * self.BACKOFF_FACTOR, self.min_interval, 1.0)
+            elif self._latency > max(self.latency_threshold, 2 * self._baseline_latency):
+                # Latency tăng: giảm tốc nhẹ
+                self.interval = max(self.interval * self.SLOW_FACTOR, self.min_interval, 0.1)
+            else:
+                # Phản hồi ổn định: tăng tốc dần về trần cấu hình
+                self.interval = max(self.interval * self.RECOVERY_FACTOR, self.min_interval)
+            
+            self.interval = min(self.interval, max(self.max_interval, self.min_interval))
+            
+            if retry_after:
+                self._next_request_at = max(self._next_request_at, time.time() + retry_after)
+            
+            new_interval = self.interval
+        
+        if retry_after:
+            logger.warning(f"Server asked to retry after {retry_after:.0f}s")
+        if new_interval > old_interval * 1.2:
+            logger.info(f"Slowing down: interval {old_interval:.2f}s -> {new_interval:.2f}s")
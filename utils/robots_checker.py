@@ -3,28 +3,232 @@ Robots.txt Checker
 Kiểm tra robots.txt trước khi crawl
 """
 
+import json
+import os
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Optional
 from urllib.robotparser import RobotFileParser
 from loguru import logger
+from config import settings
+from utils.http_session import get_shared_session
+
+# Thời gian thử lại khi không tải được robots.txt (seconds)
+ROBOTS_ERROR_TTL = 300
+
+_shared_cache = None
+_lock = threading.Lock()
+
+
+def get_robots_cache() -> 'RobotsCache':
+    """
+    Lấy RobotsCache dùng chung cho toàn process
+    
+    Returns:
+        Shared RobotsCache instance
+    """
+    global _shared_cache
+    
+    with _lock:
+        if _shared_cache is None:
+            _shared_cache = RobotsCache()
+        return _shared_cache
+
+
+class RobotsCache:
+    """
+    Cache robots.txt theo domain, dùng chung giữa các crawler và các lần chạy
+    
+    robots.txt được lưu trong memory và trên disk (ROBOTS_CACHE_DIR) kèm thời
+    điểm hết hạn (ROBOTS_CACHE_TTL). Lần đầu gặp domain mới tải đồng bộ; khi
+    entry đã hết hạn, bản cũ vẫn được dùng trong lúc một thread nền tải lại.
+    """
+    
+    def __init__(self, cache_dir: str = None, ttl: int = None, session=None):
+        """
+        Args:
+            cache_dir: Thư mục lưu robots.txt, mặc định settings.ROBOTS_CACHE_DIR
+            ttl: Thời gian sống của entry (seconds)
+            session: requests.Session dùng để tải, mặc định shared session
+        """
+        self.cache_dir = Path(cache_dir or settings.ROBOTS_CACHE_DIR)
+        self.ttl = ttl or settings.ROBOTS_CACHE_TTL
+        self.session = session or get_shared_session()
+        
+        # domain -> {'parser', 'expires_at'}
+        self._entries: Dict[str, Dict] = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._domain_locks: Dict[str, threading.Lock] = {}
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not create robots cache dir {self.cache_dir}: {e}")
+    
+    def get_parser(self, domain: str) -> RobotFileParser:
+        """
+        Lấy parser robots.txt của domain
+        
+        Args:
+            domain: Domain (e.g., 'vnexpress.net')
+            
+        Returns:
+            RobotFileParser đã parse
+        """
+        entry = self._entries.get(domain)
+        
+        if entry is None:
+            # Một thread tải cho mỗi domain, các thread khác đợi kết quả
+            with self._domain_lock(domain):
+                entry = self._entries.get(domain)
+                if entry is None:
+                    entry = self._load_from_disk(domain) or self._fetch(domain)
+                    self._entries[domain] = entry
+        
+        if time.time() >= entry['expires_at']:
+            self._refresh_in_background(domain)
+        
+        return entry['parser']
+    
+    def _domain_lock(self, domain: str) -> threading.Lock:
+        """Lock riêng cho từng domain"""
+        with self._lock:
+            return self._domain_locks.setdefault(domain, threading.Lock())
+    
+    def _path(self, domain: str) -> Path:
+        """File cache của domain"""
+        return self.cache_dir / f"{domain}.json"
+    
+    @staticmethod
+    def _build_parser(domain: str, status: int, body: str) -> RobotFileParser:
+        """Tạo parser từ response, cùng quy tắc với RobotFileParser.read()"""
+        parser = RobotFileParser(f"https://{domain}/robots.txt")
+        
+        if status in (401, 403):
+            parser.disallow_all = True
+        elif 400 <= status < 500:
+            parser.allow_all = True
+        
+        parser.parse(body.splitlines())
+        return parser
+    
+    def _load_from_disk(self, domain: str) -> Optional[Dict]:
+        """Load entry đã lưu (kể cả đã hết hạn), None nếu chưa có"""
+        try:
+            with open(self._path(domain), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read robots cache for {domain}: {e}")
+            return None
+        
+        logger.debug(f"Loaded cached robots.txt for {domain}")
+        return {
+            'parser': self._build_parser(domain, data['status'], data['body']),
+            'expires_at': data['fetched_at'] + self.ttl
+        }
+    
+    def _save_to_disk(self, domain: str, status: int, body: str, fetched_at: float):
+        """Ghi robots.txt xuống disk (atomic)"""
+        path = self._path(domain)
+        tmp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+        
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'status': status, 'body': body, 'fetched_at': fetched_at}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write robots cache for {domain}: {e}")
+    
+    def _download(self, domain: str) -> Optional[Dict]:
+        """
+        Tải robots.txt qua shared session
+        
+        Returns:
+            Entry mới hoặc None nếu lỗi mạng / lỗi server
+        """
+        robots_url = f"https://{domain}/robots.txt"
+        
+        try:
+            response = self.session.get(robots_url, timeout=settings.CRAWLER_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not load robots.txt for {domain}: {e}")
+            return None
+        
+        if response.status_code >= 500:
+            logger.warning(f"Could not load robots.txt for {domain}: HTTP {response.status_code}")
+            return None
+        
+        body = response.text if response.status_code < 400 else ''
+        fetched_at = time.time()
+        self._save_to_disk(domain, response.status_code, body, fetched_at)
+        
+        logger.info(f"Loaded robots.txt for {domain}")
+        return {
+            'parser': self._build_parser(domain, response.status_code, body),
+            'expires_at': fetched_at + self.ttl
+        }
+    
+    def _fetch(self, domain: str) -> Dict:
+        """Tải đồng bộ, lỗi thì cho phép tất cả và thử lại sau ROBOTS_ERROR_TTL"""
+        entry = self._download(domain)
+        if entry is None:
+            entry = {
+                'parser': self._build_parser(domain, 404, ''),
+                'expires_at': time.time() + ROBOTS_ERROR_TTL
+            }
+        return entry
+    
+    def _refresh_in_background(self, domain: str):
+        """Tải lại robots.txt đã hết hạn mà không chặn caller"""
+        with self._lock:
+            if domain in self._refreshing:
+                return
+            self._refreshing.add(domain)
+        
+        thread = threading.Thread(
+            target=self._refresh,
+            args=(domain,),
+            name=f"robots-{domain}",
+            daemon=True
+        )
+        thread.start()
+    
+    def _refresh(self, domain: str):
+        """Thread nền: thay entry khi tải xong, lỗi thì giữ bản cũ"""
+        try:
+            entry = self._download(domain)
+            if entry is None:
+                entry = dict(self._entries[domain])
+                entry['expires_at'] = time.time() + ROBOTS_ERROR_TTL
+            self._entries[domain] = entry
+        finally:
+            with self._lock:
+                self._refreshing.discard(domain)
 
 
 class RobotsChecker:
     """Kiểm tra robots.txt"""
     
-    def __init__(self, domain: str):
+    def __init__(self, domain: str, cache: RobotsCache = None):
         """
         Args:
             domain: Domain cần kiểm tra (e.g., 'vnexpress.net')
+            cache: RobotsCache (optional), mặc định dùng cache chung của process
         """
         self.domain = domain
         self.robots_url = f"https://{domain}/robots.txt"
-        self.parser = RobotFileParser()
-        self.parser.set_url(self.robots_url)
         
-        try:
-            self.parser.read()
-            logger.info(f"Loaded robots.txt for {domain}")
-        except Exception as e:
-            logger.warning(f"Could not load robots.txt for {domain}: {e}")
+        # robots.txt được load lazy ở lần kiểm tra đầu tiên
+        self.cache = cache or get_robots_cache()
+    
+    @property
+    def parser(self) -> RobotFileParser:
+        """Parser robots.txt hiện tại của domain"""
+        return self.cache.get_parser(self.domain)
     
     def can_fetch(self, url: str, user_agent: str = '*') -> bool:
         """
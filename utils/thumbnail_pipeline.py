@@ -0,0 +1,91 @@
+"""
+Thumbnail Pipeline
+Download + upload thumbnail lên CDN song song, ngoài transaction database
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from loguru import logger
+from config import settings
+from utils.cdn_uploader import CDNUploader
+
+
+class ThumbnailPipeline:
+    """
+    Pool image worker xử lý thumbnail của các news đã commit
+    
+    News row được commit ngay, thumbnail được đưa vào hàng đợi; mỗi worker
+    download ảnh, upload lên CDN rồi gọi db_client.create_attachment khi
+    upload xong.
+    """
+    
+    def __init__(self, db_client, workers: int = None, cdn_uploader: CDNUploader = None):
+        """
+        Args:
+            db_client: DatabaseClient instance (có create_attachment)
+            workers: Số image worker chạy song song
+            cdn_uploader: CDNUploader dùng chung (optional)
+        """
+        self.db_client = db_client
+        self.workers = workers or settings.IMAGE_WORKERS
+        self.cdn_uploader = cdn_uploader or CDNUploader()
+        
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.workers,
+            thread_name_prefix="thumbnail"
+        )
+        self._lock = threading.Lock()
+        
+        self.stats = {
+            'queued': 0,
+            'uploaded': 0,
+            'failed': 0
+        }
+    
+    def submit(self, news_id: str, thumbnail_url: str, domain: str = None):
+        """
+        Đưa thumbnail của một news vào hàng đợi
+        
+        Args:
+            news_id: ID của news đã commit
+            thumbnail_url: URL ảnh gốc
+            domain: Domain của bài viết (label cho metrics)
+        """
+        self._increment_stat('queued')
+        self._executor.submit(self._process, news_id, thumbnail_url, domain)
+    
+    def _increment_stat(self, key: str):
+        """Tăng counter thống kê (thread-safe)"""
+        with self._lock:
+            self.stats[key] += 1
+    
+    def _process(self, news_id: str, thumbnail_url: str, domain: str = None):
+        """Upload thumbnail và tạo attachment record (chạy trong image worker)"""
+        try:
+            cdn_data = self.cdn_uploader.upload_with_retry(thumbnail_url, domain=domain)
+            
+            if not cdn_data:
+                logger.warning(f"Failed to upload thumbnail to CDN for news: {news_id}")
+                self._increment_stat('failed')
+                return
+            
+            if self.db_client.create_attachment(news_id, cdn_data):
+                self._increment_stat('uploaded')
+            else:
+                self._increment_stat('failed')
+        
+        except Exception as e:
+            logger.error(f"Error processing thumbnail for news {news_id}: {e}")
+            self._increment_stat('failed')
+    
+    def close(self):
+        """Xử lý nốt hàng đợi rồi dừng các image worker"""
+        self._executor.shutdown(wait=True)
+        
+        cache_stats = self.cdn_uploader.get_cache_stats()
+        logger.info(
+            f"Thumbnail pipeline stopped: {self.stats['uploaded']} uploaded, "
+            f"{self.stats['failed']} failed of {self.stats['queued']} queued "
+            f"(CDN cache: {cache_stats['url_hits']} url hits, "
+            f"{cache_stats['content_hits']} content hits, {cache_stats['misses']} misses)"
+        )